@@ -82,6 +82,32 @@ class handler(BaseHTTPRequestHandler):
             import traceback
             traceback.print_exc()
     
+    def do_GET(self):
+        """
+        Expõe as métricas internas (cota do GitHub, caches...) em JSON
+        Só com o header X-Metrics-Token igual a METRICS_TOKEN: as métricas
+        citam o quadro do Trello e repositórios privados. Sem a variável (ou
+        com token errado) a rota responde 404
+        """
+        metrics_token = os.environ.get('METRICS_TOKEN', '')
+        given = self.headers.get('X-Metrics-Token', '')
+        if not metrics_token or not hmac.compare_digest(given.encode(), metrics_token.encode()):
+            self.send_response(404)
+            self.end_headers()
+            return
+        
+        import sys
+        sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+        
+        from utils.metrics import collect_metrics
+        import utils.github_api  # noqa: F401 - registra a cota do GitHub
+        
+        body = json.dumps(collect_metrics(), indent=2).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(body)
+    
     def verify_slack_signature(self, body):
         """Verifica assinatura do Slack"""
         slack_signing_secret = os.environ.get('SLACK_SIGNING_SECRET', '')
@@ -200,8 +226,17 @@ class handler(BaseHTTPRequestHandler):
             elif intent == 'stats_trello':
                 return self.handle_stats_trello(channel, user)
             
+            elif intent == 'stats_lines':
+                return self.handle_stats_lines(channel, user)
+            
+            elif intent == 'stats_issues':
+                return self.handle_stats_issues(channel, user)
+            
+            elif intent == 'stats_flow':
+                return self.handle_stats_flow(channel, user, params)
+            
             elif intent == 'stats_activity':
-                return self.handle_stats_activity(channel, user)
+                return self.handle_stats_activity(channel, user, params)
             
             elif intent == 'stats_general':
                 return self.handle_stats_general(channel, user)
@@ -256,18 +291,22 @@ class handler(BaseHTTPRequestHandler):
             }
     
     def handle_github_commits(self, channel, user, text, params=None):
-        """Lista commits do GitHub"""
+        """Lista commits do GitHub (um ou vários repositórios)"""
         import urllib.request
         import re
+        import sys
+        sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+        from utils.github_api import resolve_github_repos, fetch_commits_multi, format_repo_label
         
         github_token = os.environ.get('GITHUB_TOKEN')
-        github_repo = os.environ.get('GITHUB_REPO')
+        repos = resolve_github_repos(github_token)
+        github_repo = format_repo_label(repos)
         
-        # Verificar se GITHUB_REPO está configurado
-        if not github_repo or github_repo == 'owner/repo':
+        # Verificar se há repositório configurado (GITHUB_REPO, GITHUB_REPOS ou GITHUB_ORG)
+        if not repos:
             return {
                 'channel': channel,
-                'text': f'<@{user}> ❌ Variável GITHUB_REPO não configurada.\n\n*Como configurar:*\n1. Vá em Settings → Environment Variables na Vercel\n2. Adicione `GITHUB_REPO` com valor `usuario/repositorio`\n3. Exemplo: `pedro-soares/meu-projeto`\n4. Faça Redeploy'
+                'text': f'<@{user}> ❌ Variável GITHUB_REPO não configurada.\n\n*Como configurar:*\n1. Vá em Settings → Environment Variables na Vercel\n2. Adicione `GITHUB_REPO` com valor `usuario/repositorio`\n   (ou `GITHUB_REPOS` com vários separados por vírgula, ou `GITHUB_ORG`)\n3. Exemplo: `pedro-soares/meu-projeto`\n4. Faça Redeploy'
             }
         
         # Extrair número de commits (usar params do intent classifier ou regex)
@@ -278,19 +317,10 @@ class handler(BaseHTTPRequestHandler):
             limit = int(match.group(1)) if match else 5
         
         try:
-            url = f'https://api.github.com/repos/{github_repo}/commits?per_page={limit}'
-            headers = {
-                'Accept': 'application/vnd.github.v3+json',
-                'User-Agent': 'PMO-Bot'
-            }
-            
-            # Adicionar token se disponível (necessário para repos privados)
-            if github_token:
-                headers['Authorization'] = f'token {github_token}'
-            
-            req = urllib.request.Request(url, headers=headers)
-            response = urllib.request.urlopen(req)
-            commits = json.loads(response.read())
+            # Buscar em paralelo e combinar (mais recentes primeiro)
+            commits, _ = fetch_commits_multi(github_token, repos, limit)
+            commits = commits[:limit]
+            multi_repo = len(repos) > 1
             
             # Formatar resposta
             if commits:
@@ -300,7 +330,8 @@ class handler(BaseHTTPRequestHandler):
                     author = commit['commit']['author']['name']
                     sha = commit['sha'][:7]
                     date = commit['commit']['author']['date'][:10]
-                    lines.append(f'{i}. `{sha}` - {msg}\n   _{author} em {date}_')
+                    repo_tag = f' [{commit["repository"]}]' if multi_repo else ''
+                    lines.append(f'{i}. `{sha}`{repo_tag} - {msg}\n   _{author} em {date}_')
                 
                 return {
                     'channel': channel,
@@ -324,6 +355,12 @@ class handler(BaseHTTPRequestHandler):
             elif e.code == 401:
                 error_msg += '*Repositório privado requer token*\n'
                 error_msg += 'Configure GITHUB_TOKEN nas variáveis de ambiente'
+            elif e.code in (403, 429):
+                from utils.github_api import rate_limit_budget
+                budget = rate_limit_budget.snapshot()
+                error_msg += '*Limite de requisições do GitHub atingido*\n'
+                if budget['seconds_to_reset'] is not None:
+                    error_msg += f'Tente novamente em ~{budget["seconds_to_reset"] // 60 + 1} min'
             else:
                 error_msg += f'Código de erro: {e.code}'
             
@@ -629,23 +666,38 @@ class handler(BaseHTTPRequestHandler):
             from utils.statistics import (
                 get_github_commits_stats, 
                 generate_commits_report,
-                generate_commits_chart,
-                generate_commits_timeline,
-                upload_chart_to_slack
+                commits_chart_payload,
+                commits_timeline_payload,
+                start_chart_upload,
+                complete_chart_uploads
             )
+            from utils.chart_backend import chart_filename
+            from utils.chart_pipeline import ChartJob, run_chart_pipeline
+            from utils.precompute import get_artifact, commits_artifact_key
+            
+            from utils.github_api import resolve_github_repos, format_repo_label
             
             github_token = os.environ.get('GITHUB_TOKEN')
-            github_repo = os.environ.get('GITHUB_REPO')
             slack_token = os.environ.get('SLACK_BOT_TOKEN')
+            repos = resolve_github_repos(github_token)
             
-            if not github_repo:
+            if not repos:
                 return {
                     'channel': channel,
                     'text': f'<@{user}> ❌ GITHUB_REPO não configurado.'
                 }
             
-            # Buscar estatísticas
-            stats = get_github_commits_stats(github_token, github_repo, limit=100)
+            github_repo = format_repo_label(repos)
+            
+            # Artefato pré-computado em segundo plano, se estiver fresco
+            artifact = get_artifact(commits_artifact_key(repos))
+            
+            # Buscar estatísticas (combinadas entre todos os repositórios)
+            if artifact:
+                print(f"[PRECOMPUTE] Usando estatísticas pré-computadas de commits")
+                stats = artifact['stats']
+            else:
+                stats = get_github_commits_stats(github_token, repos, limit=100)
             
             if not stats:
                 return {
@@ -662,45 +714,52 @@ class handler(BaseHTTPRequestHandler):
                 'text': f'{report}\n\n📊 _Gerando gráficos..._'
             })
             
-            # Gerar e enviar gráfico de barras (ranking)
-            success_count = 0
-            errors = []
-            
-            chart_buffer = generate_commits_chart(stats)
-            if chart_buffer and slack_token:
-                result = upload_chart_to_slack(
-                    chart_buffer, 
-                    f'commits_ranking_{github_repo.replace("/", "_")}.png',
-                    channel,
-                    slack_token,
-                    f'📊 Ranking de Commits - {github_repo}'
-                )
-                if result:
-                    success_count += 1
-                else:
-                    errors.append("Erro ao enviar gráfico de ranking")
-            elif not slack_token:
-                errors.append("SLACK_BOT_TOKEN não configurado")
+            if not slack_token:
+                return {
+                    'channel': channel,
+                    'text': '❌ Não foi possível enviar os gráficos.\n• SLACK_BOT_TOKEN não configurado'
+                }
             
-            # Gerar e enviar gráfico de linha (evolução temporal)
-            timeline_buffer, timeline_stats = generate_commits_timeline(github_token, github_repo, days=30)
-            if timeline_buffer and slack_token:
+            def timeline_comment(timeline_stats):
                 comment = f'📈 Evolução de Commits (últimos 30 dias)\n'
                 comment += f'• Total: {timeline_stats["total_commits"]} commits\n'
                 comment += f'• Média/dia: {timeline_stats["avg_per_day"]}\n'
                 comment += f'• Máximo em 1 dia: {timeline_stats["max_in_day"]}'
-                
-                result = upload_chart_to_slack(
-                    timeline_buffer,
-                    f'commits_timeline_{github_repo.replace("/", "_")}.png',
-                    channel,
-                    slack_token,
-                    comment
+                return comment
+            
+            # Ranking e evolução temporal avançam em paralelo:
+            # busca (thread) -> renderização (processo) -> envio dos bytes (thread);
+            # no fim, uma única chamada publica os dois gráficos no canal
+            jobs = [
+                ChartJob(
+                    'ranking',
+                    'commits_ranking',
+                    lambda: (commits_chart_payload(stats), None),
+                    chart_filename(f'commits_ranking_{self._chart_slug(repos)}'),
+                    f'📊 Ranking de Commits - {github_repo}'
+                ),
+                ChartJob(
+                    'timeline',
+                    'commits_timeline',
+                    (lambda: artifact['timeline']) if artifact
+                    else (lambda: commits_timeline_payload(github_token, repos, days=30)),
+                    chart_filename(f'commits_timeline_{self._chart_slug(repos)}'),
+                    timeline_comment
                 )
-                if result:
-                    success_count += 1
-                else:
-                    errors.append("Erro ao enviar gráfico de evolução")
+            ]
+            
+            pipeline = run_chart_pipeline(
+                jobs,
+                lambda data, filename, comment: start_chart_upload(data, filename, slack_token),
+                lambda files, comment: complete_chart_uploads(files, channel, slack_token, comment)
+            )
+            
+            labels = {'ranking': 'ranking', 'timeline': 'evolução'}
+            success_count = sum(1 for job in pipeline['jobs'] if job.get('ok'))
+            errors = [
+                f"Erro ao enviar gráfico de {labels[job['name']]}"
+                for job in pipeline['jobs'] if not job.get('ok')
+            ]
             
             # Mensagem final
             if success_count == 2:
@@ -726,6 +785,12 @@ class handler(BaseHTTPRequestHandler):
                 'text': f'<@{user}> ❌ Erro ao gerar estatísticas: {str(e)}'
             }
     
+    def _chart_slug(self, repos):
+        """Nome de arquivo para gráficos de um ou vários repositórios"""
+        if len(repos) == 1:
+            return repos[0].replace('/', '_')
+        return f'{len(repos)}_repos'
+    
     def handle_stats_trello(self, channel, user):
         """Gera estatísticas do Trello com gráficos"""
         import sys
@@ -738,6 +803,8 @@ class handler(BaseHTTPRequestHandler):
                 generate_trello_pie_chart,
                 upload_chart_to_slack
             )
+            from utils.chart_backend import chart_filename
+            from utils.precompute import get_artifact, trello_artifact_key
             
             api_key = os.environ.get('TRELLO_API_KEY')
             token = os.environ.get('TRELLO_TOKEN')
@@ -750,8 +817,9 @@ class handler(BaseHTTPRequestHandler):
                     'text': f'<@{user}> ❌ Credenciais do Trello não configuradas.'
                 }
             
-            # Buscar estatísticas
-            stats = get_trello_cards_stats(api_key, token, board_id)
+            # Buscar estatísticas (ou usar as pré-computadas, se frescas)
+            artifact = get_artifact(trello_artifact_key(board_id))
+            stats = artifact['stats'] if artifact else get_trello_cards_stats(api_key, token, board_id)
             
             if not stats:
                 return {
@@ -773,7 +841,7 @@ class handler(BaseHTTPRequestHandler):
             if chart_buffer and slack_token:
                 result = upload_chart_to_slack(
                     chart_buffer,
-                    'trello_distribution.png',
+                    chart_filename('trello_distribution'),
                     channel,
                     slack_token,
                     f'📊 Distribuição de Cards no Trello'
@@ -806,22 +874,240 @@ class handler(BaseHTTPRequestHandler):
                 'text': f'<@{user}> ❌ Erro ao gerar estatísticas: {str(e)}'
             }
     
-    def handle_stats_activity(self, channel, user):
-        """Gera resumo de atividades"""
+    def handle_stats_lines(self, channel, user):
+        """Gera estatísticas de linhas alteradas por autor com gráfico"""
+        import sys
+        sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+        
+        try:
+            from utils.statistics import (
+                get_line_changes_stats,
+                generate_line_changes_report,
+                generate_line_changes_chart,
+                upload_chart_to_slack
+            )
+            from utils.chart_backend import chart_filename
+            from utils.github_api import resolve_github_repos
+            
+            github_token = os.environ.get('GITHUB_TOKEN')
+            slack_token = os.environ.get('SLACK_BOT_TOKEN')
+            repos = resolve_github_repos(github_token)
+            
+            if not repos:
+                return {
+                    'channel': channel,
+                    'text': f'<@{user}> ❌ GITHUB_REPO não configurado.'
+                }
+            
+            # Detalhes por commit (cache permanente por SHA)
+            stats = get_line_changes_stats(github_token, repos, limit=100)
+            
+            if not stats:
+                return {
+                    'channel': channel,
+                    'text': f'<@{user}> ❌ Não foi possível gerar estatísticas de linhas.'
+                }
+            
+            report = generate_line_changes_report(stats)
+            
+            if not slack_token:
+                return {
+                    'channel': channel,
+                    'text': report
+                }
+            
+            self.send_slack_response({
+                'channel': channel,
+                'text': f'{report}\n\n📊 _Gerando gráfico..._'
+            })
+            
+            chart_buffer = generate_line_changes_chart(stats)
+            if chart_buffer and upload_chart_to_slack(
+                chart_buffer,
+                chart_filename(f'line_changes_{self._chart_slug(repos)}'),
+                channel,
+                slack_token,
+                f'📝 Linhas Alteradas por Contribuidor - {stats["repository"]}'
+            ):
+                return {
+                    'channel': channel,
+                    'text': '✅ Gráfico enviado com sucesso!'
+                }
+            
+            return {
+                'channel': channel,
+                'text': '❌ Erro ao enviar o gráfico.\n\n*Verifique:*\n1. Bot tem permissão `files:write`?\n2. SLACK_BOT_TOKEN está configurado?'
+            }
+        
+        except Exception as e:
+            return {
+                'channel': channel,
+                'text': f'<@{user}> ❌ Erro ao gerar estatísticas de linhas: {str(e)}'
+            }
+    
+    def handle_stats_issues(self, channel, user):
+        """Gera estatísticas de issues e pull requests com gráfico"""
+        import sys
+        sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+        
+        try:
+            from utils.statistics import (
+                get_issues_stats,
+                generate_issues_report,
+                generate_issues_age_chart,
+                upload_chart_to_slack
+            )
+            from utils.chart_backend import chart_filename
+            from utils.github_api import resolve_github_repos
+            
+            github_token = os.environ.get('GITHUB_TOKEN')
+            slack_token = os.environ.get('SLACK_BOT_TOKEN')
+            repos = resolve_github_repos(github_token)
+            
+            if not repos:
+                return {
+                    'channel': channel,
+                    'text': f'<@{user}> ❌ GITHUB_REPO não configurado.'
+                }
+            
+            # Sincronizar (apenas o delta) e calcular métricas
+            stats = get_issues_stats(github_token, repos)
+            
+            if not stats:
+                return {
+                    'channel': channel,
+                    'text': f'<@{user}> ❌ Não foi possível gerar estatísticas de issues.'
+                }
+            
+            report = generate_issues_report(stats)
+            
+            if not slack_token:
+                return {
+                    'channel': channel,
+                    'text': report
+                }
+            
+            # Enviar relatório e depois o histograma de idade
+            self.send_slack_response({
+                'channel': channel,
+                'text': f'{report}\n\n📊 _Gerando gráfico..._'
+            })
+            
+            chart_buffer = generate_issues_age_chart(stats)
+            if chart_buffer and upload_chart_to_slack(
+                chart_buffer,
+                chart_filename(f'issues_age_{self._chart_slug(repos)}'),
+                channel,
+                slack_token,
+                f'⏳ Idade de Issues e PRs abertos - {stats["repository"]}'
+            ):
+                return {
+                    'channel': channel,
+                    'text': '✅ Gráfico enviado com sucesso!'
+                }
+            
+            return {
+                'channel': channel,
+                'text': '❌ Erro ao enviar o gráfico.\n\n*Verifique:*\n1. Bot tem permissão `files:write`?\n2. SLACK_BOT_TOKEN está configurado?'
+            }
+        
+        except Exception as e:
+            return {
+                'channel': channel,
+                'text': f'<@{user}> ❌ Erro ao gerar estatísticas de issues: {str(e)}'
+            }
+    
+    def handle_stats_flow(self, channel, user, params=None):
+        """Gera análise de fluxo do Trello (CFD e tempo de ciclo) com gráfico"""
+        import sys
+        sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+        
+        try:
+            from utils.statistics import (
+                get_trello_flow_stats,
+                generate_trello_flow_report,
+                generate_trello_cfd_chart,
+                upload_chart_to_slack
+            )
+            from utils.chart_backend import chart_filename
+            
+            api_key = os.environ.get('TRELLO_API_KEY')
+            token = os.environ.get('TRELLO_TOKEN')
+            board_id = os.environ.get('TRELLO_BOARD_ID')
+            slack_token = os.environ.get('SLACK_BOT_TOKEN')
+            
+            if not all([api_key, token, board_id]):
+                return {
+                    'channel': channel,
+                    'text': f'<@{user}> ❌ Credenciais do Trello não configuradas.'
+                }
+            
+            # Sem token o relatório parcial seria descartado por send_slack_response
+            if not slack_token:
+                return {
+                    'channel': channel,
+                    'text': f'<@{user}> ❌ SLACK_BOT_TOKEN não configurado.'
+                }
+            
+            days = (params or {}).get('days') or 30
+            stats = get_trello_flow_stats(api_key, token, board_id, days=int(days))
+            
+            if not stats:
+                return {
+                    'channel': channel,
+                    'text': f'<@{user}> ❌ Não foi possível analisar o fluxo do quadro.'
+                }
+            
+            self.send_slack_response({
+                'channel': channel,
+                'text': f'{generate_trello_flow_report(stats)}\n\n📊 _Gerando gráfico..._'
+            })
+            
+            chart_buffer = generate_trello_cfd_chart(stats)
+            if not chart_buffer:
+                return {
+                    'channel': channel,
+                    'text': '❌ Erro ao gerar o gráfico.'
+                }
+            
+            result = upload_chart_to_slack(
+                chart_buffer,
+                chart_filename('trello_cfd'),
+                channel,
+                slack_token,
+                f'🔄 Fluxo Cumulativo - Últimos {stats["days"]} dias'
+            )
+            
+            return {
+                'channel': channel,
+                'text': '✅ Gráfico enviado com sucesso!' if result else '❌ Erro ao enviar o gráfico.'
+            }
+        
+        except Exception as e:
+            return {
+                'channel': channel,
+                'text': f'<@{user}> ❌ Erro ao analisar fluxo: {str(e)}'
+            }
+    
+    def handle_stats_activity(self, channel, user, params=None):
+        """Gera resumo de atividades (janela em params['days'], padrão 7 dias)"""
         import sys
         sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
         
         try:
             from utils.statistics import get_activity_summary, generate_activity_report
+            from utils.github_api import resolve_github_repos
             
             github_token = os.environ.get('GITHUB_TOKEN')
-            github_repo = os.environ.get('GITHUB_REPO')
+            github_repo = resolve_github_repos(github_token)
             trello_key = os.environ.get('TRELLO_API_KEY')
             trello_token = os.environ.get('TRELLO_TOKEN')
             board_id = os.environ.get('TRELLO_BOARD_ID')
             
             # Buscar resumo
-            summary = get_activity_summary(github_token, github_repo, trello_key, trello_token, board_id)
+            days = (params or {}).get('days') or 7
+            summary = get_activity_summary(github_token, github_repo, trello_key, trello_token,
+                                           board_id, days=days)
             
             if not summary:
                 return {
@@ -851,7 +1137,11 @@ Digite um dos comandos abaixo:
 
 • `estatística de commits` - Análise de commits por pessoa
 • `estatística do trello` - Distribuição de cards por lista
+• `estatística de issues` - Idade, tempo até fechar e lead time de PRs
+• `estatística de linhas` - Linhas adicionadas/removidas por pessoa
 • `resumo de atividades` - Atividades dos últimos 7 dias
+• `resumo dos últimos 90 dias` - Mesma análise em outra janela (dias, semanas, sprint)
+• `fluxo do trello` - Fluxo cumulativo e tempo de ciclo dos cards
 
 _Escolha uma opção acima!_'''
         
@@ -879,7 +1169,11 @@ _Escolha uma opção acima!_'''
 *Estatísticas:*
 • `estatística de commits` - Análise de commits por pessoa
 • `estatística do trello` - Distribuição de cards
+• `estatística de issues` - Issues e pull requests
+• `estatística de linhas` - Linhas alteradas por pessoa
 • `resumo de atividades` - Resumo dos últimos 7 dias
+• `resumo dos últimos 30 dias` - Resumo de outro período
+• `tempo de ciclo dos últimos 90 dias` - Fluxo do quadro e tempo de ciclo
 
 *Ajuda:*
 • `ajuda` ou `help` - Mostra esta mensagem
@@ -917,3 +1211,30 @@ _Digite qualquer comando acima para começar!_'''
         except:
             pass
 
+
+def run_server(port=None):
+    """
+    Servidor próprio (fora da Vercel): atende os eventos do Slack e mantém
+    o agendador que pré-computa os relatórios padrão em segundo plano
+    """
+    import sys
+    from http.server import ThreadingHTTPServer
+    sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+    
+    from utils.precompute import start_precompute_scheduler
+    
+    port = port or int(os.environ.get('PORT', 3000))
+    start_precompute_scheduler()
+    
+    server = ThreadingHTTPServer(('0.0.0.0', port), handler)
+    print(f"[SERVER] Escutando eventos do Slack na porta {port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[SERVER] Encerrado")
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    run_server()
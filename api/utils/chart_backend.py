@@ -0,0 +1,39 @@
+"""
+Seleção do backend de gráficos
+CHART_BACKEND=matplotlib (padrão, PNG) ou svg (writer próprio, sem matplotlib)
+"""
+
+import os
+
+from .chart_encoding import encoding_settings
+
+BACKENDS = ('matplotlib', 'svg')
+
+_CONTENT_TYPES = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml'
+}
+
+
+def get_chart_backend():
+    """Backend configurado (valores desconhecidos caem no matplotlib)"""
+    backend = os.environ.get('CHART_BACKEND', 'matplotlib').strip().lower()
+    return backend if backend in BACKENDS else 'matplotlib'
+
+
+def get_chart_format(backend=None):
+    """Formato da imagem: svg no backend svg ou com CHART_FORMAT=svg; senão png"""
+    if (backend or get_chart_backend()) == 'svg' or encoding_settings()['format'] == 'svg':
+        return 'svg'
+    return 'png'
+
+
+def chart_filename(basename, backend=None):
+    """Nome de arquivo com a extensão do formato (ex.: commits_ranking.png)"""
+    return f'{basename}.{get_chart_format(backend)}'
+
+
+def chart_content_type(filename):
+    """Content-Type do upload a partir da extensão do arquivo"""
+    extension = filename.rsplit('.', 1)[-1].lower()
+    return _CONTENT_TYPES.get(extension, 'application/octet-stream')
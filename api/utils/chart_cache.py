@@ -0,0 +1,173 @@
+"""
+Cache de gráficos renderizados
+Chave = hash estável dos dados de entrada + versão do estilo; se os números
+não mudaram, a imagem já renderizada é reaproveitado sem passar pelo matplotlib
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+from .chart_backend import get_chart_backend
+from .chart_encoding import encoding_settings
+from .metrics import register_metrics
+from .singleflight import single_flight
+from .storage import get_cache_dir
+
+# Incrementar sempre que a aparência dos gráficos mudar (invalida o cache)
+CHART_STYLE_VERSION = 1
+
+# Orçamento padrão do cache em memória (bytes)
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+def chart_key(kind, payload, backend=None):
+    """Hash estável (sha256) do tipo de gráfico, backend, codificação, versão do estilo e dados"""
+    backend = backend or get_chart_backend()
+    encoding = encoding_settings() if backend == 'matplotlib' else None
+    raw = json.dumps([kind, backend, encoding, CHART_STYLE_VERSION, payload], sort_keys=True,
+                     ensure_ascii=False, separators=(',', ':'), default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class ChartCache:
+    """
+    LRU limitado por bytes, em memória, com camada opcional em disco
+    A camada em disco sobrevive a reinícios (e a cold starts no mesmo container)
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, directory=None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f'{key}.bin')
+
+    def get(self, key):
+        """Retorna os bytes do gráfico ou None"""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return data
+
+        if self.directory:
+            try:
+                with open(self._path(key), 'rb') as f:
+                    data = f.read()
+            except OSError:
+                data = None
+
+            if data is not None:
+                self._store(key, data)
+                with self._lock:
+                    self.disk_hits += 1
+                return data
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _store(self, key, data):
+        with self._lock:
+            if len(data) > self.max_bytes:
+                return
+
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+
+            self._entries[key] = data
+            self._bytes += len(data)
+
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def put(self, key, data):
+        """Guarda os bytes de um gráfico (memória e, se configurado, disco)"""
+        self._store(key, data)
+
+        if self.directory:
+            path = self._path(key)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f'{path}.{threading.get_ident()}.tmp'
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"[CHART CACHE] Erro ao gravar em disco: {e}")
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'disk': bool(self.directory),
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+
+def _create_cache():
+    try:
+        max_bytes = int(os.environ.get('CHART_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES))
+    except ValueError:
+        max_bytes = DEFAULT_MAX_BYTES
+
+    # Camada em disco opcional: CHART_CACHE_DIR explícito ou CHART_CACHE_DISK=1
+    directory = os.environ.get('CHART_CACHE_DIR')
+    if not directory and os.environ.get('CHART_CACHE_DISK') == '1':
+        directory = get_cache_dir('charts')
+
+    return ChartCache(max_bytes, directory)
+
+
+chart_cache = _create_cache()
+register_metrics('chart_cache', chart_cache.snapshot)
+
+
+def cached_render(kind, payload, render_fn):
+    """
+    Devolve um BytesIO com o gráfico para `payload`, renderizando com
+    `render_fn()` apenas quando a combinação nunca foi vista
+    """
+    key = chart_key(kind, payload)
+    data = chart_cache.get(key)
+
+    if data is not None:
+        print(f"[CHART CACHE] Reaproveitando gráfico '{kind}' ({len(data)} bytes)")
+        return BytesIO(data)
+
+    # Pedidos simultâneos do mesmo gráfico renderizam uma vez; cada um recebe seu BytesIO
+    data = _render_flight.do(key, _render_and_store, key, render_fn)
+    return BytesIO(data) if data is not None else None
+
+
+_render_flight = single_flight('chart_render')
+
+
+def _render_and_store(key, render_fn):
+    buf = render_fn()
+    if buf is None:
+        return None
+
+    data = buf.getvalue()
+    chart_cache.put(key, data)
+    return data
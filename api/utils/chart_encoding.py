@@ -0,0 +1,157 @@
+"""
+Codificação dos gráficos matplotlib com orçamento de bytes
+A figura é desenhada uma vez no Agg, recortada como bbox_inches='tight' e
+reduzida a uma paleta indexada (os gráficos têm poucas cores); se o PNG
+passar do orçamento, o DPI desce por uma escada até um mínimo legível.
+CHART_FORMAT=svg emite o SVG vetorial do próprio matplotlib
+"""
+
+import math
+import os
+import threading
+import time
+from io import BytesIO
+
+from .metrics import register_metrics
+
+# Orçamento padrão por gráfico (bytes)
+DEFAULT_BYTE_BUDGET = 150 * 1024
+
+# DPIs tentados, do mais nítido ao menor ainda legível na prévia do Slack
+DPI_LADDER = (150, 125, 100)
+
+# Cores da paleta indexada; 32 preservam o antialiasing e as áreas
+# semitransparentes (com 16, o preenchimento da linha do tempo "vaza" no fundo)
+DEFAULT_PALETTE_COLORS = 32
+
+# Margem do recorte, igual ao pad_inches padrão do savefig
+_PAD_INCHES = 0.1
+
+_last_encodings = {}
+_lock = threading.Lock()
+
+
+def encoding_settings():
+    """Configuração atual (também entra na chave do cache de gráficos)"""
+    try:
+        budget = int(os.environ.get('CHART_BYTE_BUDGET', DEFAULT_BYTE_BUDGET))
+    except ValueError:
+        budget = DEFAULT_BYTE_BUDGET
+
+    try:
+        colors = int(os.environ.get('CHART_PALETTE_COLORS', DEFAULT_PALETTE_COLORS))
+    except ValueError:
+        colors = DEFAULT_PALETTE_COLORS
+
+    chart_format = os.environ.get('CHART_FORMAT', 'png').strip().lower()
+
+    return {
+        'format': 'svg' if chart_format == 'svg' else 'png',
+        'budget': budget,
+        'colors': max(0, min(colors, 256))
+    }
+
+
+def _draw_cropped(figure, dpi):
+    """Desenha a figura no DPI pedido e retorna os pixels RGB recortados"""
+    import numpy as np
+
+    original_dpi = figure.dpi
+    figure.dpi = dpi
+    try:
+        canvas = figure.canvas
+        canvas.draw()
+        bbox = figure.get_tightbbox(canvas.get_renderer()).padded(_PAD_INCHES)
+        pixels = np.asarray(canvas.buffer_rgba())
+    finally:
+        figure.dpi = original_dpi
+
+    # bbox em polegadas com origem embaixo; o buffer tem origem no topo
+    height, width = pixels.shape[:2]
+    x0 = max(0, int(math.floor(bbox.x0 * dpi)))
+    x1 = min(width, int(math.ceil(bbox.x1 * dpi)))
+    y0 = max(0, height - int(math.ceil(bbox.y1 * dpi)))
+    y1 = min(height, height - int(math.floor(bbox.y0 * dpi)))
+
+    return pixels[y0:y1, x0:x1, :3]
+
+
+def _encode_png(figure, dpi, colors):
+    """PNG de paleta indexada; sem Pillow, PNG truecolor do próprio matplotlib"""
+    try:
+        from PIL import Image
+    except ImportError:
+        Image = None
+
+    buf = BytesIO()
+
+    if Image is None or colors == 0:
+        figure.savefig(buf, format='png', dpi=dpi, bbox_inches='tight')
+        return buf
+
+    image = Image.fromarray(_draw_cropped(figure, dpi))
+    image = image.quantize(colors, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+    image.save(buf, format='PNG')
+
+    return buf
+
+
+def encode_figure(figure, kind):
+    """
+    Codifica a figura respeitando o orçamento de bytes
+    Retorna BytesIO; tamanho, tempo e DPI escolhidos ficam em get_last_encoding(kind)
+    """
+    settings = encoding_settings()
+    start = time.perf_counter()
+
+    if settings['format'] == 'svg':
+        buf = BytesIO()
+        figure.savefig(buf, format='svg', bbox_inches='tight')
+        info = {'format': 'svg', 'attempts': 1}
+    else:
+        dpi = DPI_LADDER[0]
+        attempts = 0
+
+        while True:
+            buf = _encode_png(figure, dpi, settings['colors'])
+            attempts += 1
+            size = buf.getbuffer().nbytes
+
+            smaller = [d for d in DPI_LADDER if d < dpi]
+            if size <= settings['budget'] or not smaller:
+                break
+
+            # O tamanho cresce com a área (DPI²): estima o DPI que cabe no
+            # orçamento e pula direto para o degrau mais próximo abaixo dele
+            target = dpi * math.sqrt(settings['budget'] / size)
+            dpi = next((d for d in smaller if d <= target), smaller[-1])
+
+        info = {'format': 'png', 'dpi': dpi, 'colors': settings['colors'], 'attempts': attempts}
+
+    buf.seek(0)
+    info['bytes'] = buf.getbuffer().nbytes
+    info['encode_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    info['within_budget'] = info['format'] == 'svg' or info['bytes'] <= settings['budget']
+
+    with _lock:
+        _last_encodings[kind] = info
+
+    print(f"[ENCODE] {kind}: {info['bytes'] / 1024:.1f} KB em {info['encode_ms']} ms "
+          f"({info['format']}, dpi {info.get('dpi', '-')}, {info['attempts']} tentativa(s))")
+
+    return buf
+
+
+def get_last_encoding(kind):
+    """Última codificação de `kind` neste processo (ou None)"""
+    with _lock:
+        info = _last_encodings.get(kind)
+        return dict(info) if info else None
+
+
+def _snapshot():
+    with _lock:
+        return {kind: dict(info) for kind, info in _last_encodings.items()}
+
+
+register_metrics('chart_encoding', _snapshot)
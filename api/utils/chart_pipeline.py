@@ -0,0 +1,230 @@
+"""
+Pipeline de gráficos: busca de dados, renderização e upload sobrepostos
+Cada gráfico percorre busca (thread) -> renderização -> upload (thread);
+gráficos diferentes avançam em paralelo, então um relatório com vários
+gráficos leva aproximadamente o tempo da sua etapa mais lenta.
+A renderização vai para um pool de processos só quando compensa: cada
+filho novo importa o matplotlib (~1 s), contra ~0,2 s por gráfico na
+própria thread. Fica na thread com poucos gráficos sem cache no relatório
+(menos que CHART_PROCESS_MIN_MISSES, padrão 3) e sempre na Vercel
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from .chart_backend import get_chart_backend
+from .chart_cache import chart_cache, chart_key
+from .metrics import register_metrics
+from .singleflight import single_flight
+
+
+def _render_bytes(kind, payload, backend):
+    """
+    Executado no processo filho: renderiza e devolve (bytes da imagem,
+    dados da codificação) para que tamanho e tempo cheguem ao processo pai
+    """
+    from .statistics import render_chart
+    from .chart_encoding import get_last_encoding
+
+    buf = render_chart(kind, payload, backend)
+    if buf is None:
+        return None, None
+
+    info = get_last_encoding(kind) if backend == 'matplotlib' else None
+    return buf.getvalue(), info
+
+
+class ChartJob:
+    """
+    Um gráfico do relatório
+    `fetch()` retorna (payload, meta); `comment` pode ser texto fixo ou
+    uma função que recebe `meta` (ex.: estatísticas calculadas na busca)
+    """
+
+    def __init__(self, name, kind, fetch, filename, comment=''):
+        self.name = name
+        self.kind = kind
+        self.fetch = fetch
+        self.filename = filename
+        self.comment = comment
+
+
+DEFAULT_PROCESS_MIN_MISSES = 3
+
+_render_pool = None
+_render_pool_lock = threading.Lock()
+_last_run = {}
+
+
+class _RunState:
+    """Gráficos sem cache vistos até agora numa execução do pipeline"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.misses = 0
+
+    def miss(self):
+        with self._lock:
+            self.misses += 1
+            return self.misses
+
+
+def _process_min_misses():
+    try:
+        return max(1, int(os.environ.get('CHART_PROCESS_MIN_MISSES', DEFAULT_PROCESS_MIN_MISSES)))
+    except ValueError:
+        return DEFAULT_PROCESS_MIN_MISSES
+
+
+def _use_processes(misses):
+    """
+    Renderizar no pool de processos? Não na Vercel (cada invocação fria pagaria
+    o import do matplotlib nos filhos) nem com poucos gráficos sem cache,
+    a menos que o pool já esteja aquecido por uma execução anterior
+    """
+    if os.environ.get('VERCEL'):
+        return False
+    return _render_pool is not None or misses >= _process_min_misses()
+
+
+def _get_render_pool():
+    """
+    Pool de processos para a renderização (CPU), criado uma vez por processo
+    Os filhos nascem por 'spawn': o servidor e o bot já têm várias threads,
+    e um fork copiaria locks presos por elas (matplotlib, logging, cache do
+    GitHub). CHART_RENDER_PROCESSES=0 desativa; se o ambiente não suportar processos
+    (ex.: sem /dev/shm), cai para threads: a renderização empresta
+    figuras do pool de chart_templates, sem o estado global do pyplot
+    """
+    global _render_pool
+
+    with _render_pool_lock:
+        if _render_pool is not None:
+            return _render_pool
+
+        try:
+            processes = int(os.environ.get('CHART_RENDER_PROCESSES', min(2, os.cpu_count() or 1)))
+        except ValueError:
+            processes = 1
+
+        if processes > 0:
+            try:
+                _render_pool = ProcessPoolExecutor(max_workers=processes,
+                                                   mp_context=multiprocessing.get_context('spawn'))
+                return _render_pool
+            except (OSError, NotImplementedError) as e:
+                print(f"[PIPELINE] Pool de processos indisponível ({e}), renderizando em threads")
+
+        _render_pool = ThreadPoolExecutor(max_workers=max(1, processes))
+        return _render_pool
+
+
+_render_flight = single_flight('chart_pipeline_render')
+
+
+def _render_and_store(key, kind, payload, backend, in_process=False):
+    """Renderiza (svg e lotes pequenos na própria thread, o resto no pool de processos) e guarda no cache"""
+    if backend == 'svg' or not in_process:
+        data, encoding = _render_bytes(kind, payload, backend)
+    else:
+        data, encoding = _get_render_pool().submit(_render_bytes, kind, payload, backend).result()
+    if data is not None:
+        chart_cache.put(key, data)
+    return data, encoding
+
+
+def _run_job(job, upload_fn, run=None):
+    """Executa as três etapas de um gráfico, medindo cada uma"""
+    timings = {'name': job.name, 'cache_hit': False}
+
+    start = time.perf_counter()
+    payload, meta = job.fetch()
+    timings['fetch'] = round(time.perf_counter() - start, 3)
+
+    # Renderização: cache no processo pai, processo filho só em caso de miss
+    # e com misses suficientes no relatório (o backend svg é Python puro e
+    # barato, então roda sempre na própria thread)
+    start = time.perf_counter()
+    backend = get_chart_backend()
+    key = chart_key(job.kind, payload, backend)
+    data = chart_cache.get(key)
+    if data is not None:
+        timings['cache_hit'] = True
+    else:
+        in_process = _use_processes((run or _RunState()).miss())
+        timings['process'] = in_process
+        # Relatórios simultâneos com o mesmo gráfico esperam a mesma renderização
+        data, encoding = _render_flight.do(key, _render_and_store, key, job.kind, payload, backend, in_process)
+        if encoding:
+            timings['encode'] = round(encoding['encode_ms'] / 1000, 3)
+            timings['dpi'] = encoding.get('dpi')
+    timings['render'] = round(time.perf_counter() - start, 3)
+    if data is not None:
+        timings['bytes'] = len(data)
+
+    if data is None:
+        timings['ok'] = False
+        return timings, None, None
+
+    comment = job.comment(meta) if callable(job.comment) else job.comment
+
+    # Os bytes vão direto do cache para o upload (memoryview, sem cópia)
+    start = time.perf_counter()
+    handle = upload_fn(memoryview(data), job.filename, comment)
+    timings['ok'] = bool(handle)
+    timings['upload'] = round(time.perf_counter() - start, 3)
+
+    return timings, handle, comment
+
+
+def run_chart_pipeline(jobs, upload_fn, complete_fn=None):
+    """
+    Executa os gráficos em paralelo e retorna
+    {'total': segundos, 'jobs': [timings por gráfico, na ordem de `jobs`]}
+    `upload_fn(dados, filename, comment)` recebe um memoryview dos bytes e
+    deve retornar algo verdadeiro em caso de sucesso
+    Com `complete_fn`, o upload de cada gráfico só envia os bytes e retorna
+    um identificador; no fim, `complete_fn(identificadores, comentário)`
+    publica todos de uma vez, com os comentários dos gráficos unidos
+    """
+    start = time.perf_counter()
+    results = []
+    uploaded = []
+    run = _RunState()
+
+    with ThreadPoolExecutor(max_workers=max(1, len(jobs))) as executor:
+        futures = [executor.submit(_run_job, job, upload_fn, run) for job in jobs]
+
+        for job, future in zip(jobs, futures):
+            try:
+                timings, handle, comment = future.result()
+                results.append(timings)
+                if handle:
+                    uploaded.append((timings, handle, comment))
+            except Exception as e:
+                print(f"[PIPELINE] Erro no gráfico '{job.name}': {e}")
+                results.append({'name': job.name, 'ok': False, 'error': str(e)})
+
+    report = {'jobs': results}
+
+    if complete_fn is not None and uploaded:
+        complete_start = time.perf_counter()
+        comment = '\n\n'.join(c for _, _, c in uploaded if c)
+        ok = bool(complete_fn([handle for _, handle, _ in uploaded], comment))
+        for timings, _, _ in uploaded:
+            timings['ok'] = ok
+        report['complete'] = round(time.perf_counter() - complete_start, 3)
+
+    report['total'] = round(time.perf_counter() - start, 3)
+
+    _last_run.clear()
+    _last_run.update(report)
+    print(f"[PIPELINE] Concluído em {report['total']}s: {results}")
+
+    return report
+
+
+register_metrics('chart_pipeline', lambda: dict(_last_run))
@@ -0,0 +1,119 @@
+"""
+Figuras matplotlib reaproveitáveis por tipo de gráfico
+Usa a API orientada a objetos (Figure + FigureCanvasAgg) em vez do estado
+global do pyplot. As figuras, já criadas e estilizadas, ficam num pool por
+tipo de gráfico: cada renderização empresta uma (figure_template), limpa,
+redesenha e devolve. O servidor cria uma thread por requisição, então o
+pool não pode ser por thread. Ficam guardadas até CHART_TEMPLATE_POOL
+figuras livres por tipo (padrão 2); a métrica 'chart_templates' mostra
+quantas foram criadas e reaproveitadas
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+
+from .chart_encoding import encode_figure
+from .metrics import register_metrics
+
+# Estilo fixo de cada tipo de gráfico (tamanho, rótulos dos eixos e grade)
+CHART_STYLES = {
+    'commits_ranking': {'figsize': (12, 6), 'xlabel': 'Contribuidores',
+                        'ylabel': 'Número de Commits', 'grid': 'y'},
+    'commits_timeline': {'figsize': (14, 6), 'xlabel': 'Data',
+                         'ylabel': 'Número de Commits', 'grid': 'both'},
+    'trello_pie': {'figsize': (10, 8)},
+    'trello_cfd': {'figsize': (14, 6), 'xlabel': 'Data',
+                   'ylabel': 'Cards', 'grid': 'y'},
+    'issues_age': {'figsize': (12, 6), 'xlabel': 'Idade',
+                   'ylabel': 'Itens abertos', 'grid': 'y'},
+    'line_changes': {'figsize': (12, 6), 'xlabel': 'Contribuidores',
+                     'ylabel': 'Linhas', 'grid': 'y'}
+}
+
+DEFAULT_POOL_SIZE = 2
+
+_idle = {}
+_counts = {}
+_pool_lock = threading.Lock()
+
+
+class FigureTemplate:
+    """Figura + eixos de um tipo de gráfico, reutilizados entre renderizações"""
+
+    def __init__(self, kind):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        self.kind = kind
+        self.style = CHART_STYLES[kind]
+        self.figure = Figure(figsize=self.style['figsize'])
+        FigureCanvasAgg(self.figure)
+        self.ax = self.figure.add_subplot()
+        self.renders = 0
+
+        # tight_layout altera as margens; guardá-las permite voltar ao estado
+        # inicial, para que o resultado não dependa da renderização anterior
+        params = self.figure.subplotpars
+        self._margins = {name: getattr(params, name)
+                         for name in ('left', 'right', 'bottom', 'top', 'wspace', 'hspace')}
+
+    def reset(self):
+        """Limpa os eixos e reaplica o estilo fixo; retorna os eixos prontos"""
+        ax = self.ax
+        ax.clear()
+        self.figure.subplots_adjust(**self._margins)
+
+        if 'xlabel' in self.style:
+            ax.set_xlabel(self.style['xlabel'], fontsize=12, fontweight='bold')
+            ax.set_ylabel(self.style['ylabel'], fontsize=12, fontweight='bold')
+            ax.grid(axis=self.style['grid'], alpha=0.3)
+
+        return ax
+
+    def render(self):
+        """Codifica a figura atual (orçamento de bytes) e retorna o BytesIO"""
+        self.figure.tight_layout()
+
+        buf = encode_figure(self.figure, self.kind)
+        self.renders += 1
+
+        return buf
+
+
+def _pool_size():
+    try:
+        return max(0, int(os.environ.get('CHART_TEMPLATE_POOL', DEFAULT_POOL_SIZE)))
+    except ValueError:
+        return DEFAULT_POOL_SIZE
+
+
+@contextmanager
+def figure_template(kind):
+    """
+    Empresta um template de `kind` (criado se não houver um livre) e o
+    devolve ao pool no fim do bloco; um template é usado por uma thread por vez
+    """
+    with _pool_lock:
+        idle = _idle.setdefault(kind, [])
+        counts = _counts.setdefault(kind, {'created': 0, 'reused': 0})
+        template = idle.pop() if idle else None
+        counts['reused' if template else 'created'] += 1
+
+    if template is None:
+        template = FigureTemplate(kind)
+
+    try:
+        yield template
+    finally:
+        with _pool_lock:
+            if len(_idle[kind]) < _pool_size():
+                _idle[kind].append(template)
+
+
+def _snapshot():
+    with _pool_lock:
+        return {kind: dict(counts, idle=len(_idle[kind])) for kind, counts in _counts.items()}
+
+
+register_metrics('chart_templates', _snapshot)
@@ -0,0 +1,172 @@
+"""
+Cache de classificações de intenção
+Chave = texto normalizado (sem menções, caixa e acentos, espaços colapsados):
+"Listar cards", "listar  CARDS" e "<@U1> listar cards" reaproveitam a mesma
+resposta do LLM. LRU em memória com TTL e camada opcional em SQLite, que
+sobrevive a reinícios
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+from .metrics import register_metrics
+from .storage import get_cache_dir
+
+# Validade padrão de uma classificação (segundos) e entradas em memória
+DEFAULT_TTL = 24 * 3600
+DEFAULT_MAX_ENTRIES = 1024
+
+_MENTION_RE = re.compile(r'<[@#!][^>]*>')
+_SPACES_RE = re.compile(r'\s+')
+
+
+def normalize_text(text):
+    """Sem menções do Slack, casefold, sem acentos e com espaços colapsados"""
+    text = _MENTION_RE.sub(' ', text or '').casefold()
+    text = ''.join(ch for ch in unicodedata.normalize('NFKD', text) if not unicodedata.combining(ch))
+    return _SPACES_RE.sub(' ', text).strip()
+
+
+class ClassificationCache:
+    """LRU com TTL em memória + tabela SQLite opcional (mesmo TTL)"""
+
+    def __init__(self, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES, path=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path = path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if path:
+            try:
+                self._db = sqlite3.connect(path, check_same_thread=False)
+                self._db.execute(
+                    'CREATE TABLE IF NOT EXISTS classifications '
+                    '(key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)'
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"[INTENT CACHE] Camada em disco desativada: {e}")
+                self._db = None
+
+    @property
+    def enabled(self):
+        return self.ttl > 0 and self.max_entries > 0
+
+    def get(self, key):
+        """Classificação guardada para `key` (cópia nova), ou None"""
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                if now - stored_at <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return json.loads(value)
+                del self._entries[key]
+
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        'SELECT value, stored_at FROM classifications WHERE key = ?', (key,)
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    print(f"[INTENT CACHE] Erro ao ler do disco: {e}")
+                    row = None
+
+                if row is not None and now - row[1] <= self.ttl:
+                    self._remember(key, row[0], row[1])
+                    self.disk_hits += 1
+                    return json.loads(row[0])
+
+            self.misses += 1
+            return None
+
+    def _remember(self, key, value, stored_at):
+        self._entries[key] = (value, stored_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def put(self, key, classification):
+        """Guarda uma classificação (memória e, se configurado, disco)"""
+        if not self.enabled:
+            return
+
+        value = json.dumps(classification, ensure_ascii=False, separators=(',', ':'))
+        now = time.time()
+
+        with self._lock:
+            self._remember(key, value, now)
+
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        'INSERT OR REPLACE INTO classifications (key, value, stored_at) VALUES (?, ?, ?)',
+                        (key, value, now)
+                    )
+                    # Expiradas saem junto com as gravações (sem tarefa separada)
+                    self._db.execute('DELETE FROM classifications WHERE stored_at < ?', (now - self.ttl,))
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    print(f"[INTENT CACHE] Erro ao gravar em disco: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute('DELETE FROM classifications')
+                self._db.commit()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'disk': self._db is not None,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _create_cache():
+    # Camada em disco opcional: CLASSIFICATION_CACHE_PATH explícito ou CLASSIFICATION_CACHE_DISK=1
+    path = os.environ.get('CLASSIFICATION_CACHE_PATH')
+    if not path and os.environ.get('CLASSIFICATION_CACHE_DISK') == '1':
+        path = os.path.join(get_cache_dir(), 'classifications.sqlite')
+
+    return ClassificationCache(
+        ttl=_env_int('CLASSIFICATION_CACHE_TTL', DEFAULT_TTL),
+        max_entries=_env_int('CLASSIFICATION_CACHE_SIZE', DEFAULT_MAX_ENTRIES),
+        path=path
+    )
+
+
+classification_cache = _create_cache()
+register_metrics('classification_cache', classification_cache.snapshot)
@@ -0,0 +1,165 @@
+"""
+Motor de classificação compartilhado pelos dois pontos de entrada
+O webhook (intents planos, api/utils/intent_classifier.py) e o agente
+LangGraph (ações por MCP, intent_classifier_agent.py) montam cada um um
+ClassificationEngine: uma lista ordenada de backends (modelo local, regras,
+cache, LLM) em que o primeiro que responde vence, com coalescência de
+chamadas idênticas em andamento. Os backends baratos, o cache de
+classificações e o cliente HTTP da OpenAI são os mesmos nos dois caminhos,
+e o esquema comum abaixo converte intent plano <-> ações: o que um caminho
+classifica (e guarda) serve ao outro. A métrica 'classification_engine'
+mostra, por motor, quantas mensagens cada backend respondeu
+"""
+
+import copy
+import threading
+
+from .metrics import register_metrics
+from .singleflight import single_flight
+
+# Status da gramática de slots → lista do quadro
+STATUS_LISTS = {
+    'a fazer': 'A Fazer',
+    'em desenvolvimento': 'Em Desenvolvimento',
+    'revisão': 'Revisão de código',
+    'concluído': 'Concluído'
+}
+
+# Esquema comum: intent plano → (mcp, ação, parâmetros obrigatórios, opcionais)
+# Intents fora da tabela (estatísticas com gráfico, ajuda, saudação) não
+# têm ação equivalente no agente
+INTENT_ACTIONS = {
+    'github_commits': ('github', 'list_commits', (), ('limit',)),
+    'trello_create_card': ('trello', 'create_card', ('card_name',), ('target_list',)),
+    'trello_move_card': ('trello', 'move_card', ('card_name', 'target_list'), ()),
+    'trello_update_status': ('trello', 'move_card', ('card_name', 'status'), ()),
+    'trello_update_card': ('trello', 'update_card', ('card_name', 'new_name'), ()),
+    'trello_delete_card': ('trello', 'delete_card', ('card_name',), ()),
+    'trello_list_cards': ('trello', 'list_cards', (), ()),
+    'stats_general': ('query', 'get_status', (), ()),
+}
+
+# Caminho inverso: (mcp, ação) → intent plano (update_status é só de ida)
+ACTION_INTENTS = {
+    (mcp, action): intent
+    for intent, (mcp, action, _, _) in INTENT_ACTIONS.items()
+    if intent != 'trello_update_status'
+}
+
+
+def actions_for(classification):
+    """Ações do agente equivalentes a uma classificação plana, ou None"""
+    if not classification:
+        return None
+    mapping = INTENT_ACTIONS.get(classification.get('intent'))
+    if mapping is None:
+        return None
+
+    mcp, action, required, optional = mapping
+    params = classification.get('params') or {}
+    if not all(params.get(name) for name in required):
+        return None
+
+    parameters = {name: params[name] for name in required + optional if params.get(name) is not None}
+    if 'status' in parameters:
+        target_list = STATUS_LISTS.get(parameters.pop('status'))
+        if target_list is None:
+            return None
+        parameters['target_list'] = target_list
+
+    return [{'mcp': mcp, 'action': action, 'parameters': parameters, 'priority': 1}]
+
+
+def classification_for(result):
+    """Classificação plana equivalente ao resultado do agente (uma única ação), ou None"""
+    actions = (result or {}).get('actions') or []
+    if len(actions) != 1 or result.get('requires_confirmation'):
+        return None
+
+    action = actions[0]
+    intent = ACTION_INTENTS.get((action.get('mcp'), action.get('action')))
+    if intent is None:
+        return None
+
+    _, _, required, optional = INTENT_ACTIONS[intent]
+    parameters = action.get('parameters') or {}
+    if not all(parameters.get(name) for name in required):
+        return None
+
+    return {
+        'intent': intent,
+        'params': {name: parameters[name] for name in required + optional if parameters.get(name) is not None},
+        'confidence': result.get('confidence', 0)
+    }
+
+
+def to_agent_result(classification, source):
+    """Resultado no formato do agente para uma classificação plana com ações equivalentes"""
+    actions = actions_for(classification)
+    if actions is None:
+        return None
+
+    return {
+        'intent_type': 'query' if actions[0]['mcp'] == 'query' else 'action',
+        'confidence': classification.get('confidence', 0),
+        'actions': actions,
+        'reasoning': f"'{classification['intent']}' resolvido por {source}",
+        'requires_confirmation': False
+    }
+
+
+class ClassificationEngine:
+    """
+    Backends em ordem: (nome, função(texto) -> resultado ou None)
+    O primeiro resultado não nulo vence; o último backend costuma sempre
+    responder (LLM com fallback). Mensagens idênticas classificadas ao mesmo
+    tempo compartilham uma execução
+    """
+
+    def __init__(self, name, backends):
+        self.name = name
+        self.backends = list(backends)
+        self._flight = single_flight(name)
+        self._lock = threading.Lock()
+        self._answers = {backend_name: 0 for backend_name, _ in self.backends}
+        self.unanswered = 0
+
+    def classify(self, text):
+        # Chamadas coalescidas recebem o mesmo objeto: cada uma leva sua cópia
+        return copy.deepcopy(self._flight.do(text.strip(), self._run, text))
+
+    def _run(self, text):
+        for name, backend in self.backends:
+            result = backend(text)
+            if result is not None:
+                with self._lock:
+                    self._answers[name] += 1
+                return result
+
+        with self._lock:
+            self.unanswered += 1
+        return None
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._answers, unanswered=self.unanswered)
+
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def register_engine(engine):
+    """Torna o motor visível na métrica 'classification_engine'"""
+    with _engines_lock:
+        _engines[engine.name] = engine
+    return engine
+
+
+def _snapshot():
+    with _engines_lock:
+        engines = list(_engines.values())
+    return {engine.name: engine.snapshot() for engine in engines}
+
+
+register_metrics('classification_engine', _snapshot)
@@ -0,0 +1,138 @@
+"""
+Detalhes por commit (linhas adicionadas/removidas e arquivos alterados)
+Um commit nunca muda depois de criado, então o detalhe de cada SHA é
+guardado para sempre: só SHAs nunca vistos vão à rede
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .github_api import github_get, get_max_workers
+from .metrics import register_metrics
+from .storage import get_cache_dir, load_json, save_json
+
+
+class CommitDetailCache:
+    """
+    Cache permanente endereçado pelo SHA do commit
+    Memória + disco (<PMO_CACHE_DIR>/commits/<sha[:2]>/<sha>.json)
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or get_cache_dir('commits')
+        self._memory = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, sha):
+        return os.path.join(self.directory, sha[:2], f'{sha}.json')
+
+    def get(self, sha):
+        """Retorna o detalhe guardado ou None"""
+        with self._lock:
+            detail = self._memory.get(sha)
+
+        if detail is None:
+            detail = load_json(self._path(sha))
+            if detail is not None:
+                with self._lock:
+                    self._memory[sha] = detail
+
+        with self._lock:
+            if detail is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        return detail
+
+    def put(self, sha, detail):
+        """Guarda o detalhe de um commit (imutável, sem expiração)"""
+        with self._lock:
+            self._memory[sha] = detail
+
+        path = self._path(sha)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        save_json(path, detail)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'in_memory': len(self._memory),
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_commit_detail_cache():
+    """Instância compartilhada do cache de detalhes"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = CommitDetailCache()
+            register_metrics('commit_details', _cache.snapshot)
+        return _cache
+
+
+def fetch_commit_detail(github_token, github_repo, sha):
+    """Busca /commits/{sha} e reduz aos campos usados nas estatísticas"""
+    # O próprio cache por SHA substitui o cache de respostas do cliente
+    commit = github_get(f'/repos/{github_repo}/commits/{sha}', github_token, cache=False)
+    stats = commit.get('stats') or {}
+
+    return {
+        'sha': sha,
+        'repository': github_repo,
+        'author': commit['commit']['author']['name'],
+        'date': commit['commit']['author']['date'],
+        'additions': stats.get('additions', 0),
+        'deletions': stats.get('deletions', 0),
+        'files_changed': len(commit.get('files') or [])
+    }
+
+
+def fetch_commit_details(github_token, commits, max_workers=None):
+    """
+    Retorna {sha: detalhe} para a lista de commits (como vêm de fetch_commits_multi)
+    Detalhes já conhecidos saem do cache; os demais são buscados em paralelo
+    num pool limitado e gravados no cache
+    """
+    cache = get_commit_detail_cache()
+    details = {}
+    missing = []
+
+    for commit in commits:
+        sha = commit['sha']
+        detail = cache.get(sha)
+        if detail is None:
+            missing.append((commit.get('repository'), sha))
+        else:
+            details[sha] = detail
+
+    if missing:
+        print(f"[COMMITS] Buscando detalhes de {len(missing)} commits novos "
+              f"({len(details)} já em cache)")
+
+        def fetch(item):
+            repo, sha = item
+            try:
+                detail = fetch_commit_detail(github_token, repo, sha)
+                cache.put(sha, detail)
+                return sha, detail
+            except Exception as e:
+                print(f"[COMMITS] Erro ao buscar detalhes de {sha[:7]}: {e}")
+                return sha, None
+
+        workers = min(max_workers or get_max_workers(), len(missing))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for sha, detail in executor.map(fetch, missing):
+                if detail is not None:
+                    details[sha] = detail
+
+    return details
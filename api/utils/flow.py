@@ -0,0 +1,495 @@
+"""
+Análise de fluxo do Trello a partir do histórico de ações do quadro
+Cada ação (criação, movimentação, arquivamento) abre ou fecha um intervalo
+"card X esteve na lista L de t0 a t1". Os intervalos não ficam guardados:
+viram deltas diários por lista (o CFD é a soma acumulada) e um histograma
+de permanência por lista; por card resta só o estado atual e as datas de
+início/conclusão, usadas no tempo de ciclo.
+A primeira sincronização percorre o histórico do mais novo ao mais antigo,
+uma página por vez (parâmetro `before`); as seguintes aplicam só as ações
+novas (`since`). A memória cresce com cards e dias, não com o número de ações
+"""
+
+import os
+import re
+import threading
+import time
+
+import numpy as np
+
+from .aggregation import encode_categories
+from .metrics import register_metrics
+from .storage import get_cache_dir, load_json, save_json
+from .trello_api import trello_get
+from .windows import get_timezone, timezone_name, today, local_dates
+
+# Ações que mudam a lista de um card
+ACTION_FILTER = ','.join([
+    'createCard', 'copyCard', 'convertToCardFromCheckItem', 'moveCardToBoard',
+    'updateCard:idList', 'updateCard:closed', 'moveCardFromBoard', 'deleteCard'
+])
+
+# Maior página aceita pela API de ações
+PAGE_SIZE = 1000
+
+# Listas de "concluído" e de "ainda não iniciado" (nomes; regex, sem diferenciar caixa)
+DEFAULT_DONE_LISTS = r'conclu|done|feito|finaliz|entregue'
+DEFAULT_BACKLOG_LISTS = r'backlog|to ?do|a fazer|pendente|ideia'
+
+# Faixas do histograma de permanência (horas): 0 e 96 faixas geométricas de
+# 15 min a ~4 anos; percentis saem com erro relativo abaixo de ~15%
+DURATION_EDGES = np.concatenate(([0.0], np.geomspace(0.25, 24 * 365 * 4, 96)))
+
+DEFAULT_SYNC_INTERVAL = 60
+
+_ONE_DAY = np.timedelta64(1, 'D')
+
+
+def _list_pattern(env_name, default):
+    names = [n.strip() for n in os.environ.get(env_name, '').split(',') if n.strip()]
+    if names:
+        return re.compile('|'.join(f'^{re.escape(n)}$' for n in names), re.IGNORECASE)
+    return re.compile(default, re.IGNORECASE)
+
+
+def _sync_interval():
+    try:
+        return int(os.environ.get('ROLLUP_SYNC_INTERVAL', DEFAULT_SYNC_INTERVAL))
+    except ValueError:
+        return DEFAULT_SYNC_INTERVAL
+
+
+def _action_event(action):
+    """
+    Normaliza uma ação em (card, instante, lista anterior, lista nova)
+    Listas None significam "fora do quadro"; retorna None para ações sem efeito
+    """
+    data = action.get('data', {})
+    card = data.get('card', {}).get('id')
+    if not card:
+        return None
+
+    at = action['date'][:19]
+    kind = action['type']
+    list_id = (data.get('list') or {}).get('id')
+
+    if kind == 'updateCard':
+        if 'listAfter' in data:
+            return card, at, data['listBefore']['id'], data['listAfter']['id']
+        if 'closed' in data.get('old', {}):
+            if data['card'].get('closed'):
+                return card, at, list_id, None
+            return card, at, None, list_id
+        return None
+
+    if kind in ('moveCardFromBoard', 'deleteCard'):
+        return card, at, list_id, None
+
+    # Criação, cópia, conversão ou chegada de outro quadro
+    return card, at, None, list_id
+
+
+class _Deltas:
+    """Acumula eventos de uma página e os incorpora de uma vez (vetorizado)"""
+
+    def __init__(self):
+        self.cfd = []         # (lista, instante, +1/-1)
+        self.durations = []   # (lista, início, fim)
+
+    def enter(self, list_id, at):
+        self.cfd.append((list_id, at, 1))
+
+    def leave(self, list_id, at, since=None):
+        """Saída da lista; com `since` (entrada conhecida), conta a permanência"""
+        self.cfd.append((list_id, at, -1))
+        if since is not None:
+            self.durations.append((list_id, since, at))
+
+    def stay(self, list_id, start, end, exact=True):
+        self.enter(list_id, start)
+        self.leave(list_id, end, start if exact else None)
+
+
+class FlowTracker:
+    """
+    Estado de fluxo de um quadro
+    - cards: {card: {'list', 'since', 'exact', 'start', 'done'}}
+    - cfd: {lista: {dia: variação}}, no fuso PMO_TIMEZONE
+    - durations: {lista: contagens por faixa de DURATION_EDGES}
+    """
+
+    def __init__(self, board_id, path=None):
+        self.board_id = board_id
+        self.path = path or os.path.join(get_cache_dir('flow'), board_id + '.json')
+        self._lock = threading.Lock()
+        self.synced_at = 0
+        self.actions_seen = 0
+
+        data = load_json(self.path, {}) or {}
+        if data.get('timezone', 'UTC') != timezone_name():
+            data = {}
+
+        self.cursor = data.get('cursor')
+        self.oldest = data.get('oldest')
+        self.lists = data.get('lists', {})
+        self.list_order = data.get('list_order', [])
+        self.cards = data.get('cards', {})
+        self.cfd = data.get('cfd', {})
+        self.durations = {k: np.asarray(v, dtype=np.int64) for k, v in data.get('durations', {}).items()}
+
+    # -- sincronização -------------------------------------------------
+
+    def sync(self, api_key, token, force=False):
+        """Incorpora as ações novas; retorna quantas foram processadas"""
+        with self._lock:
+            if not force and time.time() - self.synced_at < _sync_interval():
+                return 0
+
+            lists = trello_get(f'/boards/{self.board_id}/lists', api_key, token,
+                               {'filter': 'all', 'fields': 'name,closed'})
+            self.lists.update({lst['id']: lst['name'] for lst in lists})
+            self.list_order = [lst['id'] for lst in lists if not lst.get('closed')]
+
+            if self.cursor is None:
+                try:
+                    processed = self._backfill(api_key, token)
+                except Exception:
+                    # Carga inicial incompleta não pode virar base das incrementais
+                    self._reset()
+                    raise
+            else:
+                processed = self._catch_up(api_key, token)
+
+            self.synced_at = time.time()
+            self.actions_seen += processed
+            if processed or not os.path.exists(self.path):
+                self._save()
+
+            print(f"[FLOW] {self.board_id}: {processed} ações processadas ({len(self.cards)} cards)")
+            return processed
+
+    def _pages(self, api_key, token, since=None):
+        """Páginas de ações, da mais nova para a mais antiga"""
+        params = {'filter': ACTION_FILTER, 'limit': PAGE_SIZE, 'fields': 'id,type,date,data'}
+        if since:
+            params['since'] = since
+
+        before = None
+        while True:
+            page = trello_get(f'/boards/{self.board_id}/actions', api_key, token,
+                              dict(params, before=before) if before else params)
+            if page:
+                yield page
+            if len(page) < PAGE_SIZE:
+                break
+            before = page[-1]['id']
+
+    def _backfill(self, api_key, token):
+        """
+        Primeira carga: percorre o histórico de trás para frente
+        Ao ver a ação de um card em t, a próxima ação dele (já vista) diz até
+        quando ele ficou na lista de destino
+        """
+        next_at = {}      # card -> instante da ação seguinte (já processada)
+        pending = {}      # card -> lista em que estava antes da ação mais antiga vista
+        resolved = set()  # cards cuja última lista no quadro já é conhecida
+        done_pattern = _list_pattern('TRELLO_DONE_LISTS', DEFAULT_DONE_LISTS)
+        backlog_pattern = _list_pattern('TRELLO_BACKLOG_LISTS', DEFAULT_BACKLOG_LISTS)
+
+        self._reset()
+        processed = 0
+        newest = None
+        oldest = None
+
+        for page in self._pages(api_key, token):
+            newest = newest or page[0]['id']
+            deltas = _Deltas()
+
+            for action in page:
+                self._remember_lists(action)
+                event = _action_event(action)
+                oldest = action['date'][:19]
+                processed += 1
+                if event is None:
+                    continue
+
+                card, at, before, after = event
+                state = self.cards.get(card)
+
+                if state is None:
+                    # Ação mais recente do card: define onde ele está agora
+                    state = self.cards[card] = self._new_state(after, at if after else None)
+                    if after is not None:
+                        deltas.enter(after, at)
+                elif after is not None:
+                    deltas.stay(after, at, next_at[card])
+
+                if after is not None:
+                    # A última lista em que o card esteve decide se ele está concluído
+                    if card not in resolved:
+                        resolved.add(card)
+                        if self._is(done_pattern, after):
+                            state['done'] = at
+                    # Percorrendo para trás, fica a entrada mais antiga em trabalho
+                    if not self._is(backlog_pattern, after):
+                        state['start'] = at
+
+                next_at[card] = at
+                pending[card] = before
+
+            self._apply(deltas)
+
+        self.cursor = newest
+        self.oldest = oldest or f'{today()}T00:00:00'
+
+        # Antes da ação mais antiga de cada card, ele estava em `before`
+        # desde algum ponto anterior ao histórico (intervalo truncado)
+        deltas = _Deltas()
+        for card, before in pending.items():
+            if before is not None:
+                deltas.stay(before, self.oldest, next_at[card], exact=False)
+
+        # Cards atuais sem ação no histórico estão na lista desde antes dele
+        board_cards = trello_get(f'/boards/{self.board_id}/cards', api_key, token, {'fields': 'idList'})
+        for card in board_cards:
+            state = self.cards.get(card['id'])
+            if state is None or state['list'] is None:
+                self.cards[card['id']] = self._new_state(card['idList'], self.oldest, exact=False)
+                deltas.enter(card['idList'], self.oldest)
+
+        self._apply(deltas)
+        self._prune()
+        return processed
+
+    def _catch_up(self, api_key, token):
+        """Sincronizações seguintes: aplica as ações novas em ordem cronológica"""
+        events = []
+        newest = None
+
+        for page in self._pages(api_key, token, since=self.cursor):
+            newest = newest or page[0]['id']
+            for action in page:
+                if action['id'] == self.cursor:
+                    continue
+                self._remember_lists(action)
+                event = _action_event(action)
+                if event is not None:
+                    events.append(event)
+
+        if newest is None:
+            return 0
+
+        done_pattern = _list_pattern('TRELLO_DONE_LISTS', DEFAULT_DONE_LISTS)
+        backlog_pattern = _list_pattern('TRELLO_BACKLOG_LISTS', DEFAULT_BACKLOG_LISTS)
+        deltas = _Deltas()
+
+        for card, at, _, after in reversed(events):
+            state = self.cards.setdefault(card, self._new_state(None, None))
+
+            if state['list'] is not None:
+                deltas.leave(state['list'], at, state['since'] if state['exact'] else None)
+
+            if after is None:
+                state.update({'list': None, 'since': None})
+                continue
+
+            deltas.enter(after, at)
+            state.update({'list': after, 'since': at, 'exact': True})
+            if not state['start'] and not self._is(backlog_pattern, after):
+                state['start'] = at
+            if self._is(done_pattern, after):
+                state['done'] = at
+            else:
+                state['done'] = None
+
+        self._apply(deltas)
+        self.cursor = newest
+        self._prune()
+        return len(events)
+
+    def _remember_lists(self, action):
+        data = action.get('data', {})
+        for key in ('list', 'listBefore', 'listAfter'):
+            lst = data.get(key)
+            if lst and lst.get('id') and lst.get('name'):
+                self.lists.setdefault(lst['id'], lst['name'])
+
+    def _is(self, pattern, list_id):
+        return bool(pattern.search(self.lists.get(list_id, '')))
+
+    def _reset(self):
+        self.cursor = None
+        self.oldest = None
+        self.cards = {}
+        self.cfd = {}
+        self.durations = {}
+
+    @staticmethod
+    def _new_state(list_id, since, exact=True):
+        return {'list': list_id, 'since': since, 'exact': exact, 'start': None, 'done': None}
+
+    def _prune(self):
+        """Cards fora do quadro e nunca concluídos não servem mais a nenhum relatório"""
+        for card in [c for c, s in self.cards.items() if s['list'] is None and not s['done']]:
+            del self.cards[card]
+
+    def _apply(self, deltas):
+        """Incorpora os eventos acumulados: CFD por (lista, dia) e histograma de permanência"""
+        tz = get_timezone()
+
+        if deltas.cfd:
+            lists, stamps, signs = zip(*deltas.cfd)
+            labels, codes = encode_categories(lists)
+            days = local_dates(np.array(stamps, dtype='datetime64[s]'), tz).astype(np.int64)
+
+            # Uma chave por (lista, dia) e uma soma por chave
+            first_day = days.min()
+            span = days.max() - first_day + 1
+            unique, inverse = np.unique(codes * span + (days - first_day), return_inverse=True)
+            sums = np.bincount(inverse, weights=np.array(signs, dtype=np.float64))
+
+            for key, total in zip(unique.tolist(), sums.astype(np.int64).tolist()):
+                if total:
+                    list_id = labels[key // span]
+                    day = str(np.datetime64(int(first_day + key % span), 'D'))
+                    by_day = self.cfd.setdefault(list_id, {})
+                    by_day[day] = by_day.get(day, 0) + total
+
+        if deltas.durations:
+            lists, starts, ends = zip(*deltas.durations)
+            labels, codes = encode_categories(lists)
+            hours = (np.array(ends, dtype='datetime64[s]') - np.array(starts, dtype='datetime64[s]')
+                     ).astype(np.int64) / 3600.0
+            bins = np.searchsorted(DURATION_EDGES, np.maximum(hours, 0), side='right') - 1
+            size = len(DURATION_EDGES)
+            counts = np.bincount(codes * size + bins, minlength=len(labels) * size).reshape(-1, size)
+
+            for list_id, row in zip(labels, counts):
+                current = self.durations.get(list_id)
+                self.durations[list_id] = row if current is None else current + row
+
+    def _save(self):
+        save_json(self.path, {
+            'board_id': self.board_id,
+            'timezone': timezone_name(),
+            'cursor': self.cursor,
+            'oldest': self.oldest,
+            'lists': self.lists,
+            'list_order': self.list_order,
+            'cards': self.cards,
+            'cfd': self.cfd,
+            'durations': {k: v.tolist() for k, v in self.durations.items()}
+        })
+
+    # -- consultas -----------------------------------------------------
+
+    def cumulative_flow(self, days):
+        """
+        Cards por lista ao fim de cada um dos últimos `days` dias
+        Retorna (datas 'YYYY-MM-DD', [(nome da lista, contagens)]) na ordem do
+        quadro; listas arquivadas só aparecem se tiveram cards no período
+        """
+        with self._lock:
+            cfd = {list_id: dict(by_day) for list_id, by_day in self.cfd.items()}
+            order = list(self.list_order)
+            names = dict(self.lists)
+
+        end = today()
+        start = end - (days - 1) * _ONE_DAY
+        dates = start + np.arange(days) * _ONE_DAY
+
+        series = []
+        for list_id in order + sorted(set(cfd) - set(order)):
+            by_day = cfd.get(list_id, {})
+            if by_day:
+                offsets = (np.array(list(by_day), dtype='datetime64[D]') - start) / _ONE_DAY
+                offsets = offsets.astype(np.int64)
+                # Tudo o que aconteceu antes da janela entra no primeiro dia
+                counts = np.cumsum(np.bincount(np.clip(offsets, 0, None),
+                                               weights=np.array(list(by_day.values()), dtype=np.float64),
+                                               minlength=days)[:days]).astype(np.int64)
+            else:
+                counts = np.zeros(days, dtype=np.int64)
+
+            if list_id in order or counts.any():
+                series.append((names.get(list_id, list_id), counts.tolist()))
+
+        return dates.astype(str).tolist(), series
+
+    def cycle_times(self, days=None):
+        """Tempo de ciclo (dias) dos cards concluídos nos últimos `days` dias (todos se None)"""
+        with self._lock:
+            pairs = [(s['start'], s['done']) for s in self.cards.values() if s['start'] and s['done']]
+
+        if not pairs:
+            return np.empty(0)
+
+        starts, dones = (np.array(col, dtype='datetime64[s]') for col in zip(*pairs))
+        keep = dones >= starts
+        if days:
+            cutoff = (today() - (days - 1) * _ONE_DAY).astype('datetime64[s]')
+            keep &= dones >= cutoff
+
+        return (dones[keep] - starts[keep]).astype(np.int64) / 86400.0
+
+    def time_in_list(self, qs=(50, 85)):
+        """{nome da lista: {'count', percentis em horas}} a partir dos histogramas"""
+        with self._lock:
+            durations = {k: v.copy() for k, v in self.durations.items()}
+            order = list(self.list_order)
+            names = dict(self.lists)
+
+        result = {}
+        for list_id in order + sorted(set(durations) - set(order)):
+            hist = durations.get(list_id)
+            if hist is None or not hist.sum():
+                continue
+            entry = {'count': int(hist.sum())}
+            entry.update({q: histogram_percentile(hist, q) for q in qs})
+            result[names.get(list_id, list_id)] = entry
+
+        return result
+
+    def snapshot(self):
+        with self._lock:
+            return {'cards': len(self.cards), 'lists': len(self.cfd), 'cursor': self.cursor,
+                    'oldest': self.oldest, 'actions_seen': self.actions_seen,
+                    'synced_at': self.synced_at}
+
+
+def histogram_percentile(hist, q):
+    """Percentil `q` (horas) de um histograma sobre DURATION_EDGES, interpolado na faixa"""
+    cumulative = np.cumsum(hist)
+    target = q / 100.0 * cumulative[-1]
+    i = int(np.searchsorted(cumulative, target))
+    if i >= len(DURATION_EDGES) - 1:
+        return round(float(DURATION_EDGES[-1]), 1)
+
+    below = cumulative[i - 1] if i else 0
+    fraction = (target - below) / hist[i] if hist[i] else 0.0
+    low, high = DURATION_EDGES[i], DURATION_EDGES[i + 1]
+    return round(float(low + fraction * (high - low)), 1)
+
+
+_trackers = {}
+_trackers_lock = threading.Lock()
+
+
+def get_flow_tracker(board_id):
+    """Estado de fluxo em memória por quadro (reaproveitado entre requisições)"""
+    with _trackers_lock:
+        if board_id not in _trackers:
+            _trackers[board_id] = FlowTracker(board_id)
+        return _trackers[board_id]
+
+
+def sync_flow(api_key, token, board_id):
+    """Sincroniza (se preciso) e retorna o estado de fluxo do quadro"""
+    tracker = get_flow_tracker(board_id)
+    tracker.sync(api_key, token)
+    return tracker
+
+
+register_metrics('flow', lambda: {
+    board: tracker.snapshot() for board, tracker in list(_trackers.items())
+})
@@ -0,0 +1,352 @@
+"""
+Cliente GitHub compartilhado
+Centraliza as chamadas à API do GitHub e a busca concorrente em vários repositórios
+"""
+
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+import urllib.parse
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from .metrics import register_metrics
+from .singleflight import single_flight
+
+GITHUB_API_URL = 'https://api.github.com'
+
+# Limite padrão de requisições simultâneas ao GitHub
+DEFAULT_MAX_WORKERS = 8
+
+# Cache de respostas: TTL base (segundos) e número máximo de URLs guardadas
+DEFAULT_CACHE_TTL = 60
+CACHE_MAX_ENTRIES = 256
+
+# Abaixo desta fração da cota, o TTL do cache passa a ser ampliado
+DEFAULT_BUDGET_LOW = 0.2
+# Fator máximo de ampliação do TTL quando a cota está quase no fim
+MAX_TTL_MULTIPLIER = 30
+
+
+def _env_float(name, default):
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+class RateLimitBudget:
+    """
+    Acompanha a cota da API do GitHub a partir dos headers X-RateLimit-*
+    de todas as respostas e decide quanto o cache pode envelhecer
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.limit = None
+        self.remaining = None
+        self.reset_at = None
+        self.updated_at = None
+        self.requests = 0
+        self.cache_hits = 0
+        self.revalidated = 0
+        self.stale_served = 0
+        self.rate_limited = 0
+
+    def record(self, headers):
+        """Registra a cota informada pelos headers de uma resposta"""
+        if headers is None:
+            return
+
+        remaining = headers.get('X-RateLimit-Remaining')
+        if remaining is None:
+            return
+
+        with self._lock:
+            try:
+                self.remaining = int(remaining)
+                self.limit = int(headers.get('X-RateLimit-Limit', self.limit or 0)) or None
+                self.reset_at = int(headers.get('X-RateLimit-Reset', self.reset_at or 0)) or None
+                self.updated_at = time.time()
+            except (TypeError, ValueError):
+                pass
+
+    def count(self, event):
+        """Incrementa um contador (requests, cache_hits, stale_served...)"""
+        with self._lock:
+            setattr(self, event, getattr(self, event) + 1)
+
+    def fraction_left(self):
+        """Fração da cota ainda disponível (1.0 quando desconhecida)"""
+        if self.remaining is None or not self.limit:
+            return 1.0
+        if self.reset_at and time.time() >= self.reset_at:
+            return 1.0  # Janela já renovada
+        return max(0.0, self.remaining / self.limit)
+
+    def is_exhausted(self):
+        """True se a cota acabou e a janela ainda não foi renovada"""
+        return self.fraction_left() <= 0.0
+
+    def ttl_multiplier(self):
+        """
+        Fator aplicado ao TTL do cache: 1 com cota folgada, crescendo
+        linearmente até MAX_TTL_MULTIPLIER conforme a cota se esgota
+        """
+        low = _env_float('GITHUB_BUDGET_LOW', DEFAULT_BUDGET_LOW)
+        fraction = self.fraction_left()
+
+        if low <= 0 or fraction >= low:
+            return 1.0
+        return 1.0 + (low - fraction) / low * (MAX_TTL_MULTIPLIER - 1)
+
+    def snapshot(self):
+        """Estado atual para a superfície de métricas"""
+        with self._lock:
+            return {
+                'limit': self.limit,
+                'remaining': self.remaining,
+                'reset_at': self.reset_at,
+                'seconds_to_reset': max(0, int(self.reset_at - time.time())) if self.reset_at else None,
+                'fraction_left': round(self.fraction_left(), 3),
+                'ttl_multiplier': round(self.ttl_multiplier(), 2),
+                'requests': self.requests,
+                'cache_hits': self.cache_hits,
+                'revalidated': self.revalidated,
+                'stale_served': self.stale_served,
+                'rate_limited': self.rate_limited
+            }
+
+
+# Orçamento compartilhado por todos os chamadores do GitHub no processo
+rate_limit_budget = RateLimitBudget()
+register_metrics('github_rate_limit', rate_limit_budget.snapshot)
+
+# Cache de respostas: (url, token) -> {'data', 'etag', 'fetched_at'}
+_response_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def github_headers(github_token):
+    """Monta os headers padrão das chamadas ao GitHub"""
+    headers = {
+        'Accept': 'application/vnd.github.v3+json',
+        'User-Agent': 'PMO-Bot'
+    }
+
+    if github_token:
+        headers['Authorization'] = f'token {github_token}'
+
+    return headers
+
+
+def _is_rate_limit_error(error):
+    """403/429 causado por cota esgotada (e não por falta de permissão)"""
+    if error.code == 429:
+        return True
+    return error.code == 403 and error.headers.get('X-RateLimit-Remaining') == '0'
+
+
+def _cache_store(key, data, etag):
+    with _cache_lock:
+        _response_cache[key] = {'data': data, 'etag': etag, 'fetched_at': time.time()}
+        _response_cache.move_to_end(key)
+        while len(_response_cache) > CACHE_MAX_ENTRIES:
+            _response_cache.popitem(last=False)
+
+
+def github_get(path, github_token, params=None, timeout=30, max_age=None, cache=True):
+    """
+    Faz um GET na API do GitHub e retorna o JSON decodificado
+    `path` pode ser relativo (/repos/...) ou uma URL completa
+
+    As respostas ficam em cache por `max_age` segundos (GITHUB_CACHE_TTL),
+    prazo que é ampliado automaticamente quando a cota está baixa. Entradas
+    vencidas são revalidadas por ETag (304 não consome cota) e, se a cota
+    estiver esgotada, o dado antigo é servido no lugar de falhar.
+    Com `cache=False` a resposta não é guardada (útil para dados que o
+    chamador já armazena por conta própria), mas a cota continua sendo medida.
+    """
+    url = path if path.startswith('http') else f'{GITHUB_API_URL}{path}'
+
+    if params:
+        url += ('&' if '?' in url else '?') + urllib.parse.urlencode(params)
+
+    if max_age is None:
+        max_age = _env_float('GITHUB_CACHE_TTL', DEFAULT_CACHE_TTL)
+
+    key = (url, github_token)
+    with _cache_lock:
+        cached = _response_cache.get(key) if cache else None
+
+    if cached:
+        age = time.time() - cached['fetched_at']
+        if age < max_age * rate_limit_budget.ttl_multiplier():
+            rate_limit_budget.count('cache_hits')
+            return cached['data']
+
+        if rate_limit_budget.is_exhausted():
+            print(f"[GITHUB] Cota esgotada, servindo dado em cache ({int(age)}s): {url}")
+            rate_limit_budget.count('stale_served')
+            return cached['data']
+
+    # Buscas idênticas simultâneas (mesma URL e token) compartilham uma requisição
+    return _flight.do(key, _fetch, url, github_token, key, cached, timeout, cache)
+
+
+_flight = single_flight('github_get')
+
+
+def _fetch(url, github_token, key, cached, timeout, cache):
+    """Requisição (ou revalidação por ETag) de uma entrada ausente ou vencida do cache"""
+    headers = github_headers(github_token)
+    if cached and cached.get('etag'):
+        headers['If-None-Match'] = cached['etag']
+
+    req = urllib.request.Request(url, headers=headers)
+    rate_limit_budget.count('requests')
+
+    try:
+        response = urllib.request.urlopen(req, timeout=timeout)
+    except urllib.error.HTTPError as e:
+        rate_limit_budget.record(e.headers)
+
+        if e.code == 304 and cached:
+            rate_limit_budget.count('revalidated')
+            _cache_store(key, cached['data'], cached['etag'])
+            return cached['data']
+
+        if _is_rate_limit_error(e):
+            rate_limit_budget.count('rate_limited')
+            if cached:
+                print(f"[GITHUB] Limite de requisições atingido, servindo dado em cache: {url}")
+                rate_limit_budget.count('stale_served')
+                return cached['data']
+        raise
+
+    rate_limit_budget.record(response.headers)
+    data = json.loads(response.read())
+    if cache:
+        _cache_store(key, data, response.headers.get('ETag'))
+
+    return data
+
+
+def get_max_workers():
+    """Tamanho do pool de requisições (GITHUB_MAX_WORKERS)"""
+    try:
+        return max(1, int(os.environ.get('GITHUB_MAX_WORKERS', DEFAULT_MAX_WORKERS)))
+    except ValueError:
+        return DEFAULT_MAX_WORKERS
+
+
+def list_org_repos(github_token, org):
+    """Lista todos os repositórios (não arquivados) de uma organização"""
+    repos = []
+    page = 1
+
+    while True:
+        batch = github_get(f'/orgs/{org}/repos', github_token,
+                           {'per_page': 100, 'page': page, 'type': 'all'})
+        repos.extend(r['full_name'] for r in batch if not r.get('archived'))
+
+        if len(batch) < 100:
+            break
+        page += 1
+
+    return repos
+
+
+def parse_repo_list(value):
+    """Converte 'a/b, c/d' ou lista em lista de repositórios sem duplicatas"""
+    if not value:
+        return []
+
+    if isinstance(value, str):
+        value = value.split(',')
+
+    repos = []
+    for repo in value:
+        repo = repo.strip()
+        if repo and repo != 'owner/repo' and repo not in repos:
+            repos.append(repo)
+
+    return repos
+
+
+def resolve_github_repos(github_token=None):
+    """
+    Resolve a lista de repositórios configurados
+    Prioridade: GITHUB_REPOS (lista separada por vírgula) > GITHUB_ORG > GITHUB_REPO
+    """
+    repos = parse_repo_list(os.environ.get('GITHUB_REPOS'))
+    if repos:
+        return repos
+
+    org = os.environ.get('GITHUB_ORG')
+    if org:
+        try:
+            repos = list_org_repos(github_token, org)
+            if repos:
+                return repos
+        except Exception as e:
+            print(f"[GITHUB] Erro ao listar repositórios da organização {org}: {e}")
+
+    return parse_repo_list(os.environ.get('GITHUB_REPO'))
+
+
+def format_repo_label(repos):
+    """Nome amigável para relatórios e títulos de gráficos"""
+    repos = parse_repo_list(repos)
+
+    if len(repos) == 1:
+        return repos[0]
+    if len(repos) <= 3:
+        return ', '.join(repos)
+    return f'{len(repos)} repositórios'
+
+
+def fetch_repo_commits(github_token, github_repo, limit=100):
+    """Busca os últimos commits de um repositório, anotando o repositório de origem"""
+    commits = github_get(f'/repos/{github_repo}/commits', github_token, {'per_page': limit})
+
+    # Cópias rasas: a lista de github_get fica no cache compartilhado
+    return [{**commit, 'repository': github_repo} for commit in commits]
+
+
+def fetch_commits_multi(github_token, repos, limit=100, max_workers=None):
+    """
+    Busca commits de vários repositórios em paralelo (pool limitado)
+    Retorna (commits, errors) com os commits de todos os repositórios
+    ordenados do mais recente para o mais antigo
+    """
+    repos = parse_repo_list(repos)
+    if not repos:
+        return [], {}
+
+    workers = min(max_workers or get_max_workers(), len(repos))
+    commits = []
+    errors = {}
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            repo: executor.submit(fetch_repo_commits, github_token, repo, limit)
+            for repo in repos
+        }
+
+        for repo, future in futures.items():
+            try:
+                commits.extend(future.result())
+            except Exception as e:
+                print(f"[GITHUB] Erro ao buscar commits de {repo}: {e}")
+                errors[repo] = e
+
+    # Se todos os repositórios falharam, propagar o primeiro erro
+    if errors and len(errors) == len(repos):
+        raise next(iter(errors.values()))
+
+    commits.sort(key=lambda c: c['commit']['author']['date'], reverse=True)
+    return commits, errors
@@ -3,245 +3,219 @@ Intent Classifier para processar linguagem natural
 Adaptado para Vercel Serverless Functions
 """
 
+import copy
 import json
 import os
-import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 
-def classify_intent(text):
-    """
-    Classifica a intenção do usuário a partir do texto
-    Retorna: { 'intent': str, 'params': dict }
-    """
-    text_lower = text.lower()
-    
-    # Remover menção ao bot
-    text_lower = re.sub(r'<@[A-Z0-9]+>', '', text_lower).strip()
-    
-    # Intent: Listar commits do GitHub
-    if any(word in text_lower for word in ['commit', 'commits', 'histórico', 'historico']):
-        # Extrair número de commits
-        match = re.search(r'(\d+)\s*(?:último|últimos|ultima|ultimas|último|últimos)?', text_lower)
-        limit = int(match.group(1)) if match else 5
-        
-        return {
-            'intent': 'github_commits',
-            'params': {
-                'limit': limit
-            },
-            'confidence': 0.95
-        }
-    
-    # Intent: Criar card no Trello
-    if any(word in text_lower for word in ['criar', 'adicionar', 'novo card', 'nova tarefa']):
-        # Extrair nome do card
-        patterns = [
-            r'criar (?:um )?(?:card|tarefa) (?:chamado |chamada )?["\']?(.+?)["\']?$',
-            r'adicionar (?:um )?(?:card|tarefa) ["\']?(.+?)["\']?$',
-            r'novo (?:card|tarefa) ["\']?(.+?)["\']?$',
-            r'criar ["\']?(.+?)["\']? no (?:trello|quadro)',
-        ]
-        
-        card_name = None
-        for pattern in patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                card_name = match.group(1).strip()
-                break
-        
-        if not card_name:
-            # Tentar extrair tudo depois de "criar"
-            match = re.search(r'criar (.+)', text_lower)
-            if match:
-                card_name = match.group(1).strip()
-        
-        return {
-            'intent': 'trello_create_card',
-            'params': {
-                'card_name': card_name or 'Nova tarefa'
-            },
-            'confidence': 0.9 if card_name else 0.6
-        }
+from .classification_cache import classification_cache, normalize_text
+from .classification_engine import ClassificationEngine, register_engine
+from .intent_model import IntentModel
+from .keyword_automaton import KeywordAutomaton
+from .metrics import register_metrics
+from .openai_client import chat_json
+from .slots import Message
+from .windows import parse_window
+
+
+def _window_params(text_lower):
+    """{'days': N} quando o texto menciona um período ("últimos 90 dias", "sprint")"""
+    days = parse_window(text_lower)
+    return {'days': days} if days else {}
+
+
+# Grupos de palavras-chave; o texto "tem" o grupo se contém qualquer uma
+# delas (como substring, igual a `palavra in texto`)
+KEYWORD_GROUPS = {
+    'commits': ['commit', 'commits', 'histórico', 'historico'],
+    'create': ['criar', 'adicionar', 'novo card', 'nova tarefa'],
+    'flow': ['fluxo', 'tempo de ciclo', 'cycle time', 'cfd', 'vazão', 'vazao', 'throughput'],
+    'list_verbs': ['listar', 'mostrar', 'ver', 'quais', 'cards', 'tarefas'],
+    'list_objects': ['card', 'tarefa', 'trello', 'quadro'],
+    'delete_verbs': ['deletar', 'excluir', 'remover', 'apagar'],
+    'card_objects': ['card', 'tarefa'],
+    'move_verbs': ['mover', 'mudar', 'transferir'],
+    'lists': ['listas', 'colunas'],
+    'show_verbs': ['listar', 'mostrar', 'ver', 'quais'],
+    'update_verbs': ['atualizar', 'editar', 'modificar', 'alterar'],
+    'update_objects': ['card', 'tarefa', 'descrição', 'descricao'],
+    'status_doing': ['fazendo', 'trabalhando', 'desenvolvendo', 'em andamento', 'comecei'],
+    'status_review': ['pronto', 'terminei', 'concluí', 'revisar', 'review'],
+    'status_done': ['concluído', 'concluido', 'feito', 'finalizado', 'completo'],
+    'status_todo': ['vou fazer', 'para fazer', 'fazer depois'],
+    'stats': ['estatística', 'estatistica', 'estatísticas', 'estatisticas', 'análise', 'analise',
+              'métricas', 'metricas'],
+    'stats_lines': ['linhas', 'adições', 'adicoes', 'deleções', 'delecoes'],
+    'stats_issues': ['issue', 'pull request', 'prs'],
+    'stats_commits': ['commit', 'commits', 'github'],
+    'commit_stats': ['ranking', 'média', 'media', 'quantos', 'por dia', 'por pessoa', 'por autor', 'mais commitou'],
+    'stats_trello': ['card', 'cards', 'trello', 'quadro'],
+    'stats_activity': ['atividade', 'resumo', 'geral'],
+    'summary': ['resumo', 'atividade'],
+    'help': ['ajuda', 'help', 'ajudar', 'comandos', 'o que você faz'],
+    'greeting': ['oi', 'olá', 'ola', 'bom dia', 'boa tarde', 'boa noite', 'hey', 'e ai', 'e aí']
+}
+
+# Construído uma vez por processo
+INTENT_MATCHER = KeywordAutomaton(KEYWORD_GROUPS)
+
+def _github_commits(message):
+    return {
+        'intent': 'github_commits',
+        'params': {
+            'limit': message.limit or 5
+        },
+        'confidence': 0.95
+    }
+
+
+def _create_card(message):
+    card_name = message.slots_for('create').card_name
     
-    # Intent: Listar cards do Trello
-    if any(word in text_lower for word in ['listar', 'mostrar', 'ver', 'quais', 'cards', 'tarefas']):
-        if any(word in text_lower for word in ['card', 'tarefa', 'trello', 'quadro']):
-            return {
-                'intent': 'trello_list_cards',
-                'params': {},
-                'confidence': 0.9
-            }
+    return {
+        'intent': 'trello_create_card',
+        'params': {
+            'card_name': card_name or 'Nova tarefa'
+        },
+        'confidence': 0.9 if card_name else 0.6
+    }
+
+
+def _delete_card(message):
+    card_name = message.slots_for('delete').card_name
     
-    # Intent: Deletar card
-    if any(word in text_lower for word in ['deletar', 'excluir', 'remover', 'apagar']):
-        if any(word in text_lower for word in ['card', 'tarefa']):
-            # Extrair nome do card
-            patterns = [
-                r'(?:deletar|excluir|remover|apagar) (?:o )?(?:card |tarefa )?["\']?(.+?)["\']?$',
-                r'(?:deletar|excluir|remover|apagar) ["\']?(.+?)["\']?$',
-            ]
-            
-            card_name = None
-            for pattern in patterns:
-                match = re.search(pattern, text_lower)
-                if match:
-                    card_name = match.group(1).strip()
-                    break
-            
-            return {
-                'intent': 'trello_delete_card',
-                'params': {
-                    'card_name': card_name
-                },
-                'confidence': 0.9 if card_name else 0.6
-            }
+    return {
+        'intent': 'trello_delete_card',
+        'params': {
+            'card_name': card_name
+        },
+        'confidence': 0.9 if card_name else 0.6
+    }
+
+
+def _move_card(message):
+    slots = message.slots_for('move')
     
-    # Intent: Mover card
-    if any(word in text_lower for word in ['mover', 'mudar', 'transferir']):
-        print(f"[INTENT] ===== MOVER CARD DETECTADO =====")
-        print(f"[INTENT] Texto original recebido: '{text}'")
-        print(f"[INTENT] Texto em minúsculas: '{text_lower}'")
-        
-        # Estratégia simples: dividir no "para"
-        # Remove o comando inicial
-        text_clean = re.sub(r'(?:mover|mudar|transferir)\s+', '', text_lower, count=1)
-        print(f"[INTENT] Após remover comando: '{text_clean}'")
-        
-        # Remove "card" ou "o card" do início
-        text_clean = re.sub(r'^(?:o\s+)?(?:card\s+|tarefa\s+)', '', text_clean)
-        print(f"[INTENT] Após remover 'card': '{text_clean}'")
-        
-        # Remover aspas
-        text_clean = text_clean.replace('"', '').replace("'", '')
-        print(f"[INTENT] Após remover aspas: '{text_clean}'")
-        
-        # Encontrar "para" ou "pra"
-        card_name = None
-        target_list = None
-        
-        if ' para ' in text_clean:
-            parts = text_clean.split(' para ', 1)
-            print(f"[INTENT] Split no ' para ': {parts}")
-        elif ' pra ' in text_clean:
-            parts = text_clean.split(' pra ', 1)
-            print(f"[INTENT] Split no ' pra ': {parts}")
-        else:
-            print(f"[INTENT] NÃO ENCONTROU 'para' ou 'pra' no texto!")
-            parts = [None, None]
-        
-        if len(parts) == 2 and parts[0] and parts[1]:
-            card_name = parts[0].strip()
-            target_list = parts[1].strip()
-            
-            # Remover "a lista" do início da lista
-            target_list = re.sub(r'^(?:a\s+)?(?:lista\s+|coluna\s+)', '', target_list)
-            
-            print(f"[INTENT] ===== RESULTADO FINAL =====")
-            print(f"[INTENT] Card: '{card_name}'")
-            print(f"[INTENT] Lista: '{target_list}'")
-        else:
-            print(f"[INTENT] FALHOU - Parts inválidas: {parts}")
-            card_name = None
-            target_list = None
+    return {
+        'intent': 'trello_move_card',
+        'params': {
+            'card_name': slots.card_name,
+            'target_list': slots.target_list
+        },
+        'confidence': 0.85 if (slots.card_name and slots.target_list) else 0.5
+    }
+
+
+def _update_card(message):
+    return {
+        'intent': 'trello_update_card',
+        'params': {
+            'card_name': message.slots_for('update').card_name
+        },
+        'confidence': 0.8
+    }
+
+
+def _update_status(status):
+    """Status de card em linguagem natural ("o card X está pronto")"""
+    def build(message):
+        # A frase de status mais específica vence o status padrão da regra
+        slots = message.slots_for('status')
         
         return {
-            'intent': 'trello_move_card',
+            'intent': 'trello_update_status',
             'params': {
-                'card_name': card_name,
-                'target_list': target_list
+                'card_name': slots.card_name,
+                'status': slots.status or status
             },
-            'confidence': 0.85 if (card_name and target_list) else 0.5
+            'confidence': 0.8
         }
-    
-    # Intent: Listar listas do quadro
-    if any(word in text_lower for word in ['listas', 'colunas']):
-        if any(word in text_lower for word in ['listar', 'mostrar', 'ver', 'quais']):
-            return {
-                'intent': 'trello_list_lists',
-                'params': {},
-                'confidence': 0.9
-            }
-    
-    # Intent: Atualizar/editar card
-    if any(word in text_lower for word in ['atualizar', 'editar', 'modificar', 'alterar']):
-        if any(word in text_lower for word in ['card', 'tarefa', 'descrição', 'descricao']):
-            card_match = re.search(r'(?:card |tarefa )?["\']?(.+?)["\']?(?:com|para)', text_lower)
-            
-            return {
-                'intent': 'trello_update_card',
-                'params': {
-                    'card_name': card_match.group(1).strip() if card_match else None
-                },
-                'confidence': 0.8
-            }
-    
-    # Intent: Status de card (linguagem natural)
-    status_patterns = {
-        'em desenvolvimento': ['fazendo', 'trabalhando', 'desenvolvendo', 'em andamento', 'comecei'],
-        'revisão': ['pronto', 'terminei', 'concluí', 'revisar', 'review'],
-        'concluído': ['concluído', 'concluido', 'feito', 'finalizado', 'completo'],
-        'a fazer': ['vou fazer', 'para fazer', 'fazer depois']
-    }
-    
-    for status, keywords in status_patterns.items():
-        if any(keyword in text_lower for keyword in keywords):
-            # Extrair nome do card
-            card_match = re.search(r'(?:card|tarefa) ["\']?(.+?)["\']? (?:está|esta|ta|ficou)', text_lower)
-            if not card_match:
-                card_match = re.search(r'(?:meu|o) (?:card|tarefa) ["\']?(.+?)["\']?', text_lower)
-            
-            return {
-                'intent': 'trello_update_status',
-                'params': {
-                    'card_name': card_match.group(1).strip() if card_match else None,
-                    'status': status
-                },
-                'confidence': 0.8
-            }
-    
-    # Intent: Estatísticas
-    if any(word in text_lower for word in ['estatística', 'estatistica', 'estatísticas', 'estatisticas', 'análise', 'analise', 'métricas', 'metricas']):
-        # Determinar tipo de estatística
-        if any(word in text_lower for word in ['commit', 'commits', 'github']):
-            return {
-                'intent': 'stats_commits',
-                'params': {},
-                'confidence': 0.95
-            }
-        elif any(word in text_lower for word in ['card', 'cards', 'trello', 'quadro']):
-            return {
-                'intent': 'stats_trello',
-                'params': {},
-                'confidence': 0.95
-            }
-        elif any(word in text_lower for word in ['atividade', 'resumo', 'geral']):
-            return {
-                'intent': 'stats_activity',
-                'params': {},
-                'confidence': 0.9
-            }
-        else:
-            # Estatísticas gerais
-            return {
-                'intent': 'stats_general',
-                'params': {},
-                'confidence': 0.8
-            }
-    
-    # Intent: Ajuda
-    if any(word in text_lower for word in ['ajuda', 'help', 'ajudar', 'comandos', 'o que você faz']):
+    return build
+
+
+def _with_window(intent, confidence):
+    """Intent cujo único parâmetro é a janela de tempo ("últimos 90 dias")"""
+    def build(message):
         return {
-            'intent': 'help',
-            'params': {},
-            'confidence': 1.0
+            'intent': intent,
+            'params': _window_params(message.lower),
+            'confidence': confidence
         }
-    
-    # Intent: Saudação
-    if any(word in text_lower for word in ['oi', 'olá', 'ola', 'bom dia', 'boa tarde', 'boa noite', 'hey', 'e ai', 'e aí']):
+    return build
+
+
+def _fixed(intent, confidence):
+    """Intent sem parâmetros"""
+    def build(message):
         return {
-            'intent': 'greeting',
+            'intent': intent,
             'params': {},
-            'confidence': 0.95
+            'confidence': confidence
         }
+    return build
+
+
+# Prioridade explícita: vence a primeira regra cujos grupos aparecem todos no texto
+INTENT_RULES = [
+    # "estatística de commits" / "ranking de commits" também casam com
+    # 'commits': o pedido de estatística vence o de listar commits, senão
+    # github_commits erraria essas frases e nenhum dos dois teria limiar
+    (('stats', 'commits'), _fixed('stats_commits', 0.95)),
+    (('commit_stats', 'commits'), _fixed('stats_commits', 0.9)),
+    (('commits',), _github_commits),
+    (('create',), _create_card),
+    (('flow',), _with_window('stats_flow', 0.9)),
+    (('list_verbs', 'list_objects'), _fixed('trello_list_cards', 0.9)),
+    (('delete_verbs', 'card_objects'), _delete_card),
+    (('move_verbs',), _move_card),
+    (('lists', 'show_verbs'), _fixed('trello_list_lists', 0.9)),
+    (('update_verbs', 'update_objects'), _update_card),
+    (('status_doing',), _update_status('em desenvolvimento')),
+    (('status_review',), _update_status('revisão')),
+    (('status_done',), _update_status('concluído')),
+    (('status_todo',), _update_status('a fazer')),
+    (('stats', 'stats_lines'), _fixed('stats_lines', 0.9)),
+    (('stats', 'stats_issues'), _fixed('stats_issues', 0.95)),
+    (('stats', 'stats_commits'), _fixed('stats_commits', 0.95)),
+    (('stats', 'stats_trello'), _fixed('stats_trello', 0.95)),
+    (('stats', 'stats_activity'), _with_window('stats_activity', 0.9)),
+    (('stats',), _fixed('stats_general', 0.8)),
+    (('summary',), _with_window('stats_activity', 0.85)),
+    (('help',), _fixed('help', 1.0)),
+    (('greeting',), _fixed('greeting', 0.95)),
+]
+
+
+# Extração de parâmetros quando outro classificador (modelo local) escolhe o intent
+PARAM_BUILDERS = {
+    'github_commits': _github_commits,
+    'trello_create_card': _create_card,
+    'trello_delete_card': _delete_card,
+    'trello_move_card': _move_card,
+    'trello_update_card': _update_card,
+    'stats_flow': _with_window('stats_flow', 0.9),
+    'stats_activity': _with_window('stats_activity', 0.9),
+}
+
+
+def classify_intent(text):
+    """
+    Classifica a intenção do usuário a partir do texto
+    Uma passada do autômato encontra os grupos de palavras-chave; a tabela
+    INTENT_RULES decide a prioridade e só a regra vencedora extrai parâmetros
+    (pela gramática de slots compartilhada, sobre a mensagem tokenizada uma vez)
+    Retorna: { 'intent': str, 'params': dict }
+    """
+    return _classify_message(Message(text))
+
+
+def _classify_message(message):
+    found = INTENT_MATCHER.scan(message.lower)
+    for groups, build in INTENT_RULES:
+        if found.issuperset(groups):
+            return build(message)
     
     # Intent desconhecido
     return {
@@ -251,25 +225,133 @@ def classify_intent(text):
     }
 
 
-def classify_with_openai(text):
+# Incrementar quando o prompt ou o modelo mudarem (invalida o cache de classificações)
+CLASSIFICATION_CACHE_VERSION = 2
+
+
+def _cache_key(text):
+    normalized = normalize_text(text)
+    return f'v{CLASSIFICATION_CACHE_VERSION}:{normalized}' if normalized else None
+
+
+def _is_cacheable(classification):
     """
-    Classificação avançada usando OpenAI (opcional)
-    Usa GPT para entender contextos mais complexos
+    Só respostas cujos parâmetros não copiam trechos do texto: a chave ignora
+    caixa e acentos, então "criar card Login" não pode devolver o nome de
+    "criar card login". Números (limit, days) dependem só do texto normalizado
     """
-    import urllib.request
-    
-    openai_key = os.environ.get('OPENAI_API_KEY')
-    
-    if not openai_key:
-        # Fallback para classificação baseada em regras
-        return classify_intent(text)
+    if not isinstance(classification, dict) or not classification.get('intent'):
+        return False
+    params = classification.get('params') or {}
+    return isinstance(params, dict) and not any(isinstance(v, str) for v in params.values())
+
+
+# Limiares de confiança por intent para responder só com as regras
+# (INTENT_MODE=rules_first); intents fora da tabela sempre consultam o LLM.
+# Gerados por calibrate_intents.py; INTENT_THRESHOLDS_PATH substitui a tabela
+DEFAULT_RULE_THRESHOLDS = {
+    'github_commits': 0.95,
+    'help': 1.0,
+    'stats_commits': 0.9,
+    'stats_flow': 0.9,
+    'stats_general': 0.8,
+    'stats_issues': 0.95,
+    'stats_lines': 0.9,
+    'stats_trello': 0.95,
+    'trello_create_card': 0.9,
+    'trello_delete_card': 0.9,
+    'trello_list_lists': 0.9,
+    'trello_move_card': 0.85,
+    'trello_update_card': 0.8
+}
+
+_thresholds_cache = {}
+_gate_counts = {'local': 0, 'rules': 0, 'cache': 0, 'llm': 0, 'fallback': 0, 'timeout': 0, 'timeout_waited': 0,
+                'deadline': 0, 'late': 0, 'late_disagree': 0, 'batch_calls': 0}
+_gate_lock = threading.Lock()
+
+# Tempo máximo (ms) que a menção espera pela OpenAI antes de ficar com as regras
+DEFAULT_LLM_BUDGET_MS = 800
+# Prazo final (ms) quando as regras não têm confiança para responder no orçamento
+DEFAULT_LLM_MAX_WAIT_MS = 2500
+
+_llm_pool = None
+_llm_pool_lock = threading.Lock()
+
+
+def _count(name):
+    with _gate_lock:
+        _gate_counts[name] += 1
+
+
+def get_llm_budget():
+    """Orçamento da chamada à OpenAI em segundos (INTENT_LLM_BUDGET_MS); None = esperar o timeout"""
+    try:
+        budget_ms = float(os.environ.get('INTENT_LLM_BUDGET_MS', DEFAULT_LLM_BUDGET_MS))
+    except ValueError:
+        budget_ms = DEFAULT_LLM_BUDGET_MS
+    return budget_ms / 1000 if budget_ms > 0 else None
+
+
+def get_llm_max_wait():
+    """Prazo final da espera pela OpenAI em segundos (INTENT_LLM_MAX_WAIT_MS); None = esperar o timeout"""
+    try:
+        max_wait_ms = float(os.environ.get('INTENT_LLM_MAX_WAIT_MS', DEFAULT_LLM_MAX_WAIT_MS))
+    except ValueError:
+        max_wait_ms = DEFAULT_LLM_MAX_WAIT_MS
+    return max_wait_ms / 1000 if max_wait_ms > 0 else None
+
+
+def _get_llm_pool():
+    """Threads das chamadas à OpenAI (INTENT_LLM_WORKERS, padrão 4), criadas na primeira menção"""
+    global _llm_pool
+
+    with _llm_pool_lock:
+        if _llm_pool is None:
+            try:
+                workers = max(1, int(os.environ.get('INTENT_LLM_WORKERS', 4)))
+            except ValueError:
+                workers = 4
+            _llm_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='intent-llm')
+        return _llm_pool
+
+
+def get_intent_mode():
+    """'llm' (padrão: sempre consulta a OpenAI), 'rules_first' ou 'local'"""
+    mode = os.environ.get('INTENT_MODE', 'llm').strip().lower()
+    return mode if mode in ('llm', 'rules_first', 'local') else 'llm'
+
+
+def get_rule_thresholds():
+    """Tabela {intent: confiança mínima}; relida quando o arquivo muda"""
+    path = os.environ.get('INTENT_THRESHOLDS_PATH')
+    if not path:
+        return DEFAULT_RULE_THRESHOLDS
     
     try:
-        # Preparar prompt para o GPT
-        system_prompt = """Você é um classificador de intenções para um bot PMO.
+        mtime = os.path.getmtime(path)
+        if _thresholds_cache.get('key') != (path, mtime):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            _thresholds_cache.update({'key': (path, mtime), 'value': data.get('thresholds', data)})
+        return _thresholds_cache['value']
+    except (OSError, ValueError) as e:
+        print(f"[INTENT] Erro ao ler limiares em {path}: {e}")
+        return DEFAULT_RULE_THRESHOLDS
+
+
+# Intents que o LLM pode devolver
+INTENTS = [
+    'github_commits', 'trello_create_card', 'trello_list_cards', 'trello_move_card', 'trello_delete_card',
+    'trello_list_lists', 'trello_update_card', 'trello_update_status', 'stats_commits', 'stats_trello',
+    'stats_flow', 'stats_activity', 'stats_issues', 'stats_lines', 'stats_general', 'help', 'greeting', 'unknown'
+]
+
+# Prompt fixo montado uma vez por processo; o texto do usuário vem depois
+LLM_SYSTEM_PROMPT = ("""Você é um classificador de intenções para um bot PMO.
 Analise o texto do usuário e retorne um JSON com:
-- intent: uma das opções (github_commits, trello_create_card, trello_list_cards, trello_move_card, trello_delete_card, trello_list_lists, trello_update_card, trello_update_status, stats_commits, stats_trello, stats_activity, stats_general, help, greeting, unknown)
-- params: parâmetros extraídos do texto
+- intent: uma das opções (""" + ', '.join(INTENTS) + """)
+- params: parâmetros extraídos do texto (null quando não se aplicam)
 - confidence: confiança de 0 a 1
 
 Exemplos:
@@ -277,71 +359,495 @@ Exemplos:
 "criar card Nova Feature" -> {"intent": "trello_create_card", "params": {"card_name": "Nova Feature"}, "confidence": 0.9}
 "estatística de commits" -> {"intent": "stats_commits", "params": {}, "confidence": 0.95}
 "análise do trello" -> {"intent": "stats_trello", "params": {}, "confidence": 0.95}
+"métricas de issues e PRs" -> {"intent": "stats_issues", "params": {}, "confidence": 0.95}
+"estatística de linhas alteradas" -> {"intent": "stats_lines", "params": {}, "confidence": 0.9}
+"resumo dos últimos 90 dias" -> {"intent": "stats_activity", "params": {"days": 90}, "confidence": 0.9}
+"tempo de ciclo do último mês" -> {"intent": "stats_flow", "params": {"days": 30}, "confidence": 0.9}
+""")
+
+# Saída estruturada: o modelo só pode responder neste formato (todos os
+# campos presentes; parâmetros que não se aplicam vêm null e são descartados)
+_NULLABLE = {
+    'limit': 'integer', 'days': 'integer', 'card_name': 'string', 'target_list': 'string', 'status': 'string'
+}
+LLM_RESPONSE_FORMAT = {
+    'type': 'json_schema',
+    'json_schema': {
+        'name': 'intent_classification',
+        'strict': True,
+        'schema': {
+            'type': 'object',
+            'properties': {
+                'intent': {'type': 'string', 'enum': INTENTS},
+                'params': {
+                    'type': 'object',
+                    'properties': {name: {'type': [kind, 'null']} for name, kind in _NULLABLE.items()},
+                    'required': list(_NULLABLE),
+                    'additionalProperties': False
+                },
+                'confidence': {'type': 'number'}
+            },
+            'required': ['intent', 'params', 'confidence'],
+            'additionalProperties': False
+        }
+    }
+}
+
+# Resposta com schema estrito cabe folgada em ~60 tokens
+DEFAULT_LLM_MAX_TOKENS = 100
+
+
+# Lotes de classify_many: até INTENT_BATCH_SIZE mensagens com no máximo
+# INTENT_BATCH_MAX_CHARS caracteres cada vão numa única chamada
+DEFAULT_BATCH_SIZE = 8
+DEFAULT_BATCH_MAX_CHARS = 280
+
+# Instrução extra dos lotes; vem depois do prompt fixo
+LLM_BATCH_PROMPT = """Você vai receber várias mensagens numa lista JSON [{"index": n, "text": "..."}].
+Classifique cada mensagem de forma independente, com as mesmas regras e exemplos, e responda
+{"results": [...]} com um item por mensagem, repetindo o index correspondente.
 """
 
-        payload = {
-            "model": "gpt-4o-mini",
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": text}
-            ],
-            "temperature": 0.3,
-            "max_tokens": 200
+_ITEM_SCHEMA = LLM_RESPONSE_FORMAT['json_schema']['schema']
+LLM_BATCH_RESPONSE_FORMAT = {
+    'type': 'json_schema',
+    'json_schema': {
+        'name': 'intent_classification_batch',
+        'strict': True,
+        'schema': {
+            'type': 'object',
+            'properties': {
+                'results': {
+                    'type': 'array',
+                    'items': dict(
+                        _ITEM_SCHEMA,
+                        properties=dict(_ITEM_SCHEMA['properties'], index={'type': 'integer'}),
+                        required=['index'] + _ITEM_SCHEMA['required']
+                    )
+                }
+            },
+            'required': ['results'],
+            'additionalProperties': False
         }
-        
-        data = json.dumps(payload).encode('utf-8')
-        
-        req = urllib.request.Request(
-            'https://api.openai.com/v1/chat/completions',
-            data=data,
-            headers={
-                'Authorization': f'Bearer {openai_key}',
-                'Content-Type': 'application/json'
-            }
-        )
-        
-        response = urllib.request.urlopen(req, timeout=10)
-        result = json.loads(response.read())
-        
-        # Extrair resposta do GPT
-        content = result['choices'][0]['message']['content']
-        
-        # Parse JSON da resposta
+    }
+}
+
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _clean_classification(classification):
+    """Valida a resposta do schema e descarta parâmetros null"""
+    if not isinstance(classification, dict) or 'intent' not in classification:
+        return None
+    params = classification.get('params') or {}
+    return {
+        'intent': classification['intent'],
+        'params': {k: v for k, v in params.items() if v is not None},
+        'confidence': classification.get('confidence', 0)
+    }
+
+
+def _classify_with_llm(text, openai_key):
+    """Uma chamada à OpenAI; retorna a classificação ou None em caso de erro"""
+    messages = [
+        {"role": "system", "content": LLM_SYSTEM_PROMPT},
+        {"role": "user", "content": text}
+    ]
+    try:
+        content = chat_json(openai_key, messages, _env_int('INTENT_LLM_MAX_TOKENS', DEFAULT_LLM_MAX_TOKENS),
+                               LLM_RESPONSE_FORMAT, 'intent')
+        return _clean_classification(content)
+    except Exception as e:
+        print(f"Erro ao usar OpenAI: {e}")
+        return None
+
+
+def _classify_batch_with_llm(texts, openai_key):
+    """Várias mensagens curtas numa chamada; lista alinhada com `texts` (None onde faltar resposta)"""
+    messages = [
+        {"role": "system", "content": LLM_SYSTEM_PROMPT},
+        {"role": "system", "content": LLM_BATCH_PROMPT},
+        {"role": "user", "content": json.dumps(
+            [{"index": i, "text": text} for i, text in enumerate(texts)], ensure_ascii=False)}
+    ]
+    max_tokens = _env_int('INTENT_LLM_MAX_TOKENS', DEFAULT_LLM_MAX_TOKENS) * len(texts)
+    
+    results = [None] * len(texts)
+    try:
+        content = chat_json(openai_key, messages, max_tokens, LLM_BATCH_RESPONSE_FORMAT, 'intent_batch')
+    except Exception as e:
+        print(f"Erro ao usar OpenAI (lote de {len(texts)}): {e}")
+        return results
+    
+    for item in (content or {}).get('results', []):
+        index = item.get('index') if isinstance(item, dict) else None
+        if isinstance(index, int) and 0 <= index < len(texts) and results[index] is None:
+            results[index] = _clean_classification(item)
+    return results
+
+
+# Confiança mínima do modelo local para dispensar regras e LLM
+DEFAULT_LOCAL_MIN_CONFIDENCE = 0.6
+
+_local_model_cache = {}
+_intent_log_lock = threading.Lock()
+
+
+def get_local_model_path():
+    """Artefato do modelo local (INTENT_MODEL_PATH; padrão: intent_model.npz ao lado deste módulo)"""
+    return os.environ.get('INTENT_MODEL_PATH') or os.path.join(os.path.dirname(__file__), 'intent_model.npz')
+
+
+def get_local_model():
+    """Modelo local carregado uma vez (recarrega se o arquivo mudar); None se não houver"""
+    path = get_local_model_path()
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    
+    if _local_model_cache.get('key') != (path, mtime):
         try:
-            classification = json.loads(content)
-            return classification
-        except:
-            # Se GPT não retornou JSON válido, usar classificação baseada em regras
-            return classify_intent(text)
+            _local_model_cache.update({'key': (path, mtime), 'model': IntentModel.load(path)})
+        except Exception as e:
+            print(f"[INTENT] Erro ao carregar modelo local {path}: {e}")
+            _local_model_cache.update({'key': (path, mtime), 'model': None})
+    return _local_model_cache['model']
+
+
+def classify_local(text):
+    """
+    Intent pelo modelo local (TF-IDF + regressão logística, sem rede)
+    Parâmetros vêm das regras: as da própria regra quando ela concorda,
+    senão o extrator do intent escolhido. None se não houver modelo, se
+    o intent for 'unknown' ou se a confiança ficar abaixo do mínimo
+    """
+    model = get_local_model()
+    if model is None:
+        return None
+    
+    intent, confidence = model.predict(text)
+    try:
+        min_confidence = float(os.environ.get('INTENT_LOCAL_MIN_CONFIDENCE', DEFAULT_LOCAL_MIN_CONFIDENCE))
+    except ValueError:
+        min_confidence = DEFAULT_LOCAL_MIN_CONFIDENCE
+    if intent == 'unknown' or confidence < min_confidence:
+        return None
+    
+    message = Message(text)
+    rules = _classify_message(message)
+    if rules['intent'] == intent:
+        params = rules['params']
+    elif intent in PARAM_BUILDERS:
+        params = PARAM_BUILDERS[intent](message)['params']
+    else:
+        params = {}
+    
+    return {
+        'intent': intent,
+        'params': params,
+        'confidence': round(confidence, 3)
+    }
+
+
+def log_classification(text, classification, source):
+    """
+    Acrescenta o par (texto, intent) em INTENT_LOG_PATH (JSON Lines), base
+    de treino do modelo local; desligado se a variável não estiver definida
+    """
+    path = os.environ.get('INTENT_LOG_PATH')
+    if not path or not classification:
+        return
+    
+    line = json.dumps({
+        'text': text,
+        'intent': classification.get('intent'),
+        'confidence': classification.get('confidence'),
+        'source': source,
+        'at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+    }, ensure_ascii=False)
+    try:
+        with _intent_log_lock, open(path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+    except OSError as e:
+        print(f"[INTENT] Erro ao registrar classificação em {path}: {e}")
+
+
+def _remember_llm_answer(text, classification, cache_key, source='llm'):
+    """Log de treino e cache para uma resposta do LLM"""
+    log_classification(text, classification, source)
+    if cache_key and _is_cacheable(classification):
+        classification_cache.put(cache_key, classification)
+
+
+def remember_classification(text, classification, source):
+    """Resposta de outro classificador (ex.: o agente) no log de treino e no cache compartilhado"""
+    _remember_llm_answer(text, classification, _cache_key(text), source)
+
+
+def _llm_task(text, openai_key, cache_key):
+    """Chamada à OpenAI em segundo plano; grava no cache (e no log de treino) mesmo se chegar depois do orçamento"""
+    classification = _classify_with_llm(text, openai_key)
+    if classification is not None:
+        _remember_llm_answer(text, classification, cache_key)
+    return classification
+
+
+def _log_late_answer(future, rules, started):
+    """Registra a resposta que chegou depois do orçamento (só log e métricas)"""
+    try:
+        classification = future.result()
+    except Exception as e:
+        print(f"[INTENT] Chamada tardia à OpenAI falhou: {e}")
+        return
+    if classification is None:
+        return
+
+    _count('late')
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if classification.get('intent') != rules['intent']:
+        _count('late_disagree')
+        print(f"[INTENT] OpenAI respondeu em {elapsed_ms:.0f} ms: '{classification.get('intent')}' "
+              f"(regras usadas: '{rules['intent']}')")
+    else:
+        print(f"[INTENT] OpenAI respondeu em {elapsed_ms:.0f} ms, igual às regras")
+
+
+def _answer_without_llm(text, mode, openai_key, accept=None):
+    """
+    Etapas que dispensam a OpenAI: modelo local, regras (sem chave ou acima
+    do limiar) e cache de classificações
+    `accept(classificação)` restringe as respostas aproveitáveis (o agente
+    só usa as que têm ação equivalente); as recusadas não entram nas métricas
+    Retorna (classificação ou None, resultado das regras se já calculado)
+    """
+    accept = accept or _accept_all
+    
+    if mode == 'local':
+        local = classify_local(text)
+        if local is not None and accept(local):
+            _count('local')
+            print(f"[INTENT] Modelo local: '{local['intent']}' ({local['confidence']}), sem OpenAI")
+            return local, None
+    
+    if not openai_key:
+        # Fallback para classificação baseada em regras
+        rules = classify_intent(text)
+        return (rules if accept(rules) else None), rules
     
+    rules = None
+    if mode == 'rules_first':
+        rules = classify_intent(text)
+        threshold = get_rule_thresholds().get(rules['intent'])
+        if threshold is not None and rules['confidence'] >= threshold and accept(rules):
+            _count('rules')
+            print(f"[INTENT] Regras: '{rules['intent']}' ({rules['confidence']} >= {threshold}), sem OpenAI")
+            return rules, rules
+    
+    cache_key = _cache_key(text)
+    if cache_key:
+        cached = classification_cache.get(cache_key)
+        if cached is not None and accept(cached):
+            _count('cache')
+            print(f"[INTENT CACHE] Reaproveitando classificação de '{cache_key}'")
+            return cached, rules
+    
+    return None, rules
+
+
+def _accept_all(classification):
+    return True
+
+
+def answer_without_llm(text, accept=None):
+    """
+    Backend barato comum aos dois classificadores (modelo local, regras e
+    cache, conforme INTENT_MODE): classificação plana ou None
+    """
+    return _answer_without_llm(text, get_intent_mode(), os.environ.get('OPENAI_API_KEY'), accept)[0]
+
+
+def _classify_speculative(text):
+    """
+    Backend LLM do webhook: OpenAI em outra thread enquanto as regras rodam
+    aqui; sempre responde (regras quando a OpenAI falha)
+    Estourado o orçamento, as regras só valem se a confiança passar do
+    limiar calibrado do intent; senão a espera continua (regras erram frases
+    comuns, ex.: "mover" contém "ver"), mas só até INTENT_LLM_MAX_WAIT_MS
+    desde o início: passado o prazo, ficam as regras de qualquer forma
+    """
+    openai_key = os.environ.get('OPENAI_API_KEY')
+    cache_key = _cache_key(text)
+    
+    started = time.perf_counter()
+    future = _get_llm_pool().submit(_llm_task, text, openai_key, cache_key)
+    rules = classify_intent(text)
+    
+    budget = get_llm_budget()
+    max_wait = get_llm_max_wait()
+    if budget is None or (max_wait is not None and max_wait < budget):
+        budget = max_wait
+    try:
+        try:
+            classification = future.result(timeout=budget)
+        except FutureTimeout:
+            threshold = get_rule_thresholds().get(rules['intent'])
+            remaining = None if max_wait is None else max_wait - (time.perf_counter() - started)
+            if threshold is not None and rules['confidence'] >= threshold:
+                _count('timeout')
+                print(f"[INTENT] OpenAI passou de {budget * 1000:.0f} ms; usando regras ('{rules['intent']}')")
+                future.add_done_callback(lambda done: _log_late_answer(done, rules, started))
+                return rules
+            
+            try:
+                if remaining is not None and remaining <= 0:
+                    raise FutureTimeout()
+                _count('timeout_waited')
+                print(f"[INTENT] OpenAI passou de {budget * 1000:.0f} ms; regras sem confiança "
+                      f"('{rules['intent']}', {rules['confidence']}), aguardando a OpenAI")
+                classification = future.result(timeout=remaining)
+            except FutureTimeout:
+                _count('deadline')
+                print(f"[INTENT] OpenAI passou do prazo de {max_wait * 1000:.0f} ms; "
+                      f"usando regras ('{rules['intent']}')")
+                future.add_done_callback(lambda done: _log_late_answer(done, rules, started))
+                return rules
     except Exception as e:
         print(f"Erro ao usar OpenAI: {e}")
-        # Fallback para classificação baseada em regras
-        return classify_intent(text)
+        classification = None
+    
+    if classification is None:
+        # Se GPT falhou ou não retornou JSON válido, usar classificação baseada em regras
+        _count('fallback')
+        return rules
+    
+    _count('llm')
+    return classification
 
 
-def extract_parameters(text, intent):
+webhook_engine = register_engine(ClassificationEngine('intent_classification', [
+    ('sem_llm', answer_without_llm),
+    ('llm', _classify_speculative),
+]))
+
+
+def classify_with_openai(text):
     """
-    Extrai parâmetros específicos baseado no intent
+    Classificação avançada usando OpenAI (opcional)
+    Usa GPT para entender contextos mais complexos; comandos repetidos
+    ("listar cards") vêm do cache de classificações sem chamar a API.
+    Com INTENT_MODE=rules_first, as regras respondem sozinhas quando a
+    confiança passa do limiar calibrado para o intent.
+    A chamada à OpenAI roda em paralelo com as regras: se não responder
+    dentro de INTENT_LLM_BUDGET_MS, vale o resultado das regras (quando
+    confiantes; as demais esperam até INTENT_LLM_MAX_WAIT_MS) e a resposta
+    tardia só é registrada (e guardada no cache).
+    Com INTENT_MODE=local, o modelo treinado localmente responde antes de
+    tudo quando tem confiança suficiente.
+    Roda no motor compartilhado (classification_engine): mensagens idênticas
+    classificadas ao mesmo tempo compartilham uma única classificação, e o
+    cache também recebe as respostas do agente LangGraph
+    """
+    return webhook_engine.classify(text)
+
+
+def _batch_task(texts, openai_key):
+    """Um lote de mensagens curtas numa chamada; log e cache como em _llm_task"""
+    classifications = _classify_batch_with_llm(texts, openai_key)
+    for text, classification in zip(texts, classifications):
+        if classification is not None:
+            _remember_llm_answer(text, classification, _cache_key(text))
+    return classifications
+
+
+def classify_many(texts, max_workers=None):
     """
-    params = {}
-    text_lower = text.lower()
+    Classifica várias mensagens (ex.: menções acumuladas entre duas leituras
+    do Slack) e devolve os resultados na mesma ordem de `texts`
+    Modelo local, regras e cache respondem primeiro, como em
+    classify_with_openai; as que sobram vão à OpenAI em lotes de mensagens
+    curtas (uma chamada por lote) e as longas em chamadas próprias, com no
+    máximo `max_workers` chamadas simultâneas (padrão INTENT_LLM_WORKERS).
+    Sem orçamento de latência: é para colocar o atraso em dia. Mensagem sem
+    resposta do LLM fica com o resultado das regras
+    """
+    texts = list(texts)
+    openai_key = os.environ.get('OPENAI_API_KEY')
+    mode = get_intent_mode()
     
-    if intent == 'github_commits':
-        match = re.search(r'(\d+)', text_lower)
-        params['limit'] = int(match.group(1)) if match else 5
+    results = [None] * len(texts)
+    rules_by_index = {}
+    pending = []
+    # Mensagens repetidas no mesmo lote (texto idêntico) vão uma vez só; o texto
+    # normalizado não serve: "card Login" e "card login" têm parâmetros diferentes
+    first_index = {}
+    repeated = {}
+    for i, text in enumerate(texts):
+        key = text.strip()
+        if key in first_index:
+            repeated[i] = first_index[key]
+            continue
+        first_index[key] = i
+        answer, rules = _answer_without_llm(text, mode, openai_key)
+        if answer is not None:
+            results[i] = answer
+        else:
+            rules_by_index[i] = rules
+            pending.append(i)
     
-    elif intent == 'trello_create_card':
-        # Extrair nome do card
-        patterns = [
-            r'criar (?:card |um card )?["\']?(.+?)["\']?$',
-            r'adicionar ["\']?(.+?)["\']?$',
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                params['card_name'] = match.group(1).strip()
-                break
+    if pending:
+        batch_size = max(1, _env_int('INTENT_BATCH_SIZE', DEFAULT_BATCH_SIZE))
+        max_chars = _env_int('INTENT_BATCH_MAX_CHARS', DEFAULT_BATCH_MAX_CHARS)
+        short = [i for i in pending if len(texts[i]) <= max_chars]
+        single = [i for i in pending if len(texts[i]) > max_chars]
+        if len(short) == 1 or batch_size == 1:
+            single, short = single + short, []
+        
+        # Cada chamada responde uma lista de índices: lote de curtas ou uma longa
+        calls = [short[k:k + batch_size] for k in range(0, len(short), batch_size)]
+        calls += [[i] for i in single]
+        
+        workers = max_workers or _env_int('INTENT_LLM_WORKERS', 4)
+        print(f"[INTENT] Lote: {len(texts)} mensagens, {len(pending)} para a OpenAI em {len(calls)} chamada(s)")
+        
+        def run(indexes):
+            if len(indexes) == 1:
+                text = texts[indexes[0]]
+                return [_llm_task(text, openai_key, _cache_key(text))]
+            _count('batch_calls')
+            return _batch_task([texts[i] for i in indexes], openai_key)
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(calls)))) as executor:
+            answers = list(executor.map(run, calls))
+        
+        for indexes, classifications in zip(calls, answers):
+            for i, classification in zip(indexes, classifications):
+                if classification is None:
+                    _count('fallback')
+                    classification = rules_by_index[i] or classify_intent(texts[i])
+                else:
+                    _count('llm')
+                results[i] = classification
     
-    return params
+    # Cada mensagem recebe seu próprio dict (quem altera um resultado não altera os outros)
+    for i, original in repeated.items():
+        results[i] = copy.deepcopy(results[original])
+    return results
 
+
+register_metrics('intent_gate', lambda: dict(_gate_counts, mode=get_intent_mode(), budget_s=get_llm_budget(),
+                                             max_wait_s=get_llm_max_wait()))
+
+
+def extract_parameters(text, intent):
+    """
+    Extrai parâmetros específicos baseado no intent
+    """
+    if intent in PARAM_BUILDERS:
+        return PARAM_BUILDERS[intent](Message(text))['params']
+    return {}
@@ -0,0 +1,146 @@
+"""
+Modelo local de intenções (sem rede)
+Texto normalizado vira n-gramas de caracteres (2 a 4) e palavras, contados
+em `dim` posições por hash (crc32, estável entre processos), ponderados por
+TF-IDF e normalizados; uma regressão logística multinomial em numpy decide o
+intent. Treinado offline por train_intent_model.py a partir de pares
+(texto, intent) rotulados ou registrados das respostas do LLM; o artefato
+.npz guarda pesos em float16 e carrega em milissegundos
+"""
+
+import json
+import math
+import zlib
+
+import numpy as np
+
+from .classification_cache import normalize_text
+
+DEFAULT_DIM = 4096
+NGRAM_RANGE = (2, 4)
+
+
+def _grams(text):
+    """N-gramas de caracteres (com bordas de palavra) e palavras inteiras"""
+    padded = f' {text} '
+    lo, hi = NGRAM_RANGE
+    for n in range(lo, hi + 1):
+        for i in range(len(padded) - n + 1):
+            yield padded[i:i + n]
+    for word in text.split():
+        yield 'w:' + word
+
+
+def hashed_counts(text, dim):
+    """{posição: contagem} dos n-gramas do texto normalizado"""
+    counts = {}
+    for gram in _grams(normalize_text(text)):
+        index = zlib.crc32(gram.encode('utf-8')) % dim
+        counts[index] = counts.get(index, 0) + 1
+    return counts
+
+
+def _tfidf(counts, idf):
+    """Vetor esparso (índices, valores) com tf sublinear × idf, norma L2"""
+    if not counts:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+    indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+    tf = np.fromiter((1.0 + math.log(c) for c in counts.values()), dtype=np.float32, count=len(counts))
+    values = tf * idf[indices]
+    norm = float(np.sqrt(values @ values))
+    return indices, values / norm if norm else values
+
+
+def _softmax(logits):
+    logits = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+class IntentModel:
+    """Regressão logística sobre TF-IDF com hash; `predict` custa ~0,1 ms"""
+
+    def __init__(self, labels, idf, weights, bias, meta=None):
+        self.labels = list(labels)
+        self.idf = np.asarray(idf, dtype=np.float32)
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bias = np.asarray(bias, dtype=np.float32)
+        self.meta = meta or {}
+
+    @property
+    def dim(self):
+        return len(self.idf)
+
+    def predict_proba(self, text):
+        """Probabilidade de cada intent ({intent: p})"""
+        indices, values = _tfidf(hashed_counts(text, self.dim), self.idf)
+        probs = _softmax(values @ self.weights[indices] + self.bias)
+        return dict(zip(self.labels, probs.tolist()))
+
+    def predict(self, text):
+        """(intent, probabilidade) mais provável"""
+        indices, values = _tfidf(hashed_counts(text, self.dim), self.idf)
+        probs = _softmax(values @ self.weights[indices] + self.bias)
+        best = int(np.argmax(probs))
+        return self.labels[best], float(probs[best])
+
+    def save(self, path):
+        np.savez_compressed(
+            path,
+            labels=np.array(self.labels),
+            idf=self.idf.astype(np.float16),
+            weights=self.weights.astype(np.float16),
+            bias=self.bias,
+            meta=np.array(json.dumps(self.meta, ensure_ascii=False))
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                labels=data['labels'].tolist(),
+                idf=data['idf'],
+                weights=data['weights'],
+                bias=data['bias'],
+                meta=json.loads(str(data['meta']))
+            )
+
+
+def train(texts, labels, dim=DEFAULT_DIM, epochs=300, learning_rate=2.0, l2=1e-4):
+    """
+    Ajusta o modelo por gradiente descendente em lote inteiro (softmax +
+    entropia cruzada, regularização L2). Corpora de milhares de frases cabem
+    numa matriz densa n × dim
+    """
+    classes = sorted(set(labels))
+    targets = np.array([classes.index(label) for label in labels])
+    counts = [hashed_counts(text, dim) for text in texts]
+
+    # IDF suavizado: log((1 + n) / (1 + df)) + 1
+    df = np.zeros(dim, dtype=np.float32)
+    for row in counts:
+        df[list(row)] += 1
+    idf = (np.log((1 + len(texts)) / (1 + df)) + 1).astype(np.float32)
+
+    X = np.zeros((len(texts), dim), dtype=np.float32)
+    for i, row in enumerate(counts):
+        indices, values = _tfidf(row, idf)
+        X[i, indices] = values
+
+    Y = np.eye(len(classes), dtype=np.float32)[targets]
+    W = np.zeros((dim, len(classes)), dtype=np.float32)
+    b = np.zeros(len(classes), dtype=np.float32)
+
+    # Gradiente com momento; features normalizadas toleram passo alto
+    vW = np.zeros_like(W)
+    vb = np.zeros_like(b)
+    for _ in range(epochs):
+        error = (_softmax(X @ W + b) - Y) / len(texts)
+        vW = 0.9 * vW - learning_rate * (X.T @ error + l2 * W)
+        vb = 0.9 * vb - learning_rate * error.sum(axis=0)
+        W += vW
+        b += vb
+
+    meta = {'examples': len(texts), 'dim': dim, 'ngram_range': list(NGRAM_RANGE), 'epochs': epochs}
+    return IntentModel(classes, idf, W, b, meta)
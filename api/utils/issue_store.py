@@ -0,0 +1,252 @@
+"""
+Armazenamento local de issues e pull requests do GitHub
+Sincroniza apenas o delta (parâmetro `since`) e mantém os dados em
+colunas numpy para o cálculo vetorizado das métricas
+"""
+
+import os
+import threading
+
+import numpy as np
+
+from .github_api import github_get
+from .storage import get_cache_dir, load_json, save_json
+
+# Faixas do histograma de idade dos itens abertos (em dias)
+AGE_BUCKETS = [
+    ('< 1 dia', 0, 1),
+    ('1-7 dias', 1, 7),
+    ('7-30 dias', 7, 30),
+    ('30-90 dias', 30, 90),
+    ('> 90 dias', 90, None)
+]
+
+_SECONDS_PER_DAY = 86400.0
+
+
+def _to_datetime64(values):
+    """Converte datas ISO 8601 do GitHub (ou None) em datetime64[s] UTC"""
+    return np.array([v[:19] if v else 'NaT' for v in values], dtype='datetime64[s]')
+
+
+def _compact(item):
+    """Reduz a resposta da API aos campos usados nas métricas"""
+    pull_request = item.get('pull_request')
+    return [
+        item['number'],
+        bool(pull_request),
+        (item.get('user') or {}).get('login', 'desconhecido'),
+        item['created_at'],
+        item.get('closed_at'),
+        (pull_request or {}).get('merged_at')
+    ]
+
+
+class IssueStore:
+    """
+    Réplica local das issues/PRs de um repositório
+
+    A primeira sincronização baixa o histórico completo; as seguintes pedem
+    apenas o que mudou desde o último `updated_at` visto e atualizam as
+    colunas em memória só nas linhas afetadas.
+    """
+
+    def __init__(self, repo, path=None):
+        self.repo = repo
+        self.path = path or os.path.join(get_cache_dir('issues'), repo.replace('/', '__') + '.json')
+        self._lock = threading.Lock()
+
+        data = load_json(self.path, {}) or {}
+        self.cursor = data.get('cursor')
+        self._rows = data.get('items', [])
+        self._build_columns(self._rows)
+
+    def _build_columns(self, rows):
+        self._row_of = {row[0]: i for i, row in enumerate(rows)}
+        self.numbers = np.array([row[0] for row in rows], dtype=np.int64)
+        self.is_pr = np.array([row[1] for row in rows], dtype=bool)
+        self.authors = np.array([row[2] for row in rows], dtype=object)
+        self.created = _to_datetime64([row[3] for row in rows])
+        self.closed = _to_datetime64([row[4] for row in rows])
+        self.merged = _to_datetime64([row[5] for row in rows])
+
+    def _apply(self, rows):
+        """Atualiza as colunas com as linhas novas/alteradas (incremental)"""
+        new_rows = []
+
+        for row in rows:
+            idx = self._row_of.get(row[0])
+            if idx is None:
+                new_rows.append(row)
+                continue
+
+            self._rows[idx] = row
+            self.is_pr[idx] = row[1]
+            self.authors[idx] = row[2]
+            self.created[idx], self.closed[idx], self.merged[idx] = _to_datetime64(row[3:6])
+
+        if new_rows:
+            start = len(self._rows)
+            self._rows.extend(new_rows)
+            self._row_of.update({row[0]: start + i for i, row in enumerate(new_rows)})
+            self.numbers = np.concatenate([self.numbers, [row[0] for row in new_rows]])
+            self.is_pr = np.concatenate([self.is_pr, [row[1] for row in new_rows]])
+            self.authors = np.concatenate([self.authors, np.array([row[2] for row in new_rows], dtype=object)])
+            self.created = np.concatenate([self.created, _to_datetime64([row[3] for row in new_rows])])
+            self.closed = np.concatenate([self.closed, _to_datetime64([row[4] for row in new_rows])])
+            self.merged = np.concatenate([self.merged, _to_datetime64([row[5] for row in new_rows])])
+
+    def sync(self, github_token):
+        """
+        Busca no GitHub apenas issues/PRs atualizados desde a última sincronização
+        Retorna o número de itens novos ou alterados
+        """
+        with self._lock:
+            params = {'state': 'all', 'sort': 'updated', 'direction': 'asc', 'per_page': 100}
+            if self.cursor:
+                params['since'] = self.cursor
+
+            changed = []
+            cursor = self.cursor
+            page = 1
+
+            while True:
+                # O store já é o cache: as páginas não vão para o LRU de respostas
+                batch = github_get(f'/repos/{self.repo}/issues', github_token,
+                                   dict(params, page=page), cache=False)
+                for item in batch:
+                    changed.append(_compact(item))
+                    if not cursor or item['updated_at'] > cursor:
+                        cursor = item['updated_at']
+
+                if len(batch) < params['per_page']:
+                    break
+                page += 1
+
+            if changed:
+                self._apply(changed)
+
+            if changed or cursor != self.cursor:
+                self.cursor = cursor
+                save_json(self.path, {'repo': self.repo, 'cursor': self.cursor, 'items': self._rows})
+
+            print(f"[ISSUES] {self.repo}: {len(changed)} itens sincronizados ({len(self._rows)} no total)")
+            return len(changed)
+
+    def columns(self):
+        """Cópia das colunas atuais (_apply altera as colunas no lugar)"""
+        with self._lock:
+            return {
+                'is_pr': self.is_pr.copy(),
+                'authors': self.authors.copy(),
+                'created': self.created.copy(),
+                'closed': self.closed.copy(),
+                'merged': self.merged.copy()
+            }
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_issue_store(repo):
+    """Store em memória por repositório (reaproveitado entre requisições)"""
+    with _stores_lock:
+        if repo not in _stores:
+            _stores[repo] = IssueStore(repo)
+        return _stores[repo]
+
+
+def merge_columns(column_sets):
+    """Concatena as colunas de vários repositórios"""
+    column_sets = [c for c in column_sets if c]
+    if not column_sets:
+        return None
+    return {key: np.concatenate([c[key] for c in column_sets]) for key in column_sets[0]}
+
+
+def group_percentiles(codes, values, n_groups, quantiles):
+    """
+    Percentis por grupo, totalmente vetorizado
+    Ordena por (grupo, valor) uma vez e interpola as posições de cada
+    quantil a partir do início e do tamanho de cada grupo.
+    Retorna (counts, matriz n_groups x len(quantiles)) com NaN em grupos vazios
+    """
+    order = np.lexsort((values, codes))
+    sorted_values = values[order]
+    counts = np.bincount(codes, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    result = np.full((n_groups, len(quantiles)), np.nan)
+    has_data = counts > 0
+    if not has_data.any():
+        return counts, result
+
+    q = np.asarray(quantiles, dtype=float)[None, :]
+    pos = starts[has_data, None] + q * (counts[has_data, None] - 1)
+    lower = np.floor(pos).astype(np.int64)
+    upper = np.ceil(pos).astype(np.int64)
+    frac = pos - lower
+    result[has_data] = sorted_values[lower] * (1 - frac) + sorted_values[upper] * frac
+
+    return counts, result
+
+
+def _per_author(authors, durations, quantiles=(0.5, 0.9)):
+    """Contagem e percentis (em dias) por autor, do mais ativo para o menos"""
+    if len(durations) == 0:
+        return []
+
+    names, codes = np.unique(authors.astype(str), return_inverse=True)
+    counts, percentiles = group_percentiles(codes, durations, len(names), quantiles)
+
+    order = np.argsort(-counts, kind='stable')
+    return [
+        (str(names[i]), int(counts[i])) + tuple(round(float(p), 1) for p in percentiles[i])
+        for i in order if counts[i] > 0
+    ]
+
+
+def compute_issue_analytics(columns, now=None):
+    """
+    Calcula as métricas de issues/PRs a partir das colunas:
+    histograma de idade dos itens abertos, tempo até fechar (issues)
+    e lead time até o merge (PRs) por autor
+    """
+    now = now if now is not None else np.datetime64('now', 's')
+
+    is_pr = columns['is_pr']
+    created = columns['created']
+    closed = columns['closed']
+    merged = columns['merged']
+    authors = columns['authors']
+
+    is_open = np.isnat(closed)
+
+    # Idade dos itens abertos em dias
+    age_days = (now - created).astype(np.float64) / _SECONDS_PER_DAY
+    edges = [low for _, low, _ in AGE_BUCKETS] + [np.inf]
+    issue_hist, _ = np.histogram(age_days[is_open & ~is_pr], bins=edges)
+    pr_hist, _ = np.histogram(age_days[is_open & is_pr], bins=edges)
+
+    # Tempo até fechar (issues) e lead time até o merge (PRs), em dias
+    closed_issues = ~is_open & ~is_pr
+    close_days = (closed[closed_issues] - created[closed_issues]).astype(np.float64) / _SECONDS_PER_DAY
+
+    merged_prs = is_pr & ~np.isnat(merged)
+    lead_days = (merged[merged_prs] - created[merged_prs]).astype(np.float64) / _SECONDS_PER_DAY
+
+    return {
+        'open_issues': int((is_open & ~is_pr).sum()),
+        'open_prs': int((is_open & is_pr).sum()),
+        'age_buckets': [
+            (label, int(issue_hist[i]), int(pr_hist[i]))
+            for i, (label, _, _) in enumerate(AGE_BUCKETS)
+        ],
+        'closed_issues': int(closed_issues.sum()),
+        'merged_prs': int(merged_prs.sum()),
+        'close_p50_days': round(float(np.median(close_days)), 1) if len(close_days) else None,
+        'lead_p50_days': round(float(np.median(lead_days)), 1) if len(lead_days) else None,
+        'time_to_close': _per_author(authors[closed_issues], close_days),
+        'pr_lead_time': _per_author(authors[merged_prs], lead_days)
+    }
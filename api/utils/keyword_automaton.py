@@ -0,0 +1,64 @@
+"""
+Autômato de palavras-chave (Aho–Corasick)
+Construído uma vez a partir de {grupo: [palavras]}; `scan` percorre o texto
+uma única vez e devolve os grupos que têm alguma palavra contida nele (mesma
+semântica de `any(palavra in texto ...)`, inclusive dentro de outras palavras).
+As transições de falha são resolvidas na construção, então cada caractere
+custa uma consulta a dicionário
+"""
+
+from collections import deque
+
+
+class KeywordAutomaton:
+    """Encontra, numa passada, todos os grupos de palavras-chave presentes num texto"""
+
+    def __init__(self, groups):
+        # Trie: transições e grupos que terminam em cada estado
+        goto = [{}]
+        output = [set()]
+
+        for group, keywords in groups.items():
+            for keyword in keywords:
+                state = 0
+                for char in keyword:
+                    if char not in goto[state]:
+                        goto.append({})
+                        output.append(set())
+                        goto[state][char] = len(goto) - 1
+                    state = goto[state][char]
+                output[state].add(group)
+
+        # Falhas em largura: o maior sufixo próprio que também é prefixo na trie.
+        # Cada estado herda as transições e as saídas do seu estado de falha
+        fail = [0] * len(goto)
+        delta = [dict(transitions) for transitions in goto]
+        queue = deque(goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+            for char, fallback in delta[fail[state]].items():
+                delta[state].setdefault(char, fallback)
+            output[state] |= output[fail[state]]
+
+            for char, child in goto[state].items():
+                fail[child] = delta[fail[state]].get(char, 0)
+                queue.append(child)
+
+        self._delta = delta
+        self._output = [frozenset(groups_) for groups_ in output]
+        self.states = len(goto)
+
+    def scan(self, text):
+        """Grupos com pelo menos uma palavra contida em `text`"""
+        delta = self._delta
+        output = self._output
+        state = 0
+        found = set()
+
+        for char in text:
+            state = delta[state].get(char, 0)
+            if output[state]:
+                found |= output[state]
+
+        return found
@@ -0,0 +1,74 @@
+"""
+Consumo das chamadas ao LLM
+Cada chamada registra tokens de prompt (e quantos vieram do cache de prompt
+do provedor), tokens de resposta e latência; a métrica 'llm_usage' expõe
+totais e percentis de latência por chamador (ex.: 'intent', 'intent_agent')
+"""
+
+import threading
+from collections import deque
+
+import numpy as np
+
+from .metrics import register_metrics
+
+# Latências guardadas por chamador para os percentis
+LATENCY_WINDOW = 500
+
+_usage = {}
+_lock = threading.Lock()
+
+
+def parse_openai_usage(usage):
+    """(prompt, completion, cached) do campo `usage` da API de chat da OpenAI"""
+    usage = usage or {}
+    details = usage.get('prompt_tokens_details') or {}
+    return (
+        int(usage.get('prompt_tokens') or 0),
+        int(usage.get('completion_tokens') or 0),
+        int(details.get('cached_tokens') or 0)
+    )
+
+
+def record_llm_call(caller, seconds, prompt_tokens=0, completion_tokens=0, cached_tokens=0, ok=True):
+    """Registra uma chamada (também as que falharam, com ok=False)"""
+    with _lock:
+        entry = _usage.get(caller)
+        if entry is None:
+            entry = _usage[caller] = {
+                'calls': 0, 'errors': 0, 'prompt_tokens': 0, 'completion_tokens': 0,
+                'cached_tokens': 0, 'latencies': deque(maxlen=LATENCY_WINDOW)
+            }
+        entry['calls'] += 1
+        entry['errors'] += 0 if ok else 1
+        entry['prompt_tokens'] += prompt_tokens
+        entry['completion_tokens'] += completion_tokens
+        entry['cached_tokens'] += cached_tokens
+        entry['latencies'].append(seconds)
+
+    print(f"[LLM] {caller}: {seconds * 1000:.0f} ms, prompt {prompt_tokens} "
+          f"(cache {cached_tokens}), resposta {completion_tokens} tokens")
+
+
+def _snapshot():
+    with _lock:
+        result = {}
+        for caller, entry in _usage.items():
+            latencies = np.array(entry['latencies']) * 1000
+            p50, p95 = np.percentile(latencies, [50, 95]).round(1).tolist() if len(latencies) else (0, 0)
+            calls = entry['calls']
+            result[caller] = {
+                'calls': calls,
+                'errors': entry['errors'],
+                'prompt_tokens': entry['prompt_tokens'],
+                'completion_tokens': entry['completion_tokens'],
+                'cached_tokens': entry['cached_tokens'],
+                'avg_prompt_tokens': round(entry['prompt_tokens'] / calls, 1) if calls else 0,
+                'avg_completion_tokens': round(entry['completion_tokens'] / calls, 1) if calls else 0,
+                'latency_ms_p50': p50,
+                'latency_ms_p95': p95
+            }
+        return result
+
+
+register_metrics('llm_usage', _snapshot)
@@ -0,0 +1,27 @@
+"""
+Superfície de métricas do bot
+Cada módulo registra uma função que devolve seu estado atual (dict),
+e collect_metrics() junta tudo para exposição via GET /api/slack/events
+"""
+
+import time
+
+_sources = {}
+
+
+def register_metrics(name, snapshot_fn):
+    """Registra (ou substitui) uma fonte de métricas"""
+    _sources[name] = snapshot_fn
+
+
+def collect_metrics():
+    """Coleta o estado de todas as fontes registradas"""
+    metrics = {'collected_at': int(time.time())}
+
+    for name, snapshot_fn in list(_sources.items()):
+        try:
+            metrics[name] = snapshot_fn()
+        except Exception as e:
+            metrics[name] = {'error': str(e)}
+
+    return metrics
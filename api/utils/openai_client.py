@@ -0,0 +1,157 @@
+"""
+Cliente compartilhado da API de chat da OpenAI
+Os dois classificadores (webhook e agente LangGraph) chamam a API por aqui:
+conexões HTTPS persistentes num pool pequeno (OPENAI_POOL_SIZE, padrão 4)
+evitam um handshake TLS por mensagem, e todas as chamadas registram tokens
+e latência em 'llm_usage'. A métrica 'openai_pool' mostra conexões abertas
+e reaproveitadas
+"""
+
+import http.client
+import json
+import os
+import queue
+import threading
+import time
+
+from .llm_usage import parse_openai_usage, record_llm_call
+from .metrics import register_metrics
+
+OPENAI_HOST = 'api.openai.com'
+CHAT_COMPLETIONS_PATH = '/v1/chat/completions'
+DEFAULT_MODEL = 'gpt-4o-mini'
+DEFAULT_POOL_SIZE = 4
+DEFAULT_TIMEOUT = 10
+
+
+class OpenAIError(Exception):
+    """Resposta HTTP de erro da API (status e corpo)"""
+
+    def __init__(self, status, body):
+        super().__init__(f"HTTP {status}: {body[:200]}")
+        self.status = status
+
+
+class ConnectionPool:
+    """Conexões keep-alive para um host; cada uma é usada por uma thread por vez"""
+
+    def __init__(self, host, size):
+        self.host = host
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+
+    def acquire(self, timeout):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                self.created += 1
+            return http.client.HTTPSConnection(self.host, timeout=timeout), False
+
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        with self._lock:
+            self.reused += 1
+        return conn, True
+
+    def release(self, conn):
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def discard(self, conn):
+        conn.close()
+        with self._lock:
+            self.discarded += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'idle': self._idle.qsize(),
+                'created': self.created,
+                'reused': self.reused,
+                'discarded': self.discarded
+            }
+
+
+def _pool_size():
+    try:
+        return max(1, int(os.environ.get('OPENAI_POOL_SIZE', DEFAULT_POOL_SIZE)))
+    except ValueError:
+        return DEFAULT_POOL_SIZE
+
+
+_pool = ConnectionPool(OPENAI_HOST, _pool_size())
+register_metrics('openai_pool', _pool.snapshot)
+
+
+def _post(path, body, headers, timeout):
+    """
+    POST numa conexão do pool; retorna (status, corpo)
+    Conexão reaproveitada que o servidor já fechou é trocada por uma nova
+    uma vez (o pedido não chegou a ser processado)
+    """
+    for _ in range(2):
+        conn, reused = _pool.acquire(timeout)
+        try:
+            conn.request('POST', path, body=body, headers=headers)
+            response = conn.getresponse()
+            data = response.read()
+        except (http.client.RemoteDisconnected, http.client.CannotSendRequest,
+                BrokenPipeError, ConnectionResetError):
+            _pool.discard(conn)
+            if reused:
+                continue
+            raise
+        except Exception:
+            _pool.discard(conn)
+            raise
+
+        if response.will_close:
+            _pool.discard(conn)
+        else:
+            _pool.release(conn)
+        return response.status, data
+
+    raise ConnectionError(f"Sem conexão com {OPENAI_HOST}")
+
+
+def chat_json(openai_key, messages, max_tokens, response_format, caller,
+              temperature=0.3, model=DEFAULT_MODEL, timeout=DEFAULT_TIMEOUT):
+    """
+    Chat completions com saída estruturada; retorna o JSON do content (None
+    em recusa) e levanta exceção em erro. `caller` identifica a chamada em
+    'llm_usage'
+    """
+    payload = {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "response_format": response_format
+    }
+    headers = {
+        'Authorization': f'Bearer {openai_key}',
+        'Content-Type': 'application/json'
+    }
+
+    start = time.perf_counter()
+    try:
+        status, data = _post(CHAT_COMPLETIONS_PATH, json.dumps(payload).encode('utf-8'), headers, timeout)
+        if status != 200:
+            raise OpenAIError(status, data.decode('utf-8', 'replace'))
+        result = json.loads(data)
+    except Exception:
+        record_llm_call(caller, time.perf_counter() - start, ok=False)
+        raise
+
+    record_llm_call(caller, time.perf_counter() - start, *parse_openai_usage(result.get('usage')))
+
+    # JSON garantido pelo schema; recusas vêm sem content
+    content = result['choices'][0]['message'].get('content')
+    return json.loads(content) if content else None
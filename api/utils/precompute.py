@@ -0,0 +1,178 @@
+"""
+Pré-computação em segundo plano dos relatórios padrão
+Num processo de longa duração (servidor de eventos próprio ou run_slack_bot),
+uma thread atualiza periodicamente agregados, estatísticas e gráficos de
+"estatística de commits" e "estatística do trello"; os comandos respondem a
+partir desses artefatos enquanto estiverem frescos
+"""
+
+import os
+import threading
+import time
+
+from .chart_cache import cached_render
+from .github_api import resolve_github_repos
+from .metrics import register_metrics
+from .statistics import (
+    get_github_commits_stats,
+    generate_commits_chart,
+    commits_timeline_payload,
+    get_trello_cards_stats,
+    generate_trello_pie_chart,
+    render_chart
+)
+
+# Intervalo padrão entre atualizações (segundos); 0 desativa
+DEFAULT_INTERVAL = 300
+
+_artifacts = {}
+_artifacts_lock = threading.Lock()
+_last_run = {}
+
+
+def get_interval():
+    try:
+        return float(os.environ.get('PRECOMPUTE_INTERVAL', DEFAULT_INTERVAL))
+    except ValueError:
+        return DEFAULT_INTERVAL
+
+
+def commits_artifact_key(repos):
+    return 'commits:' + ','.join(repos)
+
+
+def trello_artifact_key(board_id):
+    return f'trello:{board_id}'
+
+
+def put_artifact(name, value):
+    with _artifacts_lock:
+        _artifacts[name] = {'value': value, 'built_at': time.time()}
+
+
+def get_artifact(name, max_age=None):
+    """
+    Artefato pré-computado, ou None se não existir ou estiver velho
+    Por padrão vale por dois intervalos (tolera um ciclo atrasado)
+    """
+    if max_age is None:
+        max_age = 2 * get_interval()
+
+    with _artifacts_lock:
+        entry = _artifacts.get(name)
+
+    if entry is None or time.time() - entry['built_at'] > max_age:
+        return None
+    return entry['value']
+
+
+def _precompute_commits(github_token, repos):
+    stats = get_github_commits_stats(github_token, repos, limit=100)
+    if not stats:
+        return False
+
+    # Renderizar agora deixa os gráficos no cache para o comando
+    generate_commits_chart(stats)
+    timeline = commits_timeline_payload(github_token, repos, days=30)
+    cached_render('commits_timeline', timeline[0], lambda: render_chart('commits_timeline', timeline[0]))
+
+    put_artifact(commits_artifact_key(repos), {'stats': stats, 'timeline': timeline})
+    return True
+
+
+def _precompute_trello(api_key, token, board_id):
+    stats = get_trello_cards_stats(api_key, token, board_id)
+    if not stats:
+        return False
+
+    generate_trello_pie_chart(stats)
+    put_artifact(trello_artifact_key(board_id), {'stats': stats})
+    return True
+
+
+def refresh_standard_reports():
+    """Atualiza os artefatos dos relatórios padrão configurados; retorna os tempos"""
+    github_token = os.environ.get('GITHUB_TOKEN')
+    trello_key = os.environ.get('TRELLO_API_KEY')
+    trello_token = os.environ.get('TRELLO_TOKEN')
+    board_id = os.environ.get('TRELLO_BOARD_ID')
+
+    tasks = {}
+    repos = resolve_github_repos(github_token)
+    if github_token and repos:
+        tasks['commits'] = lambda: _precompute_commits(github_token, repos)
+    if trello_key and trello_token and board_id:
+        tasks['trello'] = lambda: _precompute_trello(trello_key, trello_token, board_id)
+
+    timings = {}
+    for name, task in tasks.items():
+        start = time.perf_counter()
+        try:
+            ok = task()
+        except Exception as e:
+            print(f"[PRECOMPUTE] Erro ao atualizar '{name}': {e}")
+            ok = False
+        timings[name] = {'ok': ok, 'seconds': round(time.perf_counter() - start, 3)}
+
+    _last_run.clear()
+    _last_run.update({'finished_at': time.time(), 'reports': timings})
+    print(f"[PRECOMPUTE] Relatórios atualizados: {timings}")
+
+    return timings
+
+
+class PrecomputeScheduler(threading.Thread):
+    """Thread daemon que chama refresh_standard_reports a cada `interval` segundos"""
+
+    def __init__(self, interval):
+        super().__init__(name='precompute-scheduler', daemon=True)
+        self.interval = interval
+        self.runs = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            refresh_standard_reports()
+            self.runs += 1
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def start_precompute_scheduler(interval=None):
+    """
+    Inicia (uma vez por processo) o agendador; PRECOMPUTE_INTERVAL=0 desativa
+    Retorna o agendador ou None
+    """
+    global _scheduler
+
+    interval = get_interval() if interval is None else interval
+    if interval <= 0:
+        print("[PRECOMPUTE] Agendador desativado (PRECOMPUTE_INTERVAL=0)")
+        return None
+
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = PrecomputeScheduler(interval)
+            _scheduler.start()
+            print(f"[PRECOMPUTE] Agendador iniciado (a cada {interval:.0f}s)")
+        return _scheduler
+
+
+def _snapshot():
+    with _artifacts_lock:
+        ages = {name: round(time.time() - entry['built_at'], 1) for name, entry in _artifacts.items()}
+    return {
+        'running': _scheduler is not None,
+        'runs': _scheduler.runs if _scheduler else 0,
+        'artifact_ages': ages,
+        'last_run': dict(_last_run)
+    }
+
+
+register_metrics('precompute', _snapshot)
@@ -0,0 +1,339 @@
+"""
+Agregados diários materializados
+Commits: contagem por dia × autor de cada repositório, atualizada só com os
+commits novos (parâmetro `since`); cards: contagem por dia × lista do quadro.
+Relatórios leem os agregados, com custo proporcional ao número de dias e não
+ao número de eventos. Os dias são contados no fuso PMO_TIMEZONE
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .aggregation import commit_columns, count_by_category
+from .github_api import github_get, get_max_workers, parse_repo_list
+from .metrics import register_metrics
+from .storage import get_cache_dir, load_json, save_json
+from .trello_api import trello_get
+from .windows import get_timezone, timezone_name, today, local_dates
+
+# Janela de histórico mantida nos agregados (dias); o dobro da maior janela
+# dos relatórios (90 dias), para comparar com o período anterior
+DEFAULT_HISTORY_DAYS = 180
+
+# Intervalo mínimo entre sincronizações de um mesmo agregado (segundos)
+DEFAULT_SYNC_INTERVAL = 60
+
+# Dias antes do cursor relidos a cada sincronização de commits
+DEFAULT_OVERLAP_DAYS = 7
+
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _history_days():
+    return _env_int('ROLLUP_HISTORY_DAYS', DEFAULT_HISTORY_DAYS)
+
+
+def _sync_interval():
+    return _env_int('ROLLUP_SYNC_INTERVAL', DEFAULT_SYNC_INTERVAL)
+
+
+def _overlap_days():
+    return max(0, _env_int('ROLLUP_OVERLAP_DAYS', DEFAULT_OVERLAP_DAYS))
+
+
+def max_window_days():
+    """Maior janela que ainda tem o período anterior inteiro no histórico"""
+    return max(1, _history_days() // 2)
+
+
+def _oldest_day():
+    return str(today() - np.timedelta64(_history_days(), 'D'))
+
+
+def _store_path(kind, name):
+    return os.path.join(get_cache_dir('rollups', kind), name.replace('/', '__') + '.json')
+
+
+class CommitRollup:
+    """
+    Commits por dia × autor de um repositório
+    `cursor` é a maior data de commit já vista. Commits podem chegar depois
+    com data mais antiga (merge sem squash, rebase, push de trabalho local
+    antigo), então cada sincronização relê uma janela de sobreposição
+    (ROLLUP_OVERLAP_DAYS antes do cursor) e descarta os já contados por SHA;
+    `seen` guarda os SHAs por dia de commit só dentro dessa janela
+    """
+
+    def __init__(self, repo, path=None):
+        self.repo = repo
+        self.path = path or _store_path('commits', repo)
+        self._lock = threading.Lock()
+        self.synced_at = 0
+
+        data = load_json(self.path, {}) or {}
+        # Dias contados em outro fuso não se misturam: recomeça o histórico
+        if data.get('timezone', 'UTC') != timezone_name():
+            data = {}
+        self.cursor = data.get('cursor')
+        self.seen = {day: set(shas) for day, shas in (data.get('seen') or {}).items()}
+        if data.get('boundary') and self.cursor:
+            # Formato anterior: só os SHAs com a data do cursor
+            self.seen.setdefault(self.cursor[:10], set()).update(data['boundary'])
+        self.days = data.get('days', {})
+
+    def _since(self):
+        """Início da leitura: cursor menos a janela de sobreposição"""
+        if not self.cursor:
+            return f'{_oldest_day()}T00:00:00Z'
+        cursor = np.datetime64(self.cursor.rstrip('Z'), 's')
+        since = cursor - np.timedelta64(_overlap_days(), 'D')
+        return f'{max(since, np.datetime64(_oldest_day())).astype("datetime64[s]")}Z'
+
+    def sync(self, github_token, force=False):
+        """
+        Incorpora os commits novos desde a última sincronização
+        Retorna o número de commits adicionados
+        """
+        with self._lock:
+            if not force and time.time() - self.synced_at < _sync_interval():
+                return 0
+
+            params = {'since': self._since(), 'per_page': 100}
+            seen = {sha for shas in self.seen.values() for sha in shas}
+            new_commits = []
+            new_seen = {}
+            cursor = self.cursor
+            page = 1
+
+            while True:
+                # O próprio agregado substitui o cache de respostas do cliente
+                batch = github_get(f'/repos/{self.repo}/commits', github_token,
+                                   dict(params, page=page), cache=False)
+
+                for commit in batch:
+                    sha = commit['sha']
+                    if sha in seen:
+                        continue
+                    seen.add(sha)
+                    new_commits.append(commit)
+
+                    committed_at = commit['commit']['committer']['date']
+                    new_seen.setdefault(committed_at[:10], set()).add(sha)
+                    if not cursor or committed_at > cursor:
+                        cursor = committed_at
+
+                if len(batch) < params['per_page']:
+                    break
+                page += 1
+
+            # Só depois da leitura completa: SHAs vistos e contagens andam juntos
+            if new_commits:
+                self._add(new_commits)
+                for day, shas in new_seen.items():
+                    self.seen.setdefault(day, set()).update(shas)
+
+            self.synced_at = time.time()
+            if new_commits or cursor != self.cursor:
+                self.cursor = cursor
+                self._prune()
+                save_json(self.path, {
+                    'repo': self.repo,
+                    'timezone': timezone_name(),
+                    'cursor': self.cursor,
+                    'seen': {day: sorted(shas) for day, shas in self.seen.items()},
+                    'days': self.days
+                })
+
+            print(f"[ROLLUP] {self.repo}: {len(new_commits)} commits novos ({len(self.days)} dias)")
+            return len(new_commits)
+
+    def _add(self, commits):
+        columns = commit_columns(commits)
+        dates = local_dates(columns['timestamps'], get_timezone()).astype(str)
+
+        for day, author in zip(dates.tolist(), columns['authors']):
+            counts = self.days.setdefault(day, {})
+            counts[author] = counts.get(author, 0) + 1
+
+    def _prune(self):
+        oldest = _oldest_day()
+        for day in [d for d in self.days if d < oldest]:
+            del self.days[day]
+
+        # SHAs anteriores à janela de sobreposição nunca mais são relidos
+        first_seen = str(np.datetime64(self.cursor[:10]) - np.timedelta64(_overlap_days(), 'D'))
+        for day in [d for d in self.seen if d < first_seen]:
+            del self.seen[day]
+
+    def daily(self):
+        """Cópia de {dia: {autor: commits}}"""
+        with self._lock:
+            return {day: dict(counts) for day, counts in self.days.items()}
+
+    def snapshot(self):
+        with self._lock:
+            return {'days': len(self.days), 'cursor': self.cursor, 'synced_at': self.synced_at}
+
+
+class CardRollup:
+    """
+    Cards por dia × lista de um quadro do Trello
+    Guarda uma fotografia por dia (a última sincronização do dia prevalece)
+    """
+
+    def __init__(self, board_id, path=None):
+        self.board_id = board_id
+        self.path = path or _store_path('cards', board_id)
+        self._lock = threading.Lock()
+        self.synced_at = 0
+
+        data = load_json(self.path, {}) or {}
+        if data.get('timezone', 'UTC') != timezone_name():
+            data = {}
+        self.total_lists = data.get('total_lists', 0)
+        self.days = data.get('days', {})
+
+    def sync(self, api_key, token, force=False):
+        """Atualiza a fotografia do dia com a contagem atual de cards por lista"""
+        with self._lock:
+            if not force and time.time() - self.synced_at < _sync_interval():
+                return False
+
+            cards = trello_get(f'/boards/{self.board_id}/cards', api_key, token)
+            lists = trello_get(f'/boards/{self.board_id}/lists', api_key, token)
+
+            list_names = {lst['id']: lst['name'] for lst in lists}
+            counts = dict(count_by_category(
+                [list_names.get(card['idList'], 'Desconhecida') for card in cards]
+            ))
+
+            self.days[str(today())] = counts
+            self.total_lists = len(lists)
+            self.synced_at = time.time()
+
+            oldest = _oldest_day()
+            for day in [d for d in self.days if d < oldest]:
+                del self.days[day]
+
+            save_json(self.path, {
+                'board_id': self.board_id,
+                'timezone': timezone_name(),
+                'total_lists': self.total_lists,
+                'days': self.days
+            })
+            return True
+
+    def latest(self):
+        """{lista: cards} da fotografia mais recente"""
+        with self._lock:
+            if not self.days:
+                return {}
+            return dict(self.days[max(self.days)])
+
+    def daily(self):
+        """Cópia de {dia: {lista: cards}}"""
+        with self._lock:
+            return {day: dict(counts) for day, counts in self.days.items()}
+
+
+_commit_rollups = {}
+_card_rollups = {}
+_rollups_lock = threading.Lock()
+
+
+def get_commit_rollup(repo):
+    """Agregado de commits em memória por repositório (reaproveitado entre requisições)"""
+    with _rollups_lock:
+        if repo not in _commit_rollups:
+            _commit_rollups[repo] = CommitRollup(repo)
+        return _commit_rollups[repo]
+
+
+def get_card_rollup(board_id):
+    """Agregado de cards em memória por quadro"""
+    with _rollups_lock:
+        if board_id not in _card_rollups:
+            _card_rollups[board_id] = CardRollup(board_id)
+        return _card_rollups[board_id]
+
+
+def sync_commit_rollups(github_token, repos, max_workers=None):
+    """
+    Sincroniza os agregados de vários repositórios em paralelo
+    Retorna {repo: agregado}; repositórios com erro ficam de fora, e o erro
+    só é propagado se todos falharem
+    """
+    repos = parse_repo_list(repos)
+    if not repos:
+        return {}
+
+    rollups = {}
+    errors = {}
+    workers = min(max_workers or get_max_workers(), len(repos))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            repo: executor.submit(get_commit_rollup(repo).sync, github_token)
+            for repo in repos
+        }
+
+        for repo, future in futures.items():
+            try:
+                future.result()
+                rollups[repo] = get_commit_rollup(repo)
+            except Exception as e:
+                print(f"[ROLLUP] Erro ao sincronizar {repo}: {e}")
+                errors[repo] = e
+
+    if errors and len(errors) == len(repos):
+        raise next(iter(errors.values()))
+
+    return rollups
+
+
+def sync_card_rollup(api_key, token, board_id):
+    """Sincroniza (se preciso) e retorna o agregado de cards do quadro"""
+    rollup = get_card_rollup(board_id)
+    rollup.sync(api_key, token)
+    return rollup
+
+
+def latest_days(daily, limit):
+    """
+    Dias mais recentes (do mais novo ao mais antigo) até somar `limit` commits
+    Dias entram inteiros, então o total pode passar um pouco de `limit`
+    """
+    selected = []
+    total = 0
+
+    for day in sorted(daily, reverse=True):
+        if total >= limit:
+            break
+        selected.append(day)
+        total += sum(daily[day].values())
+
+    return selected
+
+
+def sum_by_author(daily, days):
+    """{autor: commits} somando os dias informados"""
+    totals = {}
+    for day in days:
+        for author, count in daily.get(day, {}).items():
+            totals[author] = totals.get(author, 0) + count
+    return totals
+
+
+register_metrics('rollups', lambda: {
+    'commits': {repo: rollup.snapshot() for repo, rollup in list(_commit_rollups.items())},
+    'boards': list(_card_rollups)
+})
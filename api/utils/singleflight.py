@@ -0,0 +1,102 @@
+"""
+Coalescência de chamadas idênticas em andamento (single-flight)
+Quando várias threads pedem a mesma operação com os mesmos argumentos ao
+mesmo tempo (ex.: "estatística do trello" disparado por várias pessoas na
+daily), só a primeira executa; as demais esperam e recebem o mesmo resultado
+(ou a mesma exceção). Nada é guardado depois que a chamada termina: isso é
+papel dos caches de cada módulo. A métrica 'singleflight' mostra, por
+operação, quantas chamadas foram atendidas por outra já em andamento
+"""
+
+import threading
+
+from .metrics import register_metrics
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Grupo de chamadas de uma operação, indexadas por chave (argumentos hasheáveis)"""
+
+    def __init__(self, name):
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Executa `fn(*args, **kwargs)` ou, se já houver uma execução com a
+        mesma `key` em andamento, espera por ela e devolve seu resultado
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+                leader = True
+            else:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+            if call.waiters:
+                print(f"[SINGLEFLIGHT] {self.name}: {call.waiters} chamada(s) aproveitaram a mesma execução")
+
+    def snapshot(self):
+        with self._lock:
+            calls = self.executions + self.coalesced
+            return {
+                'calls': calls,
+                'executions': self.executions,
+                'coalesced': self.coalesced,
+                'coalesced_ratio': round(self.coalesced / calls, 3) if calls else 0,
+                'in_flight': len(self._calls)
+            }
+
+
+_groups = {}
+_groups_lock = threading.Lock()
+
+
+def single_flight(name):
+    """Grupo compartilhado da operação `name` (criado na primeira chamada)"""
+    with _groups_lock:
+        group = _groups.get(name)
+        if group is None:
+            group = _groups[name] = SingleFlight(name)
+        return group
+
+
+def _snapshot():
+    with _groups_lock:
+        groups = list(_groups.values())
+    return {group.name: group.snapshot() for group in groups}
+
+
+register_metrics('singleflight', _snapshot)
@@ -0,0 +1,324 @@
+"""
+Tokenizador e gramática de slots das mensagens
+Cada mensagem é tokenizada uma única vez (menções do Slack removidas,
+trechos entre aspas viram um token só, pontuação final descartada) em duas
+listas paralelas: palavras originais e minúsculas (None nos trechos entre
+aspas, que nunca casam com palavras da gramática). Uma gramática pequena
+sobre os tokens extrai os slots: nome do card, lista de destino, novo nome,
+limite e status. O classificador por regras e o agente LangGraph usam a
+mesma extração; valores preservam a caixa original
+"""
+
+import re
+from dataclasses import dataclass
+
+_MENTION_RE = re.compile(r'<[@#!][^>]*>')
+_TOKEN_RE = re.compile(r'"([^"]*)"|\'([^\']*)\'|(\S+)')
+_WORD_RE = re.compile(r'\S+')
+_TRAILING_PUNCT = '?!.,;:'
+
+# Verbo de comando → ação
+COMMAND_VERBS = {
+    'criar': 'create', 'cria': 'create', 'crie': 'create', 'adicionar': 'create', 'adiciona': 'create',
+    'mover': 'move', 'move': 'move', 'mova': 'move', 'mudar': 'move', 'muda': 'move', 'mude': 'move',
+    'transferir': 'move', 'transfere': 'move', 'passa': 'move', 'passar': 'move', 'joga': 'move',
+    'deletar': 'delete', 'deleta': 'delete', 'excluir': 'delete', 'exclua': 'delete', 'remover': 'delete',
+    'remove': 'delete', 'apagar': 'delete', 'apaga': 'delete',
+    'atualizar': 'update', 'atualiza': 'update', 'editar': 'update', 'edita': 'update',
+    'modificar': 'update', 'alterar': 'update', 'altera': 'update',
+}
+
+# Palavras entre o verbo e o nome ("criar um card chamado X", "excluir todos os cards com o nome X")
+_LEADING_FILLERS = {
+    'o', 'a', 'os', 'as', 'um', 'uma', 'meu', 'minha', 'card', 'cards', 'tarefa', 'tarefas',
+    'chamado', 'chamada', 'todos', 'todas', 'com', 'nome', 'de', 'do', 'da', 'descrição', 'descricao',
+}
+# "novo card X" / "nova tarefa X" só contam como comando antes de card/tarefa
+_CREATE_ADJECTIVES = {'novo', 'nova'}
+_OBJECT_WORDS = {'card', 'tarefa'}
+_LIST_WORDS = {'lista', 'coluna'}
+_TARGET_PREPS = {'para', 'pra', 'pro'}
+_UPDATE_PREPS = {'com', 'para', 'pra'}
+
+# Verbos de ligação que encerram o nome em "o card X está pronto"
+_STATUS_COPULAS = {'está', 'esta', 'ta', 'tá', 'ficou', 'foi', 'precisa', 'em', 'sendo', 'finalizado',
+                   'concluído', 'concluido', 'pronto', 'feito', 'completo'}
+
+# Frases de status, das mais específicas para as mais genéricas (primeira vence)
+# Vale para os dois caminhos: "pronto" (como "está pronto") vai para Revisão
+# de código e "finalizado"/"completo" para Concluído. A tabela antiga do
+# agente LangGraph fazia o contrário nessas três palavras soltas
+STATUS_PHRASES = [
+    ('finalizado completamente', 'concluído'),
+    ('está sendo feito', 'em desenvolvimento'),
+    ('estou fazendo', 'em desenvolvimento'),
+    ('precisa revisar', 'revisão'),
+    ('para revisar', 'revisão'),
+    ('está pronto', 'revisão'),
+    ('ficou pronto', 'revisão'),
+    ('em andamento', 'em desenvolvimento'),
+    ('precisa fazer', 'a fazer'),
+    ('para fazer', 'a fazer'),
+    ('vou fazer', 'a fazer'),
+    ('fazer depois', 'a fazer'),
+    ('concluído', 'concluído'),
+    ('concluido', 'concluído'),
+    ('concluída', 'concluído'),
+    ('finalizado', 'concluído'),
+    ('feito', 'concluído'),
+    ('completo', 'concluído'),
+    ('terminei', 'revisão'),
+    ('acabei', 'revisão'),
+    ('pronto', 'revisão'),
+    ('revisão', 'revisão'),
+    ('review', 'revisão'),
+    ('comecei', 'em desenvolvimento'),
+    ('iniciado', 'em desenvolvimento'),
+    ('trabalhando', 'em desenvolvimento'),
+    ('desenvolvendo', 'em desenvolvimento'),
+    ('fazendo', 'em desenvolvimento'),
+]
+
+# Frases indexadas pela primeira palavra; entre as encontradas vence a de menor posição na tabela
+_STATUS_INDEX = {}
+for _rank, (_phrase, _status_value) in enumerate(STATUS_PHRASES):
+    _STATUS_INDEX.setdefault(_phrase.split()[0], []).append((_rank, tuple(_phrase.split()), _status_value))
+
+# Verbos de status que abrem a frase ("terminei o card X", "estou fazendo X")
+_STATUS_OPENERS = [('estou', 'fazendo'), ('estou', 'trabalhando', 'no'), ('estou', 'trabalhando', 'na'),
+                   ('estou', 'desenvolvendo'), ('comecei',), ('terminei',), ('acabei',), ('vou', 'fazer')]
+
+
+def tokenize(text):
+    """(palavras, minúsculas) da mensagem sem menções; aspas agrupam, pontuação final sai"""
+    text = text or ''
+    if '<' in text:
+        text = _MENTION_RE.sub(' ', text)
+
+    if '"' not in text and "'" not in text:
+        # Caminho comum: só palavras
+        words = [word.rstrip(_TRAILING_PUNCT) or word for word in text.split()]
+        return words, [word.lower() for word in words]
+
+    words, lowers = [], []
+    for match in _TOKEN_RE.finditer(text):
+        if match.group(3) is None:
+            value = (match.group(1) if match.group(1) is not None else match.group(2)).strip()
+            if value:
+                words.append(value)
+                lowers.append(None)
+            continue
+
+        word = match.group(3).rstrip(_TRAILING_PUNCT) or match.group(3)
+        word = word.strip('"\'') or word
+        words.append(word)
+        lowers.append(word.lower())
+    return words, lowers
+
+
+@dataclass(slots=True)
+class Slots:
+    action: str = None
+    card_name: str = None
+    target_list: str = None
+    new_name: str = None
+    limit: int = None
+    status: str = None
+
+
+class Message:
+    """Mensagem tokenizada uma vez; slots extraídos sob demanda e memorizados"""
+
+    # Memo manual: functools.cached_property usa lock por acesso no Python 3.11
+    __slots__ = ('text', 'lower', '_tokens', '_slots')
+
+    def __init__(self, text):
+        self.text = text or ''
+        self.lower = _MENTION_RE.sub('', self.text.lower()).strip()
+        self._tokens = None
+        self._slots = {}
+
+    @property
+    def tokens(self):
+        if self._tokens is None:
+            self._tokens = tokenize(self.text)
+        return self._tokens
+
+    @property
+    def slots(self):
+        """Slots com a ação deduzida do primeiro verbo de comando"""
+        return self.slots_for(None)
+
+    @property
+    def limit(self):
+        """Primeiro número da mensagem ("últimos 5 commits"), ou None"""
+        return _limit(*self.tokens)
+
+    def slots_for(self, action):
+        """Slots lidos como `action` ('create', 'move', ...), já decidida pelo classificador"""
+        if action not in self._slots:
+            self._slots[action] = parse_slots(self.tokens, action)
+        return self._slots[action]
+
+
+def _span(words, start, end=None):
+    """Palavras [start:end] juntas com espaço, ou None"""
+    return ' '.join(words[start:end]) or None
+
+
+def _skip(lowers, i, words):
+    while i < len(lowers) and lowers[i] in words:
+        i += 1
+    return i
+
+
+def _find(lowers, i, words):
+    for j in range(i, len(lowers)):
+        if lowers[j] in words:
+            return j
+    return None
+
+
+def _phrase_at(lowers, i, phrase):
+    return tuple(lowers[i:i + len(phrase)]) == phrase
+
+
+def _skip_list_words(lowers, i):
+    """Pula "lista"/"a lista" antes do nome da lista (mas não o "A" de "A fazer")"""
+    if i + 1 < len(lowers) and lowers[i] in ('a', 'o') and lowers[i + 1] in _LIST_WORDS:
+        return i + 2
+    if i < len(lowers) and lowers[i] in _LIST_WORDS:
+        return i + 1
+    return i
+
+
+def _find_verb(lowers):
+    """Posição e ação do primeiro verbo de comando (ou (None, None))"""
+    for i, lower in enumerate(lowers):
+        if lower in COMMAND_VERBS:
+            return i, COMMAND_VERBS[lower]
+        if lower in _CREATE_ADJECTIVES and i + 1 < len(lowers) and lowers[i + 1] in _OBJECT_WORDS:
+            return i, 'create'
+    return None, None
+
+
+def _clean_name(words, start):
+    """Limites do nome sem numeração de listagem ("3.") e sufixo "(ID: ...)" copiados do bot"""
+    if len(words) - start > 1 and words[start].rstrip('.').isdigit():
+        start += 1
+    for j in range(start + 1, len(words)):
+        if words[j].startswith('('):
+            return start, j
+    return start, None
+
+
+def _status(lowers):
+    best = None
+    for i, lower in enumerate(lowers):
+        for rank, phrase, status in _STATUS_INDEX.get(lower, ()):
+            if (best is None or rank < best[0]) and _phrase_at(lowers, i, phrase):
+                best = (rank, status)
+    return best[1] if best else None
+
+
+def _limit(words, lowers):
+    for word, lower in zip(words, lowers):
+        if lower is not None and word.isdigit():
+            return int(word)
+    return None
+
+
+def _command_slots(slots, words, lowers, verb_index):
+    i = _skip(lowers, verb_index + 1, _LEADING_FILLERS)
+
+    if slots.action == 'move':
+        cut = _find(lowers, i, _TARGET_PREPS)
+        if cut is not None:
+            slots.card_name = _span(words, i, cut)
+            slots.target_list = _span(words, _skip_list_words(lowers, cut + 1))
+        return
+
+    if slots.action == 'create':
+        # "criar card X na lista Y" / "criar X no trello"
+        for j in range(i, len(lowers) - 1):
+            if lowers[j] in ('na', 'em') and lowers[j + 1] in _LIST_WORDS:
+                slots.card_name = _span(words, i, j)
+                slots.target_list = _span(words, j + 2)
+                return
+            if lowers[j] == 'no' and lowers[j + 1] in ('trello', 'quadro'):
+                slots.card_name = _span(words, i, j)
+                return
+        slots.card_name = _span(words, i)
+        return
+
+    if slots.action == 'delete':
+        slots.card_name = _span(words, *_clean_name(words, i))
+        return
+
+    if slots.action == 'update':
+        cut = _find(lowers, i, _UPDATE_PREPS)
+        slots.card_name = _span(words, i, cut)
+        if cut is None:
+            return
+        # Renomear só com "para Y" ou "com (o) (novo) nome Y"; "com nova descrição" não é nome
+        rest = cut + 1
+        if lowers[cut] == 'com':
+            rest = _skip(lowers, rest, {'o', 'a'})
+            if _phrase_at(lowers, rest, ('novo', 'nome')):
+                rest += 2
+            elif lowers[rest:rest + 1] == ['nome']:
+                rest += 1
+            else:
+                return
+        slots.new_name = _span(words, rest)
+
+
+def _status_card(words, lowers):
+    """Nome do card em frases de status, sem verbo de comando"""
+    # "terminei o card X" / "estou fazendo o Card de teste" ("Card" maiúsculo é parte do nome)
+    for opener in _STATUS_OPENERS:
+        if _phrase_at(lowers, 0, opener):
+            i = _skip(lowers, len(opener), {'o', 'a', 'meu', 'minha'})
+            if i < len(words) - 1 and words[i] in _OBJECT_WORDS:
+                i += 1
+            return _span(words, i)
+
+    # "o card X está pronto" / "meu card X em andamento"
+    start = _find(lowers, 0, _OBJECT_WORDS)
+    if start is not None:
+        return _span(words, start + 1, _find(lowers, start + 1, _STATUS_COPULAS))
+
+    # "X está pronto"
+    end = _find(lowers, 1, {'está', 'esta', 'ta', 'tá', 'ficou', 'precisa'})
+    return _span(words, 0, end) if end else None
+
+
+def parse_slots(tokens, action=None):
+    """
+    Slots de uma mensagem já tokenizada; sem `action`, a ação vem do
+    primeiro verbo de comando ou, na falta dele, de uma frase de status
+    """
+    words, lowers = tokens
+    slots = Slots()
+    if action is None:
+        slots.limit = _limit(words, lowers)
+    if action in (None, 'status'):
+        slots.status = _status(lowers)
+
+    verb_index, verb_action = _find_verb(lowers)
+    if action is None:
+        action = verb_action or ('status' if slots.status else None)
+    slots.action = action
+
+    if action == 'status':
+        slots.card_name = _status_card(words, lowers)
+    elif action is not None:
+        # Sem verbo reconhecido (classificador decidiu por outra palavra): nome desde o início
+        _command_slots(slots, words, lowers, -1 if verb_index is None else verb_index)
+
+    return slots
+
+
+def extract_slots(text):
+    """Atalho: tokeniza e extrai os slots de um texto"""
+    return Message(text).slots
@@ -7,59 +7,49 @@ import json
 import os
 from io import BytesIO
 import base64
-from datetime import datetime, timedelta
-from collections import defaultdict
+
+import numpy as np
+
+from .aggregation import sum_by_category
+from .rollups import sync_commit_rollups, sync_card_rollup, latest_days, sum_by_author, max_window_days
+from .windows import today, series_from_dailies, moving_average
+from .flow import sync_flow
+from .github_api import fetch_commits_multi, format_repo_label, parse_repo_list, get_max_workers
+from .chart_cache import cached_render
+from .chart_templates import figure_template
+from .chart_backend import get_chart_backend, chart_content_type
+from .svg_charts import SVG_RENDERERS
 
 def get_github_commits_stats(github_token, github_repo, limit=100):
     """
     Analisa estatísticas de commits do GitHub
+    `github_repo` pode ser um repositório ou uma lista deles; os dados
+    de todos os repositórios são combinados em um único relatório
+    Lê os agregados diários: de cada repositório entram os dias mais
+    recentes até somar `limit` commits (dias inteiros)
     Retorna dados processados para visualização
     """
-    import urllib.request
-    
     try:
-        # Buscar commits
-        url = f'https://api.github.com/repos/{github_repo}/commits?per_page={limit}'
-        headers = {
-            'Accept': 'application/vnd.github.v3+json',
-            'User-Agent': 'PMO-Bot'
-        }
-        
-        if github_token:
-            headers['Authorization'] = f'token {github_token}'
-        
-        req = urllib.request.Request(url, headers=headers)
-        response = urllib.request.urlopen(req)
-        commits = json.loads(response.read())
-        
-        if not commits:
-            return None
+        # Sincronizar agregados (em paralelo quando há vários repositórios)
+        rollups = sync_commit_rollups(github_token, github_repo)
         
-        # Processar dados dos commits
-        commit_data = []
-        for commit in commits:
-            author = commit['commit']['author']['name']
-            date = commit['commit']['author']['date'][:10]
-            message = commit['commit']['message'].split('\n')[0]
-            
-            commit_data.append({
-                'author': author,
-                'date': date,
-                'message': message
-            })
-        
-        # Contar commits por autor
         author_counts = {}
-        for commit in commit_data:
-            author = commit['author']
-            author_counts[author] = author_counts.get(author, 0) + 1
+        repo_counts = {}
+        for repo, rollup in rollups.items():
+            daily = rollup.daily()
+            for author, count in sum_by_author(daily, latest_days(daily, limit)).items():
+                author_counts[author] = author_counts.get(author, 0) + count
+                repo_counts[repo] = repo_counts.get(repo, 0) + count
+        
+        if not author_counts:
+            return None
         
-        # Ordenar por número de commits
         sorted_authors = sorted(author_counts.items(), key=lambda x: x[1], reverse=True)
+        sorted_repos = sorted(repo_counts.items(), key=lambda x: x[1], reverse=True)
         
         # Calcular estatísticas
-        total_commits = len(commit_data)
-        total_authors = len(author_counts)
+        total_commits = sum(author_counts.values())
+        total_authors = len(sorted_authors)
         avg_commits_per_author = total_commits / total_authors if total_authors > 0 else 0
         
         # Preparar dados para retorno
@@ -68,7 +58,9 @@ def get_github_commits_stats(github_token, github_repo, limit=100):
             'total_authors': total_authors,
             'avg_commits_per_author': round(avg_commits_per_author, 2),
             'commits_by_author': sorted_authors,
-            'repository': github_repo
+            'commits_by_repo': sorted_repos,
+            'repository': format_repo_label(github_repo),
+            'repositories': parse_repo_list(github_repo)
         }
         
         return stats
@@ -92,6 +84,14 @@ def generate_commits_report(stats):
     lines.append(f"• Total de contribuidores: *{stats['total_authors']}*")
     lines.append(f"• Média de commits por pessoa: *{stats['avg_commits_per_author']}*\n")
     
+    # Distribuição por repositório (apenas quando há mais de um)
+    commits_by_repo = stats.get('commits_by_repo', [])
+    if len(commits_by_repo) > 1:
+        lines.append(f"📦 *Commits por Repositório:*")
+        for repo, count in commits_by_repo:
+            lines.append(f"• `{repo}`: {count}")
+        lines.append("")
+    
     lines.append(f"👥 *Ranking de Contribuidores:*")
     
     for i, (author, count) in enumerate(stats['commits_by_author'][:10], 1):
@@ -119,42 +119,24 @@ def generate_commits_report(stats):
 def get_trello_cards_stats(api_key, token, board_id):
     """
     Analisa estatísticas de cards do Trello
+    Lê a fotografia mais recente do agregado diário de cards por lista
     """
-    import urllib.request
-    
     try:
-        # Buscar cards
-        cards_url = f'https://api.trello.com/1/boards/{board_id}/cards?key={api_key}&token={token}'
-        req = urllib.request.Request(cards_url)
-        response = urllib.request.urlopen(req)
-        cards = json.loads(response.read())
-        
-        # Buscar listas
-        lists_url = f'https://api.trello.com/1/boards/{board_id}/lists?key={api_key}&token={token}'
-        req = urllib.request.Request(lists_url)
-        response = urllib.request.urlopen(req)
-        lists = json.loads(response.read())
-        
-        # Mapear lista ID para nome
-        list_names = {lst['id']: lst['name'] for lst in lists}
-        
-        # Contar cards por lista
-        cards_by_list = {}
-        for card in cards:
-            list_id = card['idList']
-            list_name = list_names.get(list_id, 'Desconhecida')
-            cards_by_list[list_name] = cards_by_list.get(list_name, 0) + 1
+        rollup = sync_card_rollup(api_key, token, board_id)
+        
+        # Cards por lista (fotografia mais recente)
+        cards_by_list = sorted(rollup.latest().items(), key=lambda x: x[1], reverse=True)
         
         # Estatísticas
-        total_cards = len(cards)
-        total_lists = len(lists)
+        total_cards = sum(count for _, count in cards_by_list)
+        total_lists = rollup.total_lists
         avg_cards_per_list = total_cards / total_lists if total_lists > 0 else 0
         
         stats = {
             'total_cards': total_cards,
             'total_lists': total_lists,
             'avg_cards_per_list': round(avg_cards_per_list, 2),
-            'cards_by_list': sorted(cards_by_list.items(), key=lambda x: x[1], reverse=True)
+            'cards_by_list': cards_by_list
         }
         
         return stats
@@ -194,44 +176,139 @@ def generate_trello_report(stats):
     return '\n'.join(lines)
 
 
-def get_activity_summary(github_token, github_repo, trello_key, trello_token, board_id):
+def get_trello_flow_stats(api_key, token, board_id, days=30):
+    """
+    Análise de fluxo do quadro nos últimos `days` dias
+    CFD (cards por lista ao fim de cada dia), tempo de ciclo dos cards
+    concluídos no período e tempo de permanência por lista
+    """
+    try:
+        tracker = sync_flow(api_key, token, board_id)
+        
+        dates, cfd = tracker.cumulative_flow(days)
+        cycle_times = tracker.cycle_times(days)
+        
+        cycle_time = None
+        if len(cycle_times):
+            p50, p85, p95 = np.percentile(cycle_times, [50, 85, 95]).round(1).tolist()
+            cycle_time = {
+                'p50': p50,
+                'p85': p85,
+                'p95': p95,
+                'mean': round(float(cycle_times.mean()), 1)
+            }
+        
+        stats = {
+            'days': days,
+            'dates': dates,
+            'cfd': cfd,
+            'completed': len(cycle_times),
+            'throughput_per_week': round(len(cycle_times) * 7 / days, 1),
+            'cycle_time': cycle_time,
+            'time_in_list': tracker.time_in_list((50, 85))
+        }
+        
+        return stats
+    
+    except Exception as e:
+        print(f"Erro ao analisar fluxo do Trello: {e}")
+        return None
+
+
+def _format_hours(hours):
+    """Duração legível: '45 min', '6.5 h', '3.2 dias'"""
+    if hours < 1:
+        return f'{hours * 60:.0f} min'
+    if hours < 48:
+        return f'{hours:.1f} h'
+    return f'{hours / 24:.1f} dias'
+
+
+def generate_trello_flow_report(stats):
+    """
+    Gera relatório textual do fluxo do quadro
+    """
+    if not stats:
+        return "❌ Não foi possível analisar o fluxo."
+    
+    lines = []
+    lines.append(f"🔄 *Fluxo do Quadro Trello (últimos {stats['days']} dias)*\n")
+    
+    lines.append(f"✅ *Entregas:*")
+    lines.append(f"• Cards concluídos: *{stats['completed']}* ({stats['throughput_per_week']} por semana)")
+    if stats['cycle_time']:
+        ct = stats['cycle_time']
+        lines.append(f"• Tempo de ciclo: mediana *{ct['p50']} dias*, p85 {ct['p85']} dias, p95 {ct['p95']} dias")
+        lines.append(f"• Tempo de ciclo médio: {ct['mean']} dias\n")
+    else:
+        lines.append(f"• Sem cards concluídos no período\n")
+    
+    if stats['cfd']:
+        lines.append(f"📋 *Cards por Lista (início → hoje):*")
+        for name, counts in stats['cfd']:
+            delta = counts[-1] - counts[0]
+            lines.append(f"• *{name}*: {counts[0]} → {counts[-1]} ({delta:+d})")
+        lines.append("")
+    
+    if stats['time_in_list']:
+        lines.append(f"⏱️ *Tempo em Cada Lista (mediana / p85):*")
+        for name, entry in stats['time_in_list'].items():
+            lines.append(f"• *{name}*: {_format_hours(entry[50])} / {_format_hours(entry[85])} "
+                         f"({entry['count']} passagens)")
+    
+    return '\n'.join(lines)
+
+
+def get_activity_summary(github_token, github_repo, trello_key, trello_token, board_id, days=7):
     """
     Gera resumo de atividades combinando GitHub e Trello
+    `github_repo` pode ser um repositório ou uma lista deles; `days` é o
+    tamanho da janela (7, 30, 90, uma sprint...), comparada com a anterior
     """
     try:
-        # Buscar últimos commits (últimos 7 dias)
-        import urllib.request
-        from datetime import datetime, timedelta
+        days = max(1, min(int(days), max_window_days()))
+        end = today()
         
-        # GitHub
-        github_commits = 0
+        # GitHub: série diária dos agregados cobrindo a janela e a anterior
+        github = None
         if github_token and github_repo:
-            url = f'https://api.github.com/repos/{github_repo}/commits?per_page=100'
-            headers = {
-                'Authorization': f'token {github_token}',
-                'Accept': 'application/vnd.github.v3+json'
-            }
-            req = urllib.request.Request(url, headers=headers)
-            response = urllib.request.urlopen(req)
-            commits = json.loads(response.read())
+            rollups = sync_commit_rollups(github_token, github_repo)
+            series = series_from_dailies([r.daily() for r in rollups.values()],
+                                         end - np.timedelta64(2 * days - 1, 'D'), end)
+            window = series.window(days)
+            percentiles = window.percentiles((50, 90))
             
-            # Contar commits dos últimos 7 dias
-            seven_days_ago = (datetime.now() - timedelta(days=7)).isoformat()
-            github_commits = sum(1 for c in commits if c['commit']['author']['date'] >= seven_days_ago)
+            github = dict(series.compare(days))
+            github.update({
+                'avg_per_day': round(window.mean(), 2),
+                'p50_per_day': percentiles[50],
+                'p90_per_day': percentiles[90],
+                'active_days': window.active_days(),
+                'busiest_day': window.busiest()
+            })
         
-        # Trello
-        trello_cards = 0
+        # Trello: fotografia mais recente × a última anterior à janela
+        trello = None
         if trello_key and trello_token and board_id:
-            cards_url = f'https://api.trello.com/1/boards/{board_id}/cards?key={trello_key}&token={trello_token}'
-            req = urllib.request.Request(cards_url)
-            response = urllib.request.urlopen(req)
-            cards = json.loads(response.read())
-            trello_cards = len(cards)
+            card_rollup = sync_card_rollup(trello_key, trello_token, board_id)
+            snapshots = card_rollup.daily()
+            current = sum(card_rollup.latest().values())
+            
+            window_start = str(end - np.timedelta64(days - 1, 'D'))
+            before = [day for day in snapshots if day < window_start]
+            previous = sum(snapshots[max(before)].values()) if before else None
+            
+            trello = {
+                'current': current,
+                'delta': current - previous if previous is not None else None
+            }
         
         summary = {
-            'github_commits_7days': github_commits,
-            'trello_total_cards': trello_cards,
-            'period': '7 dias'
+            'days': days,
+            'period': f'{days} dias',
+            'github': github,
+            'github_repository': format_repo_label(github_repo) if github_repo else None,
+            'trello': trello
         }
         
         return summary
@@ -241,6 +318,18 @@ def get_activity_summary(github_token, github_repo, trello_key, trello_token, bo
         return None
 
 
+def _format_delta(delta, delta_pct=None):
+    """'+12 (+35.0%)' / '-3' / '='"""
+    if delta is None:
+        return 'sem histórico'
+    if delta == 0:
+        return 'estável'
+    text = f'{delta:+d}'
+    if delta_pct is not None:
+        text += f' ({delta_pct:+.1f}%)'
+    return text
+
+
 def generate_activity_report(summary):
     """
     Gera relatório de resumo de atividades
@@ -248,65 +337,324 @@ def generate_activity_report(summary):
     if not summary:
         return "❌ Não foi possível gerar resumo."
     
+    days = summary['days']
+    github = summary.get('github') or {'current': 0}
+    
     lines = []
     lines.append(f"📊 *Resumo de Atividades (últimos {summary['period']})*\n")
     
-    lines.append(f"🐙 *GitHub:*")
-    lines.append(f"• Commits nos últimos 7 dias: *{summary['github_commits_7days']}*\n")
+    if summary.get('github_repository'):
+        lines.append(f"🐙 *GitHub ({summary['github_repository']}):*")
+    else:
+        lines.append(f"🐙 *GitHub:*")
+    lines.append(f"• Commits nos últimos {days} dias: *{github['current']}*")
+    if summary.get('github'):
+        lines.append(f"• Em relação aos {days} dias anteriores: {_format_delta(github['delta'], github['delta_pct'])}")
+        lines.append(f"• Média por dia: {github['avg_per_day']} (mediana {github['p50_per_day']:g}, p90 {github['p90_per_day']:g})")
+        lines.append(f"• Dias com commits: {github['active_days']} de {days}")
+        if github['busiest_day']:
+            day, count = github['busiest_day']
+            lines.append(f"• Dia mais ativo: {day} ({count} commits)")
+    lines.append("")
     
     lines.append(f"📋 *Trello:*")
-    lines.append(f"• Cards ativos no quadro: *{summary['trello_total_cards']}*\n")
+    if summary.get('trello'):
+        lines.append(f"• Cards ativos no quadro: *{summary['trello']['current']}*")
+        lines.append(f"• Variação no período: {_format_delta(summary['trello']['delta'])}\n")
+    else:
+        lines.append(f"• Cards ativos no quadro: *0*\n")
     
-    # Análise rápida
-    if summary['github_commits_7days'] > 20:
+    # Análise rápida (limiares semanais, proporcionais à janela)
+    per_week = github['current'] * 7 / days
+    if per_week > 20:
         lines.append(f"💪 *Análise:* Equipe muito ativa no desenvolvimento!")
-    elif summary['github_commits_7days'] > 10:
+    elif per_week > 10:
         lines.append(f"👍 *Análise:* Boa frequência de commits.")
-    elif summary['github_commits_7days'] > 0:
+    elif per_week > 0:
         lines.append(f"⚠️ *Análise:* Poucos commits recentes.")
     else:
-        lines.append(f"❌ *Análise:* Nenhum commit nos últimos 7 dias.")
+        lines.append(f"❌ *Análise:* Nenhum commit nos últimos {days} dias.")
     
     return '\n'.join(lines)
 
 
-def generate_commits_chart(stats):
+def get_line_changes_stats(github_token, github_repo, limit=100):
     """
-    Gera gráfico de barras de commits por autor
+    Analisa linhas adicionadas/removidas e arquivos alterados por autor
+    Usa o cache permanente por SHA: apenas commits nunca vistos vão à rede
+    """
+    from .commit_details import fetch_commit_details
+    
+    try:
+        commits, _ = fetch_commits_multi(github_token, github_repo, limit)
+        
+        if not commits:
+            return None
+        
+        details = fetch_commit_details(github_token, commits)
+        
+        if not details:
+            return None
+        
+        # Somar por autor (vetorizado)
+        rows = list(details.values())
+        fields = ('additions', 'deletions', 'files_changed')
+        labels, sums, counts = sum_by_category(
+            [d['author'] for d in rows],
+            {field: [d[field] for d in rows] for field in fields}
+        )
+        
+        # Ordenar pelo volume total de linhas alteradas
+        order = np.argsort(-(sums['additions'] + sums['deletions']), kind='stable')
+        sorted_authors = [
+            (labels[i], {'commits': int(counts[i]),
+                              **{field: int(sums[field][i]) for field in fields}})
+            for i in order
+        ]
+        
+        return {
+            'total_commits': len(details),
+            'total_additions': int(sums['additions'].sum()),
+            'total_deletions': int(sums['deletions'].sum()),
+            'total_files_changed': int(sums['files_changed'].sum()),
+            'changes_by_author': sorted_authors,
+            'repository': format_repo_label(github_repo)
+        }
+    
+    except Exception as e:
+        print(f"Erro ao buscar estatísticas de linhas: {e}")
+        return None
+
+
+def generate_line_changes_report(stats):
+    """
+    Gera relatório textual de linhas alteradas por autor
+    """
+    if not stats:
+        return "❌ Não foi possível gerar estatísticas."
+    
+    lines = []
+    lines.append(f"📊 *Linhas Alteradas - {stats['repository']}*\n")
+    lines.append(f"📈 *Resumo Geral ({stats['total_commits']} commits):*")
+    lines.append(f"• Linhas adicionadas: *+{stats['total_additions']}*")
+    lines.append(f"• Linhas removidas: *-{stats['total_deletions']}*")
+    lines.append(f"• Arquivos alterados: *{stats['total_files_changed']}*\n")
+    
+    lines.append(f"👥 *Por Contribuidor:*")
+    for i, (author, entry) in enumerate(stats['changes_by_author'][:10], 1):
+        lines.append(f"{i}. *{author}*")
+        lines.append(f"   • +{entry['additions']} / -{entry['deletions']} linhas em {entry['commits']} commits")
+        lines.append(f"   • Arquivos alterados: {entry['files_changed']}")
+    
+    if len(stats['changes_by_author']) > 10:
+        remaining = len(stats['changes_by_author']) - 10
+        lines.append(f"\n_... e mais {remaining} contribuidores_")
+    
+    return '\n'.join(lines)
+
+
+def get_issues_stats(github_token, github_repo):
+    """
+    Analisa issues e pull requests do GitHub (um ou vários repositórios)
+    Sincroniza o store local de cada repositório (apenas o delta) em paralelo
+    e calcula as métricas de forma vetorizada; repositórios com erro ficam
+    de fora do relatório, que só falha se todos falharem
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from .issue_store import get_issue_store, merge_columns, compute_issue_analytics
+    
+    try:
+        repos = parse_repo_list(github_repo)
+        if not repos:
+            return None
+        
+        def sync_repo(repo):
+            store = get_issue_store(repo)
+            changed = store.sync(github_token)
+            return changed, store.columns()
+        
+        results = {}
+        errors = {}
+        with ThreadPoolExecutor(max_workers=min(get_max_workers(), len(repos))) as executor:
+            futures = {repo: executor.submit(sync_repo, repo) for repo in repos}
+            
+            for repo, future in futures.items():
+                try:
+                    results[repo] = future.result()
+                except Exception as e:
+                    print(f"[ISSUES] Erro ao sincronizar {repo}: {e}")
+                    errors[repo] = e
+        
+        # Se todos os repositórios falharam, propagar o primeiro erro
+        if errors and len(errors) == len(repos):
+            raise next(iter(errors.values()))
+        
+        columns = merge_columns([cols for _, cols in results.values()])
+        stats = compute_issue_analytics(columns)
+        stats['repository'] = format_repo_label(list(results))
+        stats['synced_items'] = sum(changed for changed, _ in results.values())
+        
+        return stats
+    
+    except Exception as e:
+        print(f"Erro ao buscar estatísticas de issues: {e}")
+        return None
+
+
+def generate_issues_report(stats):
+    """
+    Gera relatório textual de issues e pull requests
+    """
+    if not stats:
+        return "❌ Não foi possível gerar estatísticas."
+    
+    lines = []
+    lines.append(f"📊 *Issues e Pull Requests - {stats['repository']}*\n")
+    lines.append(f"📈 *Resumo Geral:*")
+    lines.append(f"• Issues abertas: *{stats['open_issues']}*")
+    lines.append(f"• PRs abertos: *{stats['open_prs']}*")
+    if stats['close_p50_days'] is not None:
+        lines.append(f"• Tempo mediano até fechar uma issue: *{stats['close_p50_days']} dias*")
+    if stats['lead_p50_days'] is not None:
+        lines.append(f"• Lead time mediano de PR (abertura → merge): *{stats['lead_p50_days']} dias*")
+    lines.append("")
+    
+    lines.append(f"⏳ *Idade dos itens abertos:*")
+    for label, issues, prs in stats['age_buckets']:
+        lines.append(f"• {label}: {issues} issues, {prs} PRs")
+    lines.append("")
+    
+    if stats['time_to_close']:
+        lines.append(f"✅ *Tempo até fechar por autor (p50 / p90):*")
+        for author, count, p50, p90 in stats['time_to_close'][:10]:
+            lines.append(f"• *{author}*: {p50} / {p90} dias ({count} issues)")
+        lines.append("")
+    
+    if stats['pr_lead_time']:
+        lines.append(f"🔀 *Lead time de PR por autor (p50 / p90):*")
+        for author, count, p50, p90 in stats['pr_lead_time'][:10]:
+            lines.append(f"• *{author}*: {p50} / {p90} dias ({count} PRs)")
+    
+    return '\n'.join(lines).rstrip()
+
+
+def render_issues_age_chart(payload):
+    """
+    Renderiza o gráfico de barras com a idade dos itens abertos (issues x PRs)
     Retorna BytesIO com a imagem PNG
     """
+    labels = [label for label, _, _ in payload['age_buckets']]
+    issues = [count for _, count, _ in payload['age_buckets']]
+    prs = [count for _, _, count in payload['age_buckets']]
+    
+    with figure_template('issues_age') as template:
+        ax = template.reset()
+        
+        x = np.arange(len(labels))
+        width = 0.4
+        ax.bar(x - width / 2, issues, width, color='#3498db', alpha=0.8, label='Issues')
+        ax.bar(x + width / 2, prs, width, color='#9b59b6', alpha=0.8, label='Pull Requests')
+        
+        ax.set_title(f'Idade de Issues e PRs Abertos - {payload["repository"]}',
+                     fontsize=14, fontweight='bold', pad=20)
+        ax.set_xticks(x)
+        ax.set_xticklabels(labels)
+        ax.legend()
+        
+        return template.render()
+
+
+def generate_issues_age_chart(stats):
+    """
+    Gera gráfico de barras com a idade dos itens abertos (issues x PRs)
+    Retorna BytesIO com a imagem (reaproveitada do cache se os dados não mudaram)
+    """
     try:
-        import matplotlib
-        matplotlib.use('Agg')  # Backend sem interface gráfica
-        import matplotlib.pyplot as plt
-        import numpy as np
+        payload = {
+            'age_buckets': stats['age_buckets'],
+            'repository': stats['repository']
+        }
+        return cached_render('issues_age', payload, lambda: render_chart('issues_age', payload))
+    
+    except Exception as e:
+        print(f"Erro ao gerar gráfico de issues: {e}")
+        return None
+
+
+def render_line_changes_chart(payload):
+    """
+    Renderiza o gráfico de barras com linhas adicionadas/removidas por autor
+    Retorna BytesIO com a imagem PNG
+    """
+    authors = payload['authors']
+    
+    with figure_template('line_changes') as template:
+        ax = template.reset()
         
-        # Preparar dados (top 10 contribuidores)
-        authors = [author for author, _ in stats['commits_by_author'][:10]]
-        commits = [count for _, count in stats['commits_by_author'][:10]]
+        x = np.arange(len(authors))
+        width = 0.4
+        ax.bar(x - width / 2, payload['additions'], width, color='#2ecc71', alpha=0.8, label='Adicionadas')
+        ax.bar(x + width / 2, payload['deletions'], width, color='#e74c3c', alpha=0.8, label='Removidas')
         
-        # Criar figura
-        fig, ax = plt.subplots(figsize=(12, 6))
+        ax.set_title(f'Linhas Alteradas por Contribuidor - {payload["repository"]}',
+                     fontsize=14, fontweight='bold', pad=20)
+        ax.set_xticks(x)
+        ax.set_xticklabels(authors, rotation=45, ha='right')
+        ax.legend()
+        
+        return template.render()
+
+
+def generate_line_changes_chart(stats):
+    """
+    Gera gráfico de barras com linhas adicionadas/removidas por autor
+    Retorna BytesIO com a imagem (reaproveitada do cache se os dados não mudaram)
+    """
+    try:
+        # Top 10 contribuidores por volume de alterações
+        top = stats['changes_by_author'][:10]
+        payload = {
+            'authors': [author for author, _ in top],
+            'additions': [entry['additions'] for _, entry in top],
+            'deletions': [entry['deletions'] for _, entry in top],
+            'repository': stats['repository']
+        }
+        return cached_render('line_changes', payload, lambda: render_chart('line_changes', payload))
+    
+    except Exception as e:
+        print(f"Erro ao gerar gráfico de linhas: {e}")
+        return None
+
+
+def render_commits_chart(payload):
+    """
+    Renderiza o gráfico de barras de commits por autor
+    Retorna BytesIO com a imagem PNG
+    """
+    authors = payload['authors']
+    commits = payload['commits']
+    avg = payload['avg']
+    
+    # Figura reaproveitada (eixos limpos e já estilizados)
+    with figure_template('commits_ranking') as template:
+        ax = template.reset()
         
         # Cores: verde para acima da média, vermelho para abaixo
-        colors = ['#2ecc71' if c > stats['avg_commits_per_author'] else '#e74c3c' for c in commits]
+        colors = ['#2ecc71' if c > avg else '#e74c3c' for c in commits]
         
         # Gráfico de barras
         bars = ax.bar(range(len(authors)), commits, color=colors, alpha=0.8)
         
         # Linha da média
-        ax.axhline(y=stats['avg_commits_per_author'], color='#3498db', linestyle='--', 
-                   linewidth=2, label=f'Média: {stats["avg_commits_per_author"]:.1f}')
+        ax.axhline(y=avg, color='#3498db', linestyle='--', 
+                   linewidth=2, label=f'Média: {avg:.1f}')
         
         # Configurações
-        ax.set_xlabel('Contribuidores', fontsize=12, fontweight='bold')
-        ax.set_ylabel('Número de Commits', fontsize=12, fontweight='bold')
-        ax.set_title(f'Ranking de Commits - {stats["repository"]}', 
+        ax.set_title(f'Ranking de Commits - {payload["repository"]}', 
                      fontsize=14, fontweight='bold', pad=20)
         ax.set_xticks(range(len(authors)))
         ax.set_xticklabels(authors, rotation=45, ha='right')
         ax.legend()
-        ax.grid(axis='y', alpha=0.3)
         
         # Adicionar valores nas barras
         for i, (bar, value) in enumerate(zip(bars, commits)):
@@ -315,77 +663,85 @@ def generate_commits_chart(stats):
                    f'{int(value)}',
                    ha='center', va='bottom', fontweight='bold')
         
-        plt.tight_layout()
-        
-        # Salvar em BytesIO
-        buf = BytesIO()
-        plt.savefig(buf, format='png', dpi=150, bbox_inches='tight')
-        buf.seek(0)
-        plt.close()
-        
-        return buf
+        return template.render()
+
+
+def commits_chart_payload(stats):
+    """Dados de entrada do gráfico de ranking (top 10 contribuidores)"""
+    return {
+        'authors': [author for author, _ in stats['commits_by_author'][:10]],
+        'commits': [count for _, count in stats['commits_by_author'][:10]],
+        'avg': stats['avg_commits_per_author'],
+        'repository': stats['repository']
+    }
+
+
+def generate_commits_chart(stats):
+    """
+    Gera gráfico de barras de commits por autor
+    Retorna BytesIO com a imagem (reaproveitada do cache se os dados não mudaram)
+    """
+    try:
+        payload = commits_chart_payload(stats)
+        return cached_render('commits_ranking', payload, lambda: render_chart('commits_ranking', payload))
     
     except Exception as e:
         print(f"Erro ao gerar gráfico: {e}")
         return None
 
 
-def generate_commits_timeline(github_token, github_repo, days=30):
+def get_commits_timeline_data(github_token, github_repo, days=30):
     """
-    Gera gráfico de linha com evolução de commits ao longo do tempo
-    Retorna BytesIO com a imagem PNG e dados das estatísticas
+    Conta commits por dia nos últimos `days` dias (somando todos os repositórios)
+    Lê os agregados diários (custo proporcional a `days`)
+    Retorna (datas, contagens, estatísticas)
     """
-    try:
-        import matplotlib
-        matplotlib.use('Agg')
-        import matplotlib.pyplot as plt
-        import urllib.request
-        import numpy as np
-        
-        # Buscar commits
-        url = f'https://api.github.com/repos/{github_repo}/commits?per_page=100'
-        headers = {
-            'Accept': 'application/vnd.github.v3+json',
-            'User-Agent': 'PMO-Bot'
-        }
-        
-        if github_token:
-            headers['Authorization'] = f'token {github_token}'
-        
-        req = urllib.request.Request(url, headers=headers)
-        response = urllib.request.urlopen(req)
-        commits = json.loads(response.read())
-        
-        # Processar commits por data
-        commits_by_date = defaultdict(int)
-        cutoff_date = datetime.now() - timedelta(days=days)
-        
-        for commit in commits:
-            commit_date = datetime.strptime(
-                commit['commit']['author']['date'][:10], 
-                '%Y-%m-%d'
-            )
-            
-            if commit_date >= cutoff_date:
-                date_str = commit_date.strftime('%Y-%m-%d')
-                commits_by_date[date_str] += 1
-        
-        # Preencher datas sem commits
-        all_dates = []
-        current_date = cutoff_date
-        while current_date <= datetime.now():
-            date_str = current_date.strftime('%Y-%m-%d')
-            all_dates.append(date_str)
-            if date_str not in commits_by_date:
-                commits_by_date[date_str] = 0
-            current_date += timedelta(days=1)
-        
-        # Ordenar por data
-        sorted_dates = sorted(all_dates)
-        sorted_counts = [commits_by_date[date] for date in sorted_dates]
-        
-        # Criar gráfico
-        fig, ax = plt.subplots(figsize=(14, 6))
+    rollups = sync_commit_rollups(github_token, github_repo)
+    
+    # Commits por dia (somando todos os repositórios), dias vazios com zero
+    end = today()
+    series = series_from_dailies([rollup.daily() for rollup in rollups.values()],
+                                 end - np.timedelta64(days, 'D'), end)
+    sorted_dates = series.labels()
+    sorted_counts = series.values.tolist()
+    
+    stats_data = {
+        'total_commits': series.total(),
+        'avg_per_day': round(series.mean(), 2),
+        'max_in_day': series.max(),
+        'p90_per_day': series.percentiles((90,))[90],
+        'days_analyzed': days
+    }
+    
+    return sorted_dates, sorted_counts, stats_data
+
+
+def commits_timeline_payload(github_token, github_repo, days=30):
+    """Dados de entrada do gráfico de evolução + estatísticas do período"""
+    sorted_dates, sorted_counts, stats_data = get_commits_timeline_data(github_token, github_repo, days)
+    
+    payload = {
+        'dates': sorted_dates,
+        'counts': sorted_counts,
+        'days': days,
+        'repository': format_repo_label(github_repo)
+    }
+    
+    return payload, stats_data
+
+
+def render_commits_timeline(payload):
+    """
+    Renderiza o gráfico de linha com a evolução diária de commits
+    Retorna BytesIO com a imagem PNG
+    """
+    sorted_dates = payload['dates']
+    sorted_counts = payload['counts']
+    days = payload['days']
+    
+    # Figura reaproveitada (eixos limpos e já estilizados)
+    with figure_template('commits_timeline') as template:
+        ax = template.reset()
         
         # Linha de commits
         ax.plot(range(len(sorted_dates)), sorted_counts, 
@@ -398,15 +754,13 @@ def generate_commits_timeline(github_token, github_repo, days=30):
         
         # Linha de tendência (média móvel de 7 dias)
         if len(sorted_counts) >= 7:
-            moving_avg = np.convolve(sorted_counts, np.ones(7)/7, mode='valid')
+            moving_avg = moving_average(sorted_counts, 7)
             ax.plot(range(3, len(sorted_dates)-3), moving_avg, 
                    color='#e74c3c', linewidth=2, linestyle='--', 
                    label='Tendência (média 7 dias)')
         
         # Configurações
-        ax.set_xlabel('Data', fontsize=12, fontweight='bold')
-        ax.set_ylabel('Número de Commits', fontsize=12, fontweight='bold')
-        ax.set_title(f'Evolução de Commits - Últimos {days} dias - {github_repo}', 
+        ax.set_title(f'Evolução de Commits - Últimos {days} dias - {payload["repository"]}', 
                     fontsize=14, fontweight='bold', pad=20)
         
         # Configurar eixo X (mostrar apenas algumas datas)
@@ -416,27 +770,19 @@ def generate_commits_timeline(github_token, github_repo, days=30):
                           rotation=45, ha='right')
         
         ax.legend()
-        ax.grid(alpha=0.3)
-        
-        plt.tight_layout()
         
-        # Salvar em BytesIO
-        buf = BytesIO()
-        plt.savefig(buf, format='png', dpi=150, bbox_inches='tight')
-        buf.seek(0)
-        plt.close()
-        
-        # Calcular estatísticas
-        total = sum(sorted_counts)
-        avg = total / len(sorted_counts) if sorted_counts else 0
-        max_commits = max(sorted_counts) if sorted_counts else 0
-        
-        stats_data = {
-            'total_commits': total,
-            'avg_per_day': round(avg, 2),
-            'max_in_day': max_commits,
-            'days_analyzed': days
-        }
+        return template.render()
+
+
+def generate_commits_timeline(github_token, github_repo, days=30):
+    """
+    Gera gráfico de linha com evolução de commits ao longo do tempo
+    Aceita um repositório ou uma lista deles (contagens diárias somadas)
+    Retorna BytesIO com a imagem e dados das estatísticas
+    """
+    try:
+        payload, stats_data = commits_timeline_payload(github_token, github_repo, days)
+        buf = cached_render('commits_timeline', payload, lambda: render_chart('commits_timeline', payload))
         
         return buf, stats_data
     
@@ -445,26 +791,21 @@ def generate_commits_timeline(github_token, github_repo, days=30):
         return None, None
 
 
-def generate_trello_pie_chart(stats):
+def render_trello_pie_chart(payload):
     """
-    Gera gráfico de pizza com distribuição de cards por lista
+    Renderiza o gráfico de pizza com distribuição de cards por lista
     Retorna BytesIO com a imagem PNG
     """
-    try:
-        import matplotlib
-        matplotlib.use('Agg')
-        import matplotlib.pyplot as plt
-        
-        # Preparar dados
-        labels = [name for name, _ in stats['cards_by_list']]
-        sizes = [count for _, count in stats['cards_by_list']]
-        
-        # Cores
-        colors = ['#3498db', '#2ecc71', '#f39c12', '#e74c3c', 
-                  '#9b59b6', '#1abc9c', '#34495e', '#e67e22']
-        
-        # Criar figura
-        fig, ax = plt.subplots(figsize=(10, 8))
+    labels = payload['labels']
+    sizes = payload['sizes']
+    
+    # Cores
+    colors = ['#3498db', '#2ecc71', '#f39c12', '#e74c3c', 
+              '#9b59b6', '#1abc9c', '#34495e', '#e67e22']
+    
+    # Figura reaproveitada
+    with figure_template('trello_pie') as template:
+        ax = template.reset()
         
         # Gráfico de pizza
         wedges, texts, autotexts = ax.pie(sizes, labels=labels, autopct='%1.1f%%',
@@ -477,154 +818,262 @@ def generate_trello_pie_chart(stats):
             autotext.set_color('white')
             autotext.set_fontweight('bold')
         
-        ax.set_title(f'Distribuição de Cards por Lista\nTotal: {stats["total_cards"]} cards', 
+        ax.set_title(f'Distribuição de Cards por Lista\nTotal: {payload["total_cards"]} cards', 
                     fontsize=14, fontweight='bold', pad=20)
         
-        plt.tight_layout()
-        
-        # Salvar em BytesIO
-        buf = BytesIO()
-        plt.savefig(buf, format='png', dpi=150, bbox_inches='tight')
-        buf.seek(0)
-        plt.close()
-        
-        return buf
+        return template.render()
+
+
+def generate_trello_pie_chart(stats):
+    """
+    Gera gráfico de pizza com distribuição de cards por lista
+    Retorna BytesIO com a imagem (reaproveitada do cache se os dados não mudaram)
+    """
+    try:
+        payload = {
+            'labels': [name for name, _ in stats['cards_by_list']],
+            'sizes': [count for _, count in stats['cards_by_list']],
+            'total_cards': stats['total_cards']
+        }
+        return cached_render('trello_pie', payload, lambda: render_chart('trello_pie', payload))
     
     except Exception as e:
         print(f"Erro ao gerar gráfico de pizza: {e}")
         return None
 
 
-def upload_chart_to_slack(image_buffer, filename, channel, slack_token, initial_comment=""):
+def render_trello_cfd(payload):
     """
-    Faz upload de uma imagem (gráfico) para o Slack usando files.getUploadURLExternal (novo método)
+    Renderiza o diagrama de fluxo cumulativo (áreas empilhadas por lista)
+    Retorna BytesIO com a imagem PNG
     """
-    try:
-        import urllib.request
-        import urllib.parse
+    dates = payload['dates']
+    # Convenção do CFD: a lista final (concluído) embaixo
+    series = list(reversed(payload['series']))
+    
+    colors = ['#3498db', '#2ecc71', '#f39c12', '#e74c3c', 
+              '#9b59b6', '#1abc9c', '#34495e', '#e67e22']
+    
+    with figure_template('trello_cfd') as template:
+        ax = template.reset()
         
-        print(f"[UPLOAD] Iniciando upload de {filename} para canal {channel}")
+        if series:
+            ax.stackplot(range(len(dates)), *[counts for _, counts in series],
+                         labels=[name for name, _ in series],
+                         colors=[colors[i % len(colors)] for i in range(len(series))][::-1],
+                         alpha=0.85)
         
-        # Resetar buffer para leitura
-        image_buffer.seek(0)
-        image_data = image_buffer.read()
-        file_size = len(image_data)
+        ax.set_title(f'Fluxo Cumulativo de Cards - Últimos {payload["days"]} dias', 
+                    fontsize=14, fontweight='bold', pad=20)
         
-        print(f"[UPLOAD] Tamanho da imagem: {file_size} bytes")
+        step = max(1, len(dates) // 10)
+        ax.set_xticks(range(0, len(dates), step))
+        ax.set_xticklabels([dates[i][-5:] for i in range(0, len(dates), step)], 
+                          rotation=45, ha='right')
+        ax.set_xlim(0, max(1, len(dates) - 1))
         
-        # PASSO 1: Obter URL de upload
-        print(f"[UPLOAD] Passo 1: Solicitando URL de upload...")
+        # Legenda na ordem do quadro (de cima para baixo)
+        handles, labels = ax.get_legend_handles_labels()
+        ax.legend(handles[::-1], labels[::-1], loc='upper left')
         
-        get_url_data = {
-            'filename': filename,
-            'length': file_size
+        return template.render()
+
+
+def generate_trello_cfd_chart(stats):
+    """
+    Gera o diagrama de fluxo cumulativo do quadro
+    Retorna BytesIO com a imagem
+    """
+    try:
+        payload = {
+            'dates': stats['dates'],
+            'series': [[name, counts] for name, counts in stats['cfd']],
+            'days': stats['days']
         }
-        
-        url_request_body = urllib.parse.urlencode(get_url_data).encode()
-        
-        url = 'https://slack.com/api/files.getUploadURLExternal'
-        headers = {
+        return cached_render('trello_cfd', payload, lambda: render_chart('trello_cfd', payload))
+    
+    except Exception as e:
+        print(f"Erro ao gerar fluxo cumulativo: {e}")
+        return None
+
+
+# Renderizadores por tipo de gráfico (mesma chave usada no cache)
+CHART_RENDERERS = {
+    'commits_ranking': render_commits_chart,
+    'commits_timeline': render_commits_timeline,
+    'trello_pie': render_trello_pie_chart,
+    'trello_cfd': render_trello_cfd,
+    'issues_age': render_issues_age_chart,
+    'line_changes': render_line_changes_chart
+}
+
+
+def render_chart(kind, payload, backend=None):
+    """
+    Renderiza `payload` com o backend configurado (CHART_BACKEND)
+    matplotlib gera PNG; svg usa o writer próprio e não importa o matplotlib
+    """
+    if (backend or get_chart_backend()) == 'svg':
+        return SVG_RENDERERS[kind](payload)
+
+    return CHART_RENDERERS[kind](payload)
+
+
+def _slack_form_post(method, data, slack_token):
+    """POST form-urlencoded na Web API do Slack; retorna o JSON da resposta"""
+    import urllib.request
+    import urllib.parse
+    
+    req = urllib.request.Request(
+        f'https://slack.com/api/{method}',
+        data=urllib.parse.urlencode(data).encode(),
+        headers={
             'Authorization': f'Bearer {slack_token}',
             'Content-Type': 'application/x-www-form-urlencoded'
         }
-        
-        req = urllib.request.Request(url, data=url_request_body, headers=headers)
+    )
+    response = urllib.request.urlopen(req, timeout=30)
+    return json.loads(response.read())
+
+
+def _chart_bytes_view(image):
+    """memoryview dos bytes do gráfico sem cópia (aceita BytesIO ou bytes)"""
+    if isinstance(image, BytesIO):
+        return image.getbuffer()
+    return memoryview(image)
+
+
+def start_chart_upload(image, filename, slack_token):
+    """
+    Passos 1 e 2 do upload: obtém a URL (files.getUploadURLExternal) e envia
+    os bytes direto do buffer, sem copiá-los
+    Retorna {'id', 'title'} para files.completeUploadExternal, ou None
+    """
+    import urllib.request
+    import urllib.error
+    
+    view = _chart_bytes_view(image)
+    try:
+        file_size = view.nbytes
+        print(f"[UPLOAD] Solicitando URL de upload para {filename} ({file_size} bytes)")
         
         try:
-            response = urllib.request.urlopen(req, timeout=30)
-            result = json.loads(response.read())
+            result = _slack_form_post('files.getUploadURLExternal',
+                                      {'filename': filename, 'length': file_size}, slack_token)
         except urllib.error.HTTPError as e:
-            error_body = e.read().decode('utf-8')
-            print(f"[UPLOAD] ❌ Erro ao obter URL: {error_body}")
-            return False
+            print(f"[UPLOAD] ❌ Erro ao obter URL: {e.read().decode('utf-8')}")
+            return None
         
         if not result.get('ok'):
-            error = result.get('error', 'desconhecido')
-            print(f"[UPLOAD] ❌ Erro ao obter URL de upload: {error}")
-            return False
+            print(f"[UPLOAD] ❌ Erro ao obter URL de upload: {result.get('error', 'desconhecido')}")
+            return None
         
-        upload_url = result.get('upload_url')
         file_id = result.get('file_id')
-        
-        print(f"[UPLOAD] ✅ URL de upload obtida")
-        print(f"[UPLOAD] File ID: {file_id}")
-        
-        # PASSO 2: Upload do arquivo para a URL obtida
-        print(f"[UPLOAD] Passo 2: Fazendo upload do arquivo...")
-        
         req = urllib.request.Request(
-            upload_url,
-            data=image_data,
-            headers={'Content-Type': 'image/png'},
+            result.get('upload_url'),
+            data=view,
+            headers={'Content-Type': chart_content_type(filename)},
             method='POST'
         )
         
         try:
             urllib.request.urlopen(req, timeout=30)
-            print(f"[UPLOAD] ✅ Arquivo enviado com sucesso")
         except Exception as e:
-            print(f"[UPLOAD] ❌ Erro ao fazer upload: {e}")
-            return False
-        
-        # PASSO 3: Completar o upload e compartilhar no canal
-        print(f"[UPLOAD] Passo 3: Compartilhando no canal...")
-        
-        complete_data = {
-            'files': json.dumps([{'id': file_id, 'title': filename}]),
-            'channel_id': channel
-        }
-        
-        if initial_comment:
-            complete_data['initial_comment'] = initial_comment
-        
-        complete_body = urllib.parse.urlencode(complete_data).encode()
-        
-        url = 'https://slack.com/api/files.completeUploadExternal'
-        headers = {
-            'Authorization': f'Bearer {slack_token}',
-            'Content-Type': 'application/x-www-form-urlencoded'
-        }
-        
-        req = urllib.request.Request(url, data=complete_body, headers=headers)
-        
-        try:
-            response = urllib.request.urlopen(req, timeout=30)
-            result = json.loads(response.read())
-        except urllib.error.HTTPError as e:
-            error_body = e.read().decode('utf-8')
-            print(f"[UPLOAD] ❌ Erro ao completar: {error_body}")
-            return False
-        
-        print(f"[UPLOAD] Resposta final: {json.dumps(result, indent=2)}")
+            print(f"[UPLOAD] ❌ Erro ao fazer upload de {filename}: {e}")
+            return None
         
-        if result.get('ok'):
-            print(f"[UPLOAD] ✅ Upload completo e compartilhado!")
-            return True
-        else:
-            error = result.get('error', 'desconhecido')
-            print(f"[UPLOAD] ❌ Erro ao compartilhar: {error}")
-            
-            # Erros comuns com soluções
-            if error == 'missing_scope':
-                print(f"[UPLOAD] 🔑 SOLUÇÃO: Adicione 'files:write' e REINSTALE o app")
-            elif error == 'invalid_auth':
-                print(f"[UPLOAD] 🔐 SOLUÇÃO: Token inválido, atualize SLACK_BOT_TOKEN")
-            elif error == 'channel_not_found':
-                print(f"[UPLOAD] 📢 SOLUÇÃO: Canal não encontrado: {channel}")
-            elif error == 'not_in_channel':
-                print(f"[UPLOAD] 🚪 SOLUÇÃO: Bot não está no canal, use /invite")
-            else:
-                print(f"[UPLOAD] ℹ️ Erro: {error}")
-                if 'needed' in result:
-                    print(f"[UPLOAD] Permissões necessárias: {result['needed']}")
-                if 'provided' in result:
-                    print(f"[UPLOAD] Permissões fornecidas: {result['provided']}")
-            
-            return False
+        print(f"[UPLOAD] ✅ {filename} enviado (File ID: {file_id})")
+        return {'id': file_id, 'title': filename}
     
     except Exception as e:
-        print(f"[UPLOAD] ❌ Exceção: {e}")
-        import traceback
-        traceback.print_exc()
+        print(f"[UPLOAD] ❌ Exceção no upload de {filename}: {e}")
+        return None
+    
+    finally:
+        view.release()
+
+
+def complete_chart_uploads(files, channel, slack_token, initial_comment=""):
+    """
+    Passo 3: compartilha no canal, numa única chamada a
+    files.completeUploadExternal, todos os arquivos já enviados
+    """
+    import urllib.error
+    
+    if not files:
+        return False
+    
+    print(f"[UPLOAD] Compartilhando {len(files)} arquivo(s) no canal {channel}...")
+    
+    complete_data = {
+        'files': json.dumps(files),
+        'channel_id': channel
+    }
+    
+    if initial_comment:
+        complete_data['initial_comment'] = initial_comment
+    
+    try:
+        result = _slack_form_post('files.completeUploadExternal', complete_data, slack_token)
+    except urllib.error.HTTPError as e:
+        print(f"[UPLOAD] ❌ Erro ao completar: {e.read().decode('utf-8')}")
         return False
+    except Exception as e:
+        print(f"[UPLOAD] ❌ Exceção ao completar: {e}")
+        return False
+    
+    if result.get('ok'):
+        print(f"[UPLOAD] ✅ Upload completo e compartilhado!")
+        return True
+    
+    error = result.get('error', 'desconhecido')
+    print(f"[UPLOAD] ❌ Erro ao compartilhar: {error}")
+    
+    # Erros comuns com soluções
+    if error == 'missing_scope':
+        print(f"[UPLOAD] 🔑 SOLUÇÃO: Adicione 'files:write' e REINSTALE o app")
+    elif error == 'invalid_auth':
+        print(f"[UPLOAD] 🔐 SOLUÇÃO: Token inválido, atualize SLACK_BOT_TOKEN")
+    elif error == 'channel_not_found':
+        print(f"[UPLOAD] 📢 SOLUÇÃO: Canal não encontrado: {channel}")
+    elif error == 'not_in_channel':
+        print(f"[UPLOAD] 🚪 SOLUÇÃO: Bot não está no canal, use /invite")
+    else:
+        print(f"[UPLOAD] ℹ️ Erro: {error}")
+        if 'needed' in result:
+            print(f"[UPLOAD] Permissões necessárias: {result['needed']}")
+        if 'provided' in result:
+            print(f"[UPLOAD] Permissões fornecidas: {result['provided']}")
+    
+    return False
+
 
+def upload_charts_to_slack(charts, channel, slack_token, initial_comment=""):
+    """
+    Upload em lote: `charts` é uma lista de (buffer, filename)
+    URLs e bytes de todos os gráficos seguem em paralelo; no fim, uma única
+    chamada de conclusão publica todos com um só comentário
+    Retorna quantos arquivos foram compartilhados
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    
+    if not charts:
+        return 0
+    
+    with ThreadPoolExecutor(max_workers=len(charts)) as executor:
+        started = list(executor.map(
+            lambda chart: start_chart_upload(chart[0], chart[1], slack_token), charts
+        ))
+    
+    files = [f for f in started if f]
+    if files and complete_chart_uploads(files, channel, slack_token, initial_comment):
+        return len(files)
+    return 0
+
+
+def upload_chart_to_slack(image_buffer, filename, channel, slack_token, initial_comment=""):
+    """
+    Faz upload de uma imagem (gráfico) para o Slack usando files.getUploadURLExternal (novo método)
+    """
+    print(f"[UPLOAD] Iniciando upload de {filename} para canal {channel}")
+    return upload_charts_to_slack([(image_buffer, filename)], channel, slack_token, initial_comment) == 1
@@ -0,0 +1,43 @@
+"""
+Armazenamento local do bot
+Diretório de cache em disco e leitura/escrita atômica de JSON
+"""
+
+import json
+import os
+import tempfile
+
+
+def get_cache_dir(*parts):
+    """
+    Retorna (criando se preciso) um subdiretório do cache local
+    Base: PMO_CACHE_DIR, ou /tmp/pmo_cache (único local gravável na Vercel)
+    """
+    base = os.environ.get('PMO_CACHE_DIR') or os.path.join(tempfile.gettempdir(), 'pmo_cache')
+    path = os.path.join(base, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def load_json(path, default=None):
+    """Lê um JSON do disco, devolvendo `default` se não existir ou estiver corrompido"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def save_json(path, data):
+    """Grava um JSON de forma atômica (arquivo temporário + rename)"""
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
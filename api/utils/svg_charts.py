@@ -0,0 +1,391 @@
+"""
+Backend de gráficos sem matplotlib
+Gera SVG diretamente (barras, linhas e pizza) a partir dos mesmos payloads
+usados pelos renderizadores matplotlib; importa só a biblioteca padrão
+"""
+
+import math
+from io import BytesIO
+from xml.sax.saxutils import escape, quoteattr
+
+FONT_FAMILY = 'DejaVu Sans, Arial, Helvetica, sans-serif'
+
+PIE_COLORS = ['#3498db', '#2ecc71', '#f39c12', '#e74c3c',
+              '#9b59b6', '#1abc9c', '#34495e', '#e67e22']
+
+
+class SvgCanvas:
+    """Writer mínimo de SVG: acumula elementos e serializa em bytes"""
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.elements = []
+
+    def rect(self, x, y, w, h, fill, opacity=1.0):
+        self.elements.append(
+            f'<rect x="{x:.1f}" y="{y:.1f}" width="{w:.1f}" height="{h:.1f}" '
+            f'fill="{fill}" fill-opacity="{opacity}"/>'
+        )
+
+    def line(self, x1, y1, x2, y2, stroke, width=1.0, dash=None, opacity=1.0):
+        dash_attr = f' stroke-dasharray="{dash}"' if dash else ''
+        self.elements.append(
+            f'<line x1="{x1:.1f}" y1="{y1:.1f}" x2="{x2:.1f}" y2="{y2:.1f}" '
+            f'stroke="{stroke}" stroke-width="{width}" stroke-opacity="{opacity}"{dash_attr}/>'
+        )
+
+    def polyline(self, points, stroke, width=2.0, dash=None):
+        dash_attr = f' stroke-dasharray="{dash}"' if dash else ''
+        coords = ' '.join(f'{x:.1f},{y:.1f}' for x, y in points)
+        self.elements.append(
+            f'<polyline points="{coords}" fill="none" stroke="{stroke}" '
+            f'stroke-width="{width}"{dash_attr}/>'
+        )
+
+    def polygon(self, points, fill, opacity=1.0):
+        coords = ' '.join(f'{x:.1f},{y:.1f}' for x, y in points)
+        self.elements.append(f'<polygon points="{coords}" fill="{fill}" fill-opacity="{opacity}"/>')
+
+    def circle(self, cx, cy, r, fill):
+        self.elements.append(f'<circle cx="{cx:.1f}" cy="{cy:.1f}" r="{r}" fill="{fill}"/>')
+
+    def path(self, d, fill, stroke='white', width=1.0):
+        self.elements.append(f'<path d="{d}" fill="{fill}" stroke="{stroke}" stroke-width="{width}"/>')
+
+    def text(self, x, y, content, size=11, anchor='middle', bold=False, color='#222',
+             rotate=None, baseline=None):
+        attrs = [f'x="{x:.1f}"', f'y="{y:.1f}"', f'font-size="{size}"', f'text-anchor="{anchor}"',
+                 f'fill="{color}"']
+        if bold:
+            attrs.append('font-weight="bold"')
+        if rotate:
+            attrs.append(f'transform="rotate({rotate} {x:.1f} {y:.1f})"')
+        if baseline:
+            attrs.append(f'dominant-baseline="{baseline}"')
+        self.elements.append(f'<text {" ".join(attrs)}>{escape(str(content))}</text>')
+
+    def to_buffer(self):
+        header = (
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{self.width}" height="{self.height}" '
+            f'viewBox="0 0 {self.width} {self.height}" font-family={quoteattr(FONT_FAMILY)}>'
+            f'<rect width="100%" height="100%" fill="white"/>'
+        )
+        buf = BytesIO()
+        buf.write(header.encode('utf-8'))
+        buf.write(''.join(self.elements).encode('utf-8'))
+        buf.write(b'</svg>')
+        buf.seek(0)
+        return buf
+
+
+def _nice_ticks(max_value, target=5):
+    """Marcas "redondas" (1, 2, 5 x 10^k) de 0 até cobrir max_value"""
+    max_value = max(float(max_value), 1.0)
+    raw_step = max_value / target
+    magnitude = 10 ** math.floor(math.log10(raw_step))
+
+    for multiplier in (1, 2, 5, 10):
+        step = multiplier * magnitude
+        if step >= raw_step:
+            break
+
+    count = int(math.ceil(max_value / step))
+    return [round(i * step, 10) for i in range(count + 1)]
+
+
+def _format_tick(value):
+    return f'{int(value)}' if float(value).is_integer() else f'{value:g}'
+
+
+class _Axes:
+    """Área de plotagem com eixo Y linear a partir de zero"""
+
+    def __init__(self, canvas, left, top, right, bottom, y_max):
+        self.canvas = canvas
+        self.left = left
+        self.top = top
+        self.right = canvas.width - right
+        self.bottom = canvas.height - bottom
+        self.ticks = _nice_ticks(y_max)
+        self.y_top = self.ticks[-1]
+
+    @property
+    def width(self):
+        return self.right - self.left
+
+    def y(self, value):
+        return self.bottom - (value / self.y_top) * (self.bottom - self.top)
+
+    def draw_frame(self, grid_x=None):
+        c = self.canvas
+        for tick in self.ticks:
+            y = self.y(tick)
+            c.line(self.left, y, self.right, y, '#b0b0b0', 0.8, opacity=0.6)
+            c.text(self.left - 8, y, _format_tick(tick), size=10, anchor='end', baseline='middle')
+
+        for x in grid_x or []:
+            c.line(x, self.top, x, self.bottom, '#b0b0b0', 0.8, opacity=0.6)
+
+        c.line(self.left, self.bottom, self.right, self.bottom, '#333', 1.0)
+        c.line(self.left, self.top, self.left, self.bottom, '#333', 1.0)
+
+    def labels(self, title, xlabel, ylabel):
+        c = self.canvas
+        c.text(c.width / 2, 32, title, size=16, bold=True)
+        c.text((self.left + self.right) / 2, c.height - 12, xlabel, size=13, bold=True)
+        mid_y = (self.top + self.bottom) / 2
+        c.text(22, mid_y, ylabel, size=13, bold=True, rotate=-90)
+
+    def legend(self, entries):
+        """entries: lista de (texto, cor, estilo) com estilo 'box' ou 'dash'"""
+        if not entries:
+            return
+
+        c = self.canvas
+        x = self.right - 210
+        y = self.top + 10
+        c.rect(x - 8, y - 6, 210, 22 * len(entries) + 6, 'white', 0.85)
+
+        for i, (label, color, style) in enumerate(entries):
+            row_y = y + 22 * i + 8
+            if style == 'dash':
+                c.line(x, row_y, x + 24, row_y, color, 2.0, dash='6,4')
+            else:
+                c.rect(x, row_y - 6, 24, 12, color, 0.8)
+            c.text(x + 32, row_y, label, size=11, anchor='start', baseline='middle')
+
+
+def _bar_chart(title, xlabel, ylabel, categories, series, size=(1200, 600),
+               bar_colors=None, hline=None, value_labels=False, rotate_labels=True):
+    """
+    Gráfico de barras (simples ou agrupadas)
+    series: lista de (rótulo da legenda ou None, cor, valores)
+    hline: (valor, rótulo, cor) para linha horizontal tracejada (ex.: média)
+    """
+    canvas = SvgCanvas(*size)
+    values = [v for _, _, vals in series for v in vals]
+    y_max = max(values + ([hline[0]] if hline else []) + [0])
+    axes = _Axes(canvas, 80, 60, 30, 130 if rotate_labels else 70, y_max * 1.08)
+    axes.draw_frame()
+
+    n = max(1, len(categories))
+    slot = axes.width / n
+    group_width = slot * 0.8
+    bar_width = group_width / max(1, len(series))
+
+    for s_index, (_, color, vals) in enumerate(series):
+        for i, value in enumerate(vals):
+            x = axes.left + slot * i + (slot - group_width) / 2 + bar_width * s_index
+            y = axes.y(value)
+            fill = bar_colors[i] if bar_colors else color
+            canvas.rect(x, y, bar_width, axes.bottom - y, fill, 0.8)
+            if value_labels:
+                canvas.text(x + bar_width / 2, y - 4, _format_tick(value), size=11, bold=True)
+
+    for i, category in enumerate(categories):
+        x = axes.left + slot * (i + 0.5)
+        if rotate_labels:
+            canvas.text(x, axes.bottom + 14, category, size=11, anchor='end', rotate=-45)
+        else:
+            canvas.text(x, axes.bottom + 18, category, size=11)
+
+    entries = [(label, color, 'box') for label, color, _ in series if label]
+    if hline:
+        value, label, color = hline
+        y = axes.y(value)
+        canvas.line(axes.left, y, axes.right, y, color, 2.0, dash='8,5')
+        entries.append((label, color, 'dash'))
+
+    axes.labels(title, xlabel, ylabel)
+    axes.legend(entries)
+
+    return canvas.to_buffer()
+
+
+def render_commits_chart_svg(payload):
+    """Ranking de commits por autor (mesmo payload de render_commits_chart)"""
+    avg = payload['avg']
+    colors = ['#2ecc71' if c > avg else '#e74c3c' for c in payload['commits']]
+
+    return _bar_chart(
+        f'Ranking de Commits - {payload["repository"]}',
+        'Contribuidores', 'Número de Commits',
+        payload['authors'],
+        [(None, '#2ecc71', payload['commits'])],
+        bar_colors=colors,
+        hline=(avg, f'Média: {avg:.1f}', '#3498db'),
+        value_labels=True
+    )
+
+
+def render_issues_age_chart_svg(payload):
+    """Idade dos itens abertos (mesmo payload de render_issues_age_chart)"""
+    buckets = payload['age_buckets']
+
+    return _bar_chart(
+        f'Idade de Issues e PRs Abertos - {payload["repository"]}',
+        'Idade', 'Itens abertos',
+        [label for label, _, _ in buckets],
+        [('Issues', '#3498db', [count for _, count, _ in buckets]),
+         ('Pull Requests', '#9b59b6', [count for _, _, count in buckets])],
+        rotate_labels=False
+    )
+
+
+def render_line_changes_chart_svg(payload):
+    """Linhas alteradas por autor (mesmo payload de render_line_changes_chart)"""
+    return _bar_chart(
+        f'Linhas Alteradas por Contribuidor - {payload["repository"]}',
+        'Contribuidores', 'Linhas',
+        payload['authors'],
+        [('Adicionadas', '#2ecc71', payload['additions']),
+         ('Removidas', '#e74c3c', payload['deletions'])]
+    )
+
+
+def render_commits_timeline_svg(payload):
+    """Evolução diária de commits (mesmo payload de render_commits_timeline)"""
+    dates = payload['dates']
+    counts = payload['counts']
+
+    canvas = SvgCanvas(1400, 600)
+    axes = _Axes(canvas, 80, 60, 30, 110, max(counts + [0]) * 1.08)
+
+    n = len(dates)
+    step_x = axes.width / max(1, n - 1)
+
+    def x_of(i):
+        return axes.left + step_x * i
+
+    tick_step = max(1, n // 10)
+    tick_indexes = list(range(0, n, tick_step))
+    axes.draw_frame(grid_x=[x_of(i) for i in tick_indexes])
+
+    points = [(x_of(i), axes.y(v)) for i, v in enumerate(counts)]
+    if points:
+        area = [(points[0][0], axes.bottom)] + points + [(points[-1][0], axes.bottom)]
+        canvas.polygon(area, '#3498db', 0.3)
+        canvas.polyline(points, '#3498db', 2.0)
+        for x, y in points:
+            canvas.circle(x, y, 3, '#3498db')
+
+    entries = [('Commits por dia', '#3498db', 'box')]
+
+    # Média móvel de 7 dias (janela centrada, como no matplotlib)
+    if n >= 7:
+        window_sum = sum(counts[:7])
+        moving = [window_sum / 7]
+        for i in range(7, n):
+            window_sum += counts[i] - counts[i - 7]
+            moving.append(window_sum / 7)
+        canvas.polyline([(x_of(i + 3), axes.y(v)) for i, v in enumerate(moving)],
+                        '#e74c3c', 2.0, dash='8,5')
+        entries.append(('Tendência (média 7 dias)', '#e74c3c', 'dash'))
+
+    for i in tick_indexes:
+        canvas.text(x_of(i), axes.bottom + 14, dates[i][-5:], size=11, anchor='end', rotate=-45)
+
+    axes.labels(
+        f'Evolução de Commits - Últimos {payload["days"]} dias - {payload["repository"]}',
+        'Data', 'Número de Commits'
+    )
+    axes.legend(entries)
+
+    return canvas.to_buffer()
+
+
+def render_trello_pie_chart_svg(payload):
+    """Distribuição de cards por lista (mesmo payload de render_trello_pie_chart)"""
+    labels = payload['labels']
+    sizes = payload['sizes']
+
+    canvas = SvgCanvas(1000, 800)
+    cx, cy, radius = 500, 430, 280
+    total = float(sum(sizes)) or 1.0
+
+    canvas.text(cx, 40, 'Distribuição de Cards por Lista', size=16, bold=True)
+    canvas.text(cx, 64, f'Total: {payload["total_cards"]} cards', size=16, bold=True)
+
+    # Começa no topo (90°) e segue no sentido anti-horário, como o matplotlib
+    angle = 90.0
+    for i, (label, size) in enumerate(zip(labels, sizes)):
+        span = 360.0 * size / total
+        color = PIE_COLORS[i % len(PIE_COLORS)]
+        start = math.radians(angle)
+        end = math.radians(angle + span)
+
+        if span >= 359.99:
+            canvas.circle(cx, cy, radius, color)
+        elif span > 0:
+            x1, y1 = cx + radius * math.cos(start), cy - radius * math.sin(start)
+            x2, y2 = cx + radius * math.cos(end), cy - radius * math.sin(end)
+            large_arc = 1 if span > 180 else 0
+            canvas.path(
+                f'M{cx},{cy} L{x1:.1f},{y1:.1f} A{radius},{radius} 0 {large_arc} 0 {x2:.1f},{y2:.1f} Z',
+                color
+            )
+
+        middle = math.radians(angle + span / 2)
+        cos_m, sin_m = math.cos(middle), math.sin(middle)
+        canvas.text(cx + radius * 0.6 * cos_m, cy - radius * 0.6 * sin_m,
+                    f'{100.0 * size / total:.1f}%', size=11, bold=True, color='white',
+                    baseline='middle')
+        canvas.text(cx + radius * 1.1 * cos_m, cy - radius * 1.1 * sin_m, label,
+                    size=11, bold=True, anchor='start' if cos_m >= 0 else 'end',
+                    baseline='middle')
+
+        angle += span
+
+    return canvas.to_buffer()
+
+
+def render_trello_cfd_svg(payload):
+    """Fluxo cumulativo de cards (mesmo payload de render_trello_cfd)"""
+    dates = payload['dates']
+    series = list(reversed(payload['series']))
+    n = len(dates)
+
+    totals = [sum(counts[i] for _, counts in series) for i in range(n)]
+    canvas = SvgCanvas(1400, 600)
+    axes = _Axes(canvas, 80, 60, 30, 110, max(totals + [0]) * 1.08)
+
+    step_x = axes.width / max(1, n - 1)
+
+    def x_of(i):
+        return axes.left + step_x * i
+
+    tick_step = max(1, n // 10)
+    tick_indexes = list(range(0, n, tick_step))
+    axes.draw_frame()
+
+    # Camadas empilhadas a partir da lista final (concluído)
+    base = [0] * n
+    entries = []
+    for k, (name, counts) in enumerate(series):
+        top = [b + c for b, c in zip(base, counts)]
+        color = PIE_COLORS[(len(series) - 1 - k) % len(PIE_COLORS)]
+        if n:
+            upper = [(x_of(i), axes.y(v)) for i, v in enumerate(top)]
+            lower = [(x_of(i), axes.y(v)) for i, v in reversed(list(enumerate(base)))]
+            canvas.polygon(upper + lower, color, 0.85)
+        entries.append((name, color, 'box'))
+        base = top
+
+    for i in tick_indexes:
+        canvas.text(x_of(i), axes.bottom + 14, dates[i][-5:], size=11, anchor='end', rotate=-45)
+
+    axes.labels(f'Fluxo Cumulativo de Cards - Últimos {payload["days"]} dias', 'Data', 'Cards')
+    axes.legend(entries[::-1])
+
+    return canvas.to_buffer()
+
+
+SVG_RENDERERS = {
+    'commits_ranking': render_commits_chart_svg,
+    'commits_timeline': render_commits_timeline_svg,
+    'trello_pie': render_trello_pie_chart_svg,
+    'trello_cfd': render_trello_cfd_svg,
+    'issues_age': render_issues_age_chart_svg,
+    'line_changes': render_line_changes_chart_svg
+}
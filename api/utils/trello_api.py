@@ -0,0 +1,31 @@
+"""
+Cliente mínimo da API REST do Trello
+Centraliza a montagem das URLs (key/token) usada pelas estatísticas
+"""
+
+import json
+import urllib.parse
+import urllib.request
+
+from .singleflight import single_flight
+
+TRELLO_API_URL = 'https://api.trello.com/1'
+
+
+def trello_get(path, api_key, token, params=None, timeout=30):
+    """Faz um GET na API do Trello e retorna o JSON decodificado"""
+    query = {'key': api_key, 'token': token}
+    if params:
+        query.update(params)
+
+    url = f'{TRELLO_API_URL}{path}?{urllib.parse.urlencode(query)}'
+    # Leituras idênticas simultâneas (ex.: o mesmo quadro pedido por várias pessoas) viram um GET
+    return _flight.do(url, _fetch, url, timeout)
+
+
+_flight = single_flight('trello_get')
+
+
+def _fetch(url, timeout):
+    response = urllib.request.urlopen(urllib.request.Request(url), timeout=timeout)
+    return json.loads(response.read())
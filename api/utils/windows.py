@@ -0,0 +1,230 @@
+"""
+Estatísticas de janelas móveis sobre séries diárias
+Eventos viram uma série densa de contagens por dia (datetime64[D], dias
+vazios com zero) no fuso configurado; janelas de 7/30/90 dias ou sprints,
+médias móveis, percentis e variação contra o período anterior saem de
+fatias e somas acumuladas, sem laços por dia em Python
+"""
+
+import os
+import re
+from datetime import datetime, timezone
+
+import numpy as np
+
+# Duração padrão de uma sprint (dias)
+DEFAULT_SPRINT_DAYS = 14
+
+_ONE_DAY = np.timedelta64(1, 'D')
+
+
+def get_timezone():
+    """Fuso dos relatórios (PMO_TIMEZONE, ex.: 'America/Sao_Paulo'); UTC por padrão"""
+    name = os.environ.get('PMO_TIMEZONE', '').strip()
+    if not name:
+        return timezone.utc
+
+    try:
+        from zoneinfo import ZoneInfo
+        return ZoneInfo(name)
+    except Exception as e:
+        print(f"[WINDOWS] Fuso '{name}' inválido ({e}); usando UTC")
+        return timezone.utc
+
+
+def timezone_name(tz=None):
+    tz = tz or get_timezone()
+    return getattr(tz, 'key', None) or 'UTC'
+
+
+def today(tz=None):
+    """Data de hoje no fuso dos relatórios, como datetime64[D]"""
+    return np.datetime64(datetime.now(tz or get_timezone()).date(), 'D')
+
+
+def local_dates(timestamps, tz=None):
+    """
+    Converte instantes UTC (datetime64[s]) em datas locais (datetime64[D])
+    O deslocamento do fuso é consultado uma vez por hora UTC distinta (o
+    horário de verão só muda em horas cheias) e aplicado ao array inteiro
+    """
+    tz = tz or get_timezone()
+    timestamps = np.asarray(timestamps, dtype='datetime64[s]')
+    if timestamps.size == 0 or tz is timezone.utc:
+        return timestamps.astype('datetime64[D]')
+
+    hours, inverse = np.unique(timestamps.astype('datetime64[h]'), return_inverse=True)
+    offsets = np.array([
+        int(hour.replace(tzinfo=timezone.utc).astimezone(tz).utcoffset().total_seconds())
+        for hour in hours.astype('datetime64[s]').astype(datetime)
+    ], dtype=np.int64)
+
+    return (timestamps + offsets[inverse].astype('timedelta64[s]')).astype('datetime64[D]')
+
+
+def moving_average(values, window):
+    """
+    Média móvel simples de `window` pontos (modo 'valid', via soma acumulada)
+    Retorna array com len(values) - window + 1 pontos (vazio se faltar dado)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if window <= 0 or len(values) < window:
+        return np.empty(0)
+
+    sums = np.cumsum(np.concatenate(([0.0], values)))
+    return (sums[window:] - sums[:-window]) / window
+
+
+class DailySeries:
+    """
+    Contagens por dia consecutivo a partir de `start` (datetime64[D])
+    Dias fora da série contam como zero
+    """
+
+    def __init__(self, start, values):
+        self.start = np.datetime64(start, 'D')
+        self.values = np.asarray(values, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def end(self):
+        return self.start + (len(self.values) - 1) * _ONE_DAY
+
+    @property
+    def dates(self):
+        return self.start + np.arange(len(self.values)) * _ONE_DAY
+
+    def labels(self):
+        """Datas 'YYYY-MM-DD'"""
+        return self.dates.astype(str).tolist()
+
+    def window(self, days, end=None):
+        """Série dos `days` dias que terminam em `end` (inclusive; padrão: fim da série)"""
+        end = self.end if end is None else np.datetime64(end, 'D')
+        start = end - (days - 1) * _ONE_DAY
+
+        # Posições relativas à série; o que cair fora vira zero
+        first = int((start - self.start) / _ONE_DAY)
+        values = np.zeros(days, dtype=np.int64)
+        lo, hi = max(first, 0), min(first + days, len(self.values))
+        if lo < hi:
+            values[lo - first:hi - first] = self.values[lo:hi]
+
+        return DailySeries(start, values)
+
+    def total(self):
+        return int(self.values.sum())
+
+    def mean(self):
+        return float(self.values.mean()) if len(self.values) else 0.0
+
+    def max(self):
+        return int(self.values.max()) if len(self.values) else 0
+
+    def active_days(self):
+        return int(np.count_nonzero(self.values))
+
+    def busiest(self):
+        """(data, contagem) do dia com mais eventos, ou None se a série estiver zerada"""
+        if not len(self.values) or not self.values.any():
+            return None
+        i = int(np.argmax(self.values))
+        return str(self.start + i * _ONE_DAY), int(self.values[i])
+
+    def moving_average(self, window=7):
+        return moving_average(self.values, window)
+
+    def percentiles(self, qs=(50, 90)):
+        """{q: valor} dos percentis das contagens diárias"""
+        if not len(self.values):
+            return {q: 0.0 for q in qs}
+        return dict(zip(qs, np.percentile(self.values, qs).round(2).tolist()))
+
+    def compare(self, days, end=None):
+        """
+        Janela atual × janela anterior de mesmo tamanho
+        Retorna {'current', 'previous', 'delta', 'delta_pct'} (delta_pct é
+        None quando o período anterior é zero)
+        """
+        current = self.window(days, end)
+        previous = self.window(days, current.start - _ONE_DAY)
+
+        cur, prev = current.total(), previous.total()
+        return {
+            'current': cur,
+            'previous': prev,
+            'delta': cur - prev,
+            'delta_pct': round((cur - prev) / prev * 100, 1) if prev else None
+        }
+
+
+def series_from_dailies(dailies, start, end):
+    """
+    Soma agregados {dia 'YYYY-MM-DD': {categoria: n}} numa série densa entre
+    `start` e `end` (inclusive); um único bincount ponderado por dia
+    """
+    start = np.datetime64(start, 'D')
+    end = np.datetime64(end, 'D')
+    length = max(int((end - start) / _ONE_DAY) + 1, 0)
+
+    days = []
+    totals = []
+    for daily in dailies:
+        for day, counts in daily.items():
+            days.append(day)
+            totals.append(sum(counts.values()))
+
+    if not days or not length:
+        return DailySeries(start, np.zeros(length, dtype=np.int64))
+
+    offsets = ((np.array(days, dtype='datetime64[D]') - start) / _ONE_DAY).astype(np.int64)
+    inside = (offsets >= 0) & (offsets < length)
+    values = np.bincount(offsets[inside], weights=np.array(totals, dtype=np.float64)[inside],
+                         minlength=length)
+
+    return DailySeries(start, values.astype(np.int64))
+
+
+def get_sprint_days():
+    try:
+        return max(1, int(os.environ.get('SPRINT_DAYS', DEFAULT_SPRINT_DAYS)))
+    except ValueError:
+        return DEFAULT_SPRINT_DAYS
+
+
+_WINDOW_UNITS = [
+    (r'(\d+)\s*(?:d\b|dias?\b)', 1),
+    (r'(\d+)\s*semanas?\b', 7),
+    (r'(\d+)\s*(?:m[eê]s|meses)\b', 30),
+    (r'(\d+)\s*sprints?\b', None),
+]
+
+_WINDOW_WORDS = [
+    (r'\btrimestre\b', 90),
+    (r'\bsprint\b', None),
+    (r'\bm[eê]s\b', 30),
+    (r'\bsemana\b', 7),
+]
+
+
+def parse_window(text):
+    """
+    Extrai o tamanho da janela (dias) de frases como "últimos 90 dias",
+    "30d", "2 semanas", "último trimestre" ou "última sprint"
+    Retorna None se o texto não mencionar período
+    """
+    text = text.lower()
+    sprint = get_sprint_days()
+
+    for pattern, unit in _WINDOW_UNITS:
+        match = re.search(pattern, text)
+        if match and int(match.group(1)) > 0:
+            return int(match.group(1)) * (unit or sprint)
+
+    for pattern, days in _WINDOW_WORDS:
+        if re.search(pattern, text):
+            return days or sprint
+
+    return None
@@ -0,0 +1,88 @@
+"""
+Benchmark da agregação de commits: laços Python x numpy (datetime64/bincount)
+Gera commits sintéticos no formato da API do GitHub e compara a contagem
+por autor e por dia (no fuso PMO_TIMEZONE, como nos agregados diários)
+
+Uso: python bench_aggregation.py [n_commits ...]
+"""
+
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'api'))
+
+from utils.aggregation import commit_columns, count_by_category
+from utils.windows import local_dates
+
+
+def make_commits(n, n_authors=200, days=365):
+    random.seed(42)
+    now = datetime.now()
+    authors = [f'dev{i}' for i in range(n_authors)]
+    return [
+        {'commit': {'author': {
+            'name': random.choice(authors),
+            'date': (now - timedelta(seconds=random.randint(0, days * 86400))).strftime('%Y-%m-%dT%H:%M:%SZ')
+        }}, 'repository': 'org/repo'}
+        for _ in range(n)
+    ]
+
+
+def legacy(commits):
+    """Implementação anterior: dict por autor e strptime por commit"""
+    author_counts = {}
+    for commit in commits:
+        author = commit['commit']['author']['name']
+        author_counts[author] = author_counts.get(author, 0) + 1
+    by_author = sorted(author_counts.items(), key=lambda x: x[1], reverse=True)
+
+    commits_by_date = {}
+    for commit in commits:
+        commit_date = datetime.strptime(commit['commit']['author']['date'][:10], '%Y-%m-%d')
+        key = commit_date.strftime('%Y-%m-%d')
+        commits_by_date[key] = commits_by_date.get(key, 0) + 1
+
+    return by_author, commits_by_date
+
+
+def aggregate(columns):
+    by_author = count_by_category(columns['authors'])
+    by_date = count_by_category(local_dates(columns['timestamps']).astype(str).tolist())
+    return by_author, dict(by_date)
+
+
+def vectorized(commits):
+    return aggregate(commit_columns(commits))
+
+
+def measure(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    sizes = [int(n) for n in sys.argv[1:]] or [10_000, 100_000, 500_000]
+
+    print(f"{'commits':>10}{'laços (ms)':>14}{'numpy (ms)':>14}{'extração (ms)':>16}{'agregação (ms)':>16}")
+    for n in sizes:
+        commits = make_commits(n)
+
+        # Separa a extração das colunas (custo de ler o JSON) da agregação em si
+        start = time.perf_counter()
+        columns = commit_columns(commits)
+        extract = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        aggregate(columns)
+        aggregated = (time.perf_counter() - start) * 1000
+
+        print(f"{n:>10}{measure(legacy, commits):>14.1f}{measure(vectorized, commits):>14.1f}"
+              f"{extract:>16.1f}{aggregated:>16.1f}")
+
+
+if __name__ == '__main__':
+    main()
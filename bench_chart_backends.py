@@ -0,0 +1,96 @@
+"""
+Benchmark dos backends de gráficos (matplotlib x svg)
+Cada backend roda num subprocesso limpo para medir o custo real de um cold
+start: tempo de import, primeira renderização, renderizações seguintes e
+pico de memória (RSS)
+
+Uso: python bench_chart_backends.py [repetições]
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+CHILD = r'''
+import json, os, resource, sys, time
+sys.path.insert(0, os.path.join(os.getcwd(), 'api'))
+
+start = time.perf_counter()
+from utils.statistics import render_chart
+if os.environ['CHART_BACKEND'] == 'matplotlib':
+    import matplotlib.pyplot  # o import real acontece na primeira renderização
+import_time = time.perf_counter() - start
+
+authors = [f'dev{i}' for i in range(12)]
+commits = [40 - 3 * i for i in range(12)]
+payloads = {
+    'commits_ranking': {'authors': authors, 'commits': commits,
+                        'avg': sum(commits) / len(commits), 'repository': 'org/repo'},
+    'commits_timeline': {'dates': [f'2025-01-{d:02d}' for d in range(1, 31)],
+                         'counts': [(d * 7) % 11 for d in range(30)], 'days': 30,
+                         'repository': 'org/repo'},
+    'trello_pie': {'labels': ['A Fazer', 'Fazendo', 'Revisão', 'Feito'],
+                   'sizes': [12, 5, 3, 20], 'total_cards': 40},
+    'trello_cfd': {'dates': [f'2025-01-{d:02d}' for d in range(1, 31)],
+                   'series': [['A Fazer', [12 + d % 4 for d in range(30)]],
+                              ['Fazendo', [5 + d % 3 for d in range(30)]],
+                              ['Feito', [d for d in range(30)]]], 'days': 30},
+    'issues_age': {'age_buckets': [['< 1 dia', 3, 1], ['1-7 dias', 5, 2], ['7-30 dias', 4, 0],
+                                   ['30-90 dias', 2, 1], ['> 90 dias', 6, 0]],
+                   'repository': 'org/repo'},
+    'line_changes': {'authors': authors[:8], 'additions': [900 - 80 * i for i in range(8)],
+                     'deletions': [300 - 20 * i for i in range(8)], 'repository': 'org/repo'}
+}
+
+repeat = int(sys.argv[1])
+result = {'import': import_time, 'first': {}, 'warm': {}, 'bytes': {}}
+for kind, payload in payloads.items():
+    start = time.perf_counter()
+    buf = render_chart(kind, payload)
+    result['first'][kind] = time.perf_counter() - start
+    result['bytes'][kind] = len(buf.getvalue())
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        render_chart(kind, payload)
+    result['warm'][kind] = (time.perf_counter() - start) / repeat
+
+# ru_maxrss vem em KB no Linux
+result['max_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps(result))
+'''
+
+
+def run_backend(backend, repeat):
+    env = dict(os.environ, CHART_BACKEND=backend, MPLBACKEND='Agg')
+    output = subprocess.run(
+        [sys.executable, '-c', CHILD, str(repeat)],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env, capture_output=True, text=True, check=True
+    ).stdout
+    # A renderização imprime logs; o resultado é a última linha
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    results = {backend: run_backend(backend, repeat) for backend in ('matplotlib', 'svg')}
+
+    print(f"{'':22}{'matplotlib':>14}{'svg':>14}")
+    print(f"{'import (ms)':22}{results['matplotlib']['import'] * 1000:>14.1f}"
+          f"{results['svg']['import'] * 1000:>14.1f}")
+    print(f"{'pico de RSS (MB)':22}{results['matplotlib']['max_rss_mb']:>14.1f}"
+          f"{results['svg']['max_rss_mb']:>14.1f}")
+
+    for kind in results['svg']['first']:
+        print(f"\n{kind}")
+        for metric, label, scale in (('first', '1ª render (ms)', 1000),
+                                     ('warm', 'render (ms)', 1000),
+                                     ('bytes', 'tamanho (KB)', 1 / 1024)):
+            print(f"  {label:20}{results['matplotlib'][metric][kind] * scale:>14.1f}"
+                  f"{results['svg'][metric][kind] * scale:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
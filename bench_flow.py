@@ -0,0 +1,94 @@
+"""
+Benchmark da análise de fluxo do Trello (api/utils/flow.py)
+Simula o histórico de ações de um quadro com anos de movimentações, servido
+página a página como a API (`before`), e mede a carga inicial, o pico de
+memória (tracemalloc) e as consultas de CFD e tempo de ciclo
+
+Uso: python bench_flow.py [n_acoes ...]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'api'))
+os.environ.setdefault('PMO_CACHE_DIR', tempfile.mkdtemp(prefix='bench_flow_'))
+
+from utils import flow
+
+LISTS = [('l0', 'Backlog'), ('l1', 'Fazendo'), ('l2', 'Revisão'), ('l3', 'Concluído')]
+
+
+class SyntheticBoard:
+    """Ações geradas sob demanda, da mais nova para a mais antiga (sem guardar o histórico)"""
+
+    def __init__(self, n_actions, years=4):
+        self.n = n_actions
+        self.now = datetime.now(timezone.utc)
+        self.step = timedelta(seconds=years * 365 * 86400 / n_actions)
+        self.cards = max(1, n_actions // 4)
+
+    def action(self, index):
+        # index 0 = mais antiga; cada card percorre as listas em ordem
+        card = index % self.cards
+        stage = (index // self.cards) % len(LISTS)
+        at = (self.now - self.step * (self.n - index)).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+        data = {'card': {'id': f'c{card}'}}
+
+        if stage == 0 and (index * 2654435761) % 10 < 9:
+            data['list'] = {'id': 'l0', 'name': 'Backlog'}
+            return {'id': f'{index:024x}', 'type': 'createCard', 'date': at, 'data': data}
+
+        before, after = LISTS[stage - 1], LISTS[stage]
+        data.update({'listBefore': {'id': before[0], 'name': before[1]},
+                     'listAfter': {'id': after[0], 'name': after[1]}})
+        return {'id': f'{index:024x}', 'type': 'updateCard', 'date': at, 'data': data}
+
+    def get(self, path, api_key, token, params=None, timeout=30):
+        params = params or {}
+        if path.endswith('/lists'):
+            return [{'id': i, 'name': name, 'closed': False} for i, name in LISTS]
+        if path.endswith('/cards'):
+            return []
+
+        end = int(params['before'], 16) if 'before' in params else self.n
+        start = max(0, end - int(params['limit']))
+        return [self.action(i) for i in range(end - 1, start - 1, -1)]
+
+
+def backfill(n_actions, board_id):
+    board = SyntheticBoard(n_actions)
+    flow.trello_get = board.get
+    tracker = flow.FlowTracker(board_id)
+
+    start = time.perf_counter()
+    tracker.sync('key', 'token', force=True)
+    return tracker, time.perf_counter() - start
+
+
+def run(n_actions):
+    tracker, seconds = backfill(n_actions, f'bench{n_actions}')
+
+    start = time.perf_counter()
+    tracker.cumulative_flow(90)
+    tracker.cycle_times(90)
+    tracker.time_in_list()
+    queries = time.perf_counter() - start
+
+    # Memória medida numa segunda carga (o tracemalloc deixa tudo mais lento)
+    tracemalloc.start()
+    backfill(n_actions, f'bench{n_actions}_mem')
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{n_actions:>9} ações | carga {seconds:6.2f} s ({n_actions / seconds:>9,.0f} ações/s) | "
+          f"pico {peak / 1e6:6.1f} MB | consultas {queries * 1000:6.1f} ms")
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 200_000]
+    for size in sizes:
+        run(size)
@@ -0,0 +1,359 @@
+"""
+Benchmark do classificador por regras: ifs sequenciais x autômato de palavras-chave
+Compara a implementação anterior de classify_intent (um `any(palavra in texto)`
+por bloco, na ordem do código) com o autômato Aho–Corasick + tabela de
+prioridade, conferindo que ambas dão o mesmo resultado em todas as frases
+
+Uso: python bench_intent_classifier.py [repeticoes]
+"""
+
+import contextlib
+import io
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'api'))
+
+from utils.intent_classifier import classify_intent, _window_params
+
+MESSAGES = [
+    'me diga os últimos 5 commits',
+    'mostrar histórico do repositório',
+    'criar card Nova Feature',
+    'adicionar tarefa revisar contrato',
+    'listar cards',
+    'quais tarefas temos no quadro?',
+    'deletar card Login',
+    'mover card Login para Concluído',
+    'mudar Login pra Em Progresso',
+    'mostrar listas',
+    'editar card deploy com nova descrição',
+    'o card API está pronto',
+    'estou fazendo o card relatório',
+    'estatística de commits',
+    'estatística do trello',
+    'métricas de issues e PRs',
+    'estatística de linhas alteradas',
+    'análise geral',
+    'resumo dos últimos 90 dias',
+    'fluxo do trello',
+    'tempo de ciclo dos últimos 30 dias',
+    'ajuda',
+    'bom dia!',
+    'qual a previsão do tempo amanhã em são paulo?',
+    'quanto custa o plano enterprise da ferramenta de monitoramento?',
+    '<@U123ABC> oi',
+]
+
+
+def legacy_classify_intent(text):
+    """Implementação anterior: um `if any(...)` por intent, na ordem do código"""
+    text_lower = text.lower()
+    
+    # Remover menção ao bot
+    text_lower = re.sub(r'<@[A-Z0-9]+>', '', text_lower).strip()
+    
+    # Intent: Listar commits do GitHub
+    if any(word in text_lower for word in ['commit', 'commits', 'histórico', 'historico']):
+        # Extrair número de commits
+        match = re.search(r'(\d+)\s*(?:último|últimos|ultima|ultimas|último|últimos)?', text_lower)
+        limit = int(match.group(1)) if match else 5
+        
+        return {
+            'intent': 'github_commits',
+            'params': {
+                'limit': limit
+            },
+            'confidence': 0.95
+        }
+    
+    # Intent: Criar card no Trello
+    if any(word in text_lower for word in ['criar', 'adicionar', 'novo card', 'nova tarefa']):
+        # Extrair nome do card
+        patterns = [
+            r'criar (?:um )?(?:card|tarefa) (?:chamado |chamada )?["\']?(.+?)["\']?$',
+            r'adicionar (?:um )?(?:card|tarefa) ["\']?(.+?)["\']?$',
+            r'novo (?:card|tarefa) ["\']?(.+?)["\']?$',
+            r'criar ["\']?(.+?)["\']? no (?:trello|quadro)',
+        ]
+        
+        card_name = None
+        for pattern in patterns:
+            match = re.search(pattern, text_lower)
+            if match:
+                card_name = match.group(1).strip()
+                break
+        
+        if not card_name:
+            # Tentar extrair tudo depois de "criar"
+            match = re.search(r'criar (.+)', text_lower)
+            if match:
+                card_name = match.group(1).strip()
+        
+        return {
+            'intent': 'trello_create_card',
+            'params': {
+                'card_name': card_name or 'Nova tarefa'
+            },
+            'confidence': 0.9 if card_name else 0.6
+        }
+    
+    # Intent: Fluxo do quadro (CFD, tempo de ciclo)
+    if any(word in text_lower for word in ['fluxo', 'tempo de ciclo', 'cycle time', 'cfd', 'vazão', 'vazao', 'throughput']):
+        return {
+            'intent': 'stats_flow',
+            'params': _window_params(text_lower),
+            'confidence': 0.9
+        }
+    
+    # Intent: Listar cards do Trello
+    if any(word in text_lower for word in ['listar', 'mostrar', 'ver', 'quais', 'cards', 'tarefas']):
+        if any(word in text_lower for word in ['card', 'tarefa', 'trello', 'quadro']):
+            return {
+                'intent': 'trello_list_cards',
+                'params': {},
+                'confidence': 0.9
+            }
+    
+    # Intent: Deletar card
+    if any(word in text_lower for word in ['deletar', 'excluir', 'remover', 'apagar']):
+        if any(word in text_lower for word in ['card', 'tarefa']):
+            # Extrair nome do card
+            patterns = [
+                r'(?:deletar|excluir|remover|apagar) (?:o )?(?:card |tarefa )?["\']?(.+?)["\']?$',
+                r'(?:deletar|excluir|remover|apagar) ["\']?(.+?)["\']?$',
+            ]
+            
+            card_name = None
+            for pattern in patterns:
+                match = re.search(pattern, text_lower)
+                if match:
+                    card_name = match.group(1).strip()
+                    break
+            
+            return {
+                'intent': 'trello_delete_card',
+                'params': {
+                    'card_name': card_name
+                },
+                'confidence': 0.9 if card_name else 0.6
+            }
+    
+    # Intent: Mover card
+    if any(word in text_lower for word in ['mover', 'mudar', 'transferir']):
+        print(f"[INTENT] ===== MOVER CARD DETECTADO =====")
+        print(f"[INTENT] Texto original recebido: '{text}'")
+        print(f"[INTENT] Texto em minúsculas: '{text_lower}'")
+        
+        # Estratégia simples: dividir no "para"
+        # Remove o comando inicial
+        text_clean = re.sub(r'(?:mover|mudar|transferir)\s+', '', text_lower, count=1)
+        print(f"[INTENT] Após remover comando: '{text_clean}'")
+        
+        # Remove "card" ou "o card" do início
+        text_clean = re.sub(r'^(?:o\s+)?(?:card\s+|tarefa\s+)', '', text_clean)
+        print(f"[INTENT] Após remover 'card': '{text_clean}'")
+        
+        # Remover aspas
+        text_clean = text_clean.replace('"', '').replace("'", '')
+        print(f"[INTENT] Após remover aspas: '{text_clean}'")
+        
+        # Encontrar "para" ou "pra"
+        card_name = None
+        target_list = None
+        
+        if ' para ' in text_clean:
+            parts = text_clean.split(' para ', 1)
+            print(f"[INTENT] Split no ' para ': {parts}")
+        elif ' pra ' in text_clean:
+            parts = text_clean.split(' pra ', 1)
+            print(f"[INTENT] Split no ' pra ': {parts}")
+        else:
+            print(f"[INTENT] NÃO ENCONTROU 'para' ou 'pra' no texto!")
+            parts = [None, None]
+        
+        if len(parts) == 2 and parts[0] and parts[1]:
+            card_name = parts[0].strip()
+            target_list = parts[1].strip()
+            
+            # Remover "a lista" do início da lista
+            target_list = re.sub(r'^(?:a\s+)?(?:lista\s+|coluna\s+)', '', target_list)
+            
+            print(f"[INTENT] ===== RESULTADO FINAL =====")
+            print(f"[INTENT] Card: '{card_name}'")
+            print(f"[INTENT] Lista: '{target_list}'")
+        else:
+            print(f"[INTENT] FALHOU - Parts inválidas: {parts}")
+            card_name = None
+            target_list = None
+        
+        return {
+            'intent': 'trello_move_card',
+            'params': {
+                'card_name': card_name,
+                'target_list': target_list
+            },
+            'confidence': 0.85 if (card_name and target_list) else 0.5
+        }
+    
+    # Intent: Listar listas do quadro
+    if any(word in text_lower for word in ['listas', 'colunas']):
+        if any(word in text_lower for word in ['listar', 'mostrar', 'ver', 'quais']):
+            return {
+                'intent': 'trello_list_lists',
+                'params': {},
+                'confidence': 0.9
+            }
+    
+    # Intent: Atualizar/editar card
+    if any(word in text_lower for word in ['atualizar', 'editar', 'modificar', 'alterar']):
+        if any(word in text_lower for word in ['card', 'tarefa', 'descrição', 'descricao']):
+            card_match = re.search(r'(?:card |tarefa )?["\']?(.+?)["\']?(?:com|para)', text_lower)
+            
+            return {
+                'intent': 'trello_update_card',
+                'params': {
+                    'card_name': card_match.group(1).strip() if card_match else None
+                },
+                'confidence': 0.8
+            }
+    
+    # Intent: Status de card (linguagem natural)
+    status_patterns = {
+        'em desenvolvimento': ['fazendo', 'trabalhando', 'desenvolvendo', 'em andamento', 'comecei'],
+        'revisão': ['pronto', 'terminei', 'concluí', 'revisar', 'review'],
+        'concluído': ['concluído', 'concluido', 'feito', 'finalizado', 'completo'],
+        'a fazer': ['vou fazer', 'para fazer', 'fazer depois']
+    }
+    
+    for status, keywords in status_patterns.items():
+        if any(keyword in text_lower for keyword in keywords):
+            # Extrair nome do card
+            card_match = re.search(r'(?:card|tarefa) ["\']?(.+?)["\']? (?:está|esta|ta|ficou)', text_lower)
+            if not card_match:
+                card_match = re.search(r'(?:meu|o) (?:card|tarefa) ["\']?(.+?)["\']?', text_lower)
+            
+            return {
+                'intent': 'trello_update_status',
+                'params': {
+                    'card_name': card_match.group(1).strip() if card_match else None,
+                    'status': status
+                },
+                'confidence': 0.8
+            }
+    
+    # Intent: Estatísticas
+    if any(word in text_lower for word in ['estatística', 'estatistica', 'estatísticas', 'estatisticas', 'análise', 'analise', 'métricas', 'metricas']):
+        # Determinar tipo de estatística
+        if any(word in text_lower for word in ['linhas', 'adições', 'adicoes', 'deleções', 'delecoes']):
+            return {
+                'intent': 'stats_lines',
+                'params': {},
+                'confidence': 0.9
+            }
+        elif any(word in text_lower for word in ['issue', 'pull request', 'prs']):
+            return {
+                'intent': 'stats_issues',
+                'params': {},
+                'confidence': 0.95
+            }
+        elif any(word in text_lower for word in ['commit', 'commits', 'github']):
+            return {
+                'intent': 'stats_commits',
+                'params': {},
+                'confidence': 0.95
+            }
+        elif any(word in text_lower for word in ['card', 'cards', 'trello', 'quadro']):
+            return {
+                'intent': 'stats_trello',
+                'params': {},
+                'confidence': 0.95
+            }
+        elif any(word in text_lower for word in ['atividade', 'resumo', 'geral']):
+            return {
+                'intent': 'stats_activity',
+                'params': _window_params(text_lower),
+                'confidence': 0.9
+            }
+        else:
+            # Estatísticas gerais
+            return {
+                'intent': 'stats_general',
+                'params': {},
+                'confidence': 0.8
+            }
+    
+    # Intent: Resumo de atividades ("resumo dos últimos 90 dias", "atividades da sprint")
+    if any(word in text_lower for word in ['resumo', 'atividade']):
+        return {
+            'intent': 'stats_activity',
+            'params': _window_params(text_lower),
+            'confidence': 0.85
+        }
+    
+    # Intent: Ajuda
+    if any(word in text_lower for word in ['ajuda', 'help', 'ajudar', 'comandos', 'o que você faz']):
+        return {
+            'intent': 'help',
+            'params': {},
+            'confidence': 1.0
+        }
+    
+    # Intent: Saudação
+    if any(word in text_lower for word in ['oi', 'olá', 'ola', 'bom dia', 'boa tarde', 'boa noite', 'hey', 'e ai', 'e aí']):
+        return {
+            'intent': 'greeting',
+            'params': {},
+            'confidence': 0.95
+        }
+    
+    # Intent desconhecido
+    return {
+        'intent': 'unknown',
+        'params': {},
+        'confidence': 0.0
+    }
+
+
+def measure(function, repeat, messages=MESSAGES):
+    """Microssegundos por mensagem (prints do fluxo de mover card descartados)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for message in messages:
+                function(message)
+        elapsed = time.perf_counter() - start
+    return elapsed / (repeat * len(messages)) * 1e6
+
+
+if __name__ == '__main__':
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    # Intent e confiança precisam coincidir; os parâmetros agora vêm da gramática
+    # de slots (utils/slots.py), que preserva a caixa e corrige nomes truncados
+    def decision(result):
+        return result['intent'], result['confidence']
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        mismatches = [m for m in MESSAGES if decision(classify_intent(m)) != decision(legacy_classify_intent(m))]
+        slot_changes = sum(classify_intent(m)['params'] != legacy_classify_intent(m)['params'] for m in MESSAGES)
+        # Sem nenhuma palavra-chave: o pior caso dos ifs sequenciais (passa por todos)
+        unknown = [m for m in MESSAGES if classify_intent(m)['intent'] == 'unknown']
+    if mismatches:
+        print(f"❌ Resultados diferentes: {mismatches}")
+        sys.exit(1)
+
+    legacy_us = measure(legacy_classify_intent, repeat)
+    compiled_us = measure(classify_intent, repeat)
+
+    print(f"{len(MESSAGES)} mensagens x {repeat} repetições (mesmos intents; "
+          f"{slot_changes} com parâmetros da gramática de slots diferentes da extração antiga)")
+    print(f"ifs sequenciais : {legacy_us:6.2f} µs/mensagem")
+    print(f"autômato        : {compiled_us:6.2f} µs/mensagem ({legacy_us / compiled_us:.1f}x)")
+
+    legacy_us = measure(legacy_classify_intent, repeat, unknown)
+    compiled_us = measure(classify_intent, repeat, unknown)
+    print(f"sem intent ({len(unknown)} mensagens): {legacy_us:.2f} → {compiled_us:.2f} µs "
+          f"({legacy_us / compiled_us:.1f}x)")
@@ -0,0 +1,181 @@
+"""
+Calibração dos limiares do modo INTENT_MODE=rules_first
+Reproduz um corpus rotulado ({"text", "intent"} por linha) no classificador
+por regras e, se houver OPENAI_API_KEY, também no LLM; para cada intent
+escolhe a menor confiança a partir da qual as regras acertam pelo menos
+`--target-precision` das frases (e não menos que o LLM nas mesmas frases).
+Intents sem limiar seguro ficam fora da tabela e continuam indo ao LLM.
+As respostas do LLM ficam guardadas em PMO_CACHE_DIR/calibration para que
+rodadas seguintes não paguem as chamadas de novo
+
+Uso: python calibrate_intents.py [corpus.jsonl] [--target-precision 0.98]
+     [--min-support 3] [--output limiares.json] [--no-llm]
+Depois: INTENT_MODE=rules_first INTENT_THRESHOLDS_PATH=limiares.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'api'))
+
+from utils.classification_cache import normalize_text
+from utils.intent_classifier import _classify_with_llm, classify_intent
+from utils.storage import get_cache_dir, load_json, save_json
+
+# Intents que nunca são respondidos só pelas regras
+NEVER_GATED = {'unknown'}
+
+
+def load_corpus(path):
+    corpus = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+                corpus.append((item['text'], item['intent']))
+            except (ValueError, KeyError) as e:
+                print(f"[CALIBRATE] Linha {line_no} ignorada: {e}")
+    return corpus
+
+
+def rules_predictions(corpus):
+    # As regras imprimem logs de depuração; não poluem o relatório
+    with contextlib.redirect_stdout(io.StringIO()):
+        return [classify_intent(text) for text, _ in corpus]
+
+
+def llm_predictions(corpus, openai_key):
+    """Intent do LLM por frase (None se a chamada falhar), com memo em disco"""
+    memo_path = os.path.join(get_cache_dir('calibration'), 'llm_answers.json')
+    memo = load_json(memo_path) or {}
+    answers = []
+
+    for text, _ in corpus:
+        key = normalize_text(text)
+        if key not in memo:
+            classification = _classify_with_llm(text, openai_key)
+            if classification is not None:
+                memo[key] = classification.get('intent')
+        answers.append(memo.get(key))
+
+    save_json(memo_path, memo)
+    return answers
+
+
+def pick_thresholds(corpus, rules, llm, target_precision, min_support):
+    """{intent: limiar} e o detalhamento por intent para o relatório"""
+    by_intent = defaultdict(list)
+    for i, prediction in enumerate(rules):
+        by_intent[prediction['intent']].append(i)
+
+    thresholds = {}
+    details = {}
+    for intent, indexes in sorted(by_intent.items()):
+        if intent in NEVER_GATED:
+            continue
+
+        # Candidatos: confianças observadas, da menor (mais cobertura) para a maior
+        best = None
+        for threshold in sorted({rules[i]['confidence'] for i in indexes}):
+            accepted = [i for i in indexes if rules[i]['confidence'] >= threshold]
+            if len(accepted) < min_support:
+                break
+
+            correct = sum(corpus[i][1] == intent for i in accepted)
+            precision = correct / len(accepted)
+            llm_correct = None
+            if llm is not None:
+                llm_correct = sum(llm[i] == corpus[i][1] for i in accepted)
+
+            if precision >= target_precision and (llm_correct is None or correct >= llm_correct):
+                best = (threshold, len(accepted), precision, llm_correct)
+                break
+
+        if best:
+            thresholds[intent] = best[0]
+        details[intent] = best or (None, len(indexes), None, None)
+
+    return thresholds, details
+
+
+def accuracy(corpus, predictions):
+    return sum(p == expected for p, (_, expected) in zip(predictions, corpus)) / len(corpus)
+
+
+def report(corpus, rules, llm, thresholds, details):
+    print(f"{'intent':<22} {'limiar':>7} {'aceitas':>8} {'precisão':>9} {'llm ok':>7}")
+    for intent, (threshold, support, precision, llm_correct) in details.items():
+        shown = f"{threshold:.2f}" if threshold is not None else '-'
+        prec = f"{precision:.1%}" if precision is not None else '-'
+        llm_ok = str(llm_correct) if llm_correct is not None else '-'
+        print(f"{intent:<22} {shown:>7} {support:>8} {prec:>9} {llm_ok:>7}")
+
+    gated = [
+        thresholds.get(p['intent']) is not None and p['confidence'] >= thresholds[p['intent']]
+        for p in rules
+    ]
+    coverage = sum(gated) / len(corpus)
+    rules_only = [p['intent'] for p in rules]
+
+    print()
+    print(f"Frases: {len(corpus)} | respondidas só pelas regras: {coverage:.1%}")
+    print(f"Acurácia só regras: {accuracy(corpus, rules_only):.1%}")
+    if llm is not None:
+        mixed = [r['intent'] if g else l for r, l, g in zip(rules, llm, gated)]
+        print(f"Acurácia só LLM: {accuracy(corpus, llm):.1%}")
+        print(f"Acurácia regras primeiro: {accuracy(corpus, mixed):.1%}")
+    else:
+        gated_ok = sum(g and r['intent'] == expected for g, r, (_, expected) in zip(gated, rules, corpus))
+        if sum(gated):
+            print(f"Precisão nas frases respondidas pelas regras: {gated_ok / sum(gated):.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Calibra os limiares do modo rules_first')
+    parser.add_argument('corpus', nargs='?', default='intent_corpus.jsonl')
+    parser.add_argument('--target-precision', type=float, default=0.98)
+    parser.add_argument('--min-support', type=int, default=3)
+    parser.add_argument('--output', default='intent_thresholds.json')
+    parser.add_argument('--no-llm', action='store_true', help='calibra só com os rótulos, sem chamar a OpenAI')
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        print(f"[CALIBRATE] Corpus vazio: {args.corpus}")
+        return 1
+
+    rules = rules_predictions(corpus)
+
+    llm = None
+    openai_key = os.environ.get('OPENAI_API_KEY')
+    if not args.no_llm and openai_key:
+        llm = llm_predictions(corpus, openai_key)
+    elif not args.no_llm:
+        print("[CALIBRATE] OPENAI_API_KEY ausente; calibrando só com os rótulos")
+
+    thresholds, details = pick_thresholds(corpus, rules, llm, args.target_precision, args.min_support)
+    report(corpus, rules, llm, thresholds, details)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'thresholds': thresholds,
+            'target_precision': args.target_precision,
+            'min_support': args.min_support,
+            'corpus': os.path.basename(args.corpus),
+            'size': len(corpus),
+            'with_llm': llm is not None
+        }, f, ensure_ascii=False, indent=2)
+    print(f"\nLimiares gravados em {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,126 +1,79 @@
 """
 Agent Classificador de Intenções
 Analisa mensagens em linguagem natural e identifica ações para MCPs (Trello e GitHub)
+Roda no motor de classificação compartilhado com o webhook
+(api/utils/classification_engine.py): modelo local, regras e cache de
+classificações respondem antes do LLM quando o intent tem ação equivalente,
+e as respostas do LLM voltam para o cache e o log de treino comuns
 """
 
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage, SystemMessage
+from api.utils.classification_cache import classification_cache, normalize_text
+from api.utils.classification_engine import (
+    ClassificationEngine, actions_for, classification_for, register_engine, to_agent_result
+)
+from api.utils.intent_classifier import answer_without_llm, classify_intent, remember_classification
+from api.utils.openai_client import chat_json
 
 load_dotenv()
 
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 
+# Teto de tokens da resposta: um JSON com poucas ações cabe com folga
+DEFAULT_MAX_TOKENS = 600
 
-class IntentClassifierAgent:
-    """
-    Agent responsável por classificar intenções de mensagens e mapear para ações específicas
-    """
-    
-    def __init__(self):
-        self.llm = ChatOpenAI(
-            model="gpt-4o-mini",
-            temperature=0.3,  # Baixa temperatura para respostas mais determinísticas
-            api_key=OPENAI_API_KEY
-        )
-        
-        # Definição de ações disponíveis para cada MCP
-        self.available_actions = {
-            "trello": [
-                "create_card",
-                "move_card",
-                "update_card",
-                "delete_card",
-                "list_cards",
-                "get_card_details"
-            ],
-            "github": [
-                "create_issue",
-                "list_issues",
-                "get_repo_info",
-                "list_commits",
-                "comment_on_issue"
-            ],
-            "query": [
-                "get_status",
-                "get_summary",
-                "analyze_project"
-            ]
-        }
-    
-    def classify_intent(self, message: str) -> Dict:
-        """
-        Classifica a intenção da mensagem e retorna ações estruturadas
-        
-        Args:
-            message: Mensagem em linguagem natural do usuário
-            
-        Returns:
-            Dict com estrutura:
-            {
-                "intent_type": "action" | "query" | "ambiguous",
-                "confidence": float (0-1),
-                "actions": [
-                    {
-                        "mcp": "trello" | "github",
-                        "action": "nome_da_acao",
-                        "parameters": {...},
-                        "priority": int (1-10)
-                    }
-                ],
-                "reasoning": "Explicação da classificação",
-                "requires_confirmation": bool
-            }
-        """
-        
-        system_prompt = self._get_system_prompt()
-        
-        user_message = f"""
-Analise a seguinte mensagem e identifique as ações necessárias:
+# Chamadas simultâneas ao LLM em classify_many
+DEFAULT_MAX_CONCURRENCY = 4
 
-MENSAGEM: "{message}"
+# Prazo da chamada ao LLM (segundos); a resposta com várias ações é mais longa
+DEFAULT_TIMEOUT = 30
 
-Retorne APENAS um JSON válido seguindo o formato especificado.
-"""
-        
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=user_message)
-        ]
-        
-        response = self.llm.invoke(messages)
-        
-        try:
-            # Parse da resposta JSON
-            result = json.loads(response.content)
-            
-            # Validar estrutura
-            if not self._validate_result(result):
-                return self._create_error_response(message)
-            
-            return result
-            
-        except json.JSONDecodeError:
-            # Se o LLM não retornar JSON válido, tentar extrair
-            return self._fallback_parse(response.content, message)
-    
-    def _get_system_prompt(self) -> str:
-        """Retorna o prompt do sistema para o classificador"""
-        return f"""Você é um agente especializado em classificar intenções de usuários e mapear para ações específicas em sistemas de gerenciamento de projetos (Trello) e controle de versão (GitHub).
+# Resultados do agente no cache compartilhado, separados das classificações
+# planas do webhook; incrementar quando o formato das ações mudar
+ACTIONS_CACHE_VERSION = 1
+
+# Definição de ações disponíveis para cada MCP
+AVAILABLE_ACTIONS = {
+    "trello": [
+        "create_card",
+        "move_card",
+        "update_card",
+        "delete_card",
+        "list_cards",
+        "get_card_details"
+    ],
+    "github": [
+        "create_issue",
+        "list_issues",
+        "get_repo_info",
+        "list_commits",
+        "comment_on_issue"
+    ],
+    "query": [
+        "get_status",
+        "get_summary",
+        "analyze_project"
+    ]
+}
+
+# Prompt do sistema montado uma única vez (não a cada chamada); a mensagem
+# do usuário vai sempre depois dele
+SYSTEM_PROMPT = """Você é um agente especializado em classificar intenções de usuários e mapear para ações específicas em sistemas de gerenciamento de projetos (Trello) e controle de versão (GitHub).
 
 ## AÇÕES DISPONÍVEIS
 
 ### Trello
-{json.dumps(self.available_actions["trello"], indent=2)}
+{trello}
 
 ### GitHub
-{json.dumps(self.available_actions["github"], indent=2)}
+{github}
 
 ### Query (Consultas)
-{json.dumps(self.available_actions["query"], indent=2)}
+{query}
 
 ## TIPOS DE INTENÇÃO
 
@@ -272,7 +225,189 @@ Resultado:
 }}
 
 Seja preciso, analítico e sempre retorne JSON válido.
+""".format(
+    trello=json.dumps(AVAILABLE_ACTIONS["trello"], indent=2),
+    github=json.dumps(AVAILABLE_ACTIONS["github"], indent=2),
+    query=json.dumps(AVAILABLE_ACTIONS["query"], indent=2)
+)
+
+# Saída estruturada (JSON Schema): a resposta sempre é um JSON neste formato.
+# `parameters` varia por ação, então o schema não é estrito
+RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "intent_actions",
+        "strict": False,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "intent_type": {"type": "string", "enum": ["action", "query", "ambiguous"]},
+                "confidence": {"type": "number"},
+                "actions": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "mcp": {"type": "string", "enum": list(AVAILABLE_ACTIONS)},
+                            "action": {"type": "string"},
+                            "parameters": {"type": "object"},
+                            "priority": {"type": "integer"},
+                            "reasoning": {"type": "string"}
+                        },
+                        "required": ["mcp", "action", "parameters"]
+                    }
+                },
+                "reasoning": {"type": "string"},
+                "requires_confirmation": {"type": "boolean"},
+                "suggested_response": {"type": "string"}
+            },
+            "required": ["intent_type", "confidence", "actions", "reasoning"]
+        }
+    }
+}
+
+
+def _actions_cache_key(message):
+    normalized = normalize_text(message)
+    return f'actions:v{ACTIONS_CACHE_VERSION}:{normalized}' if normalized else None
+
+
+def _is_cacheable(result):
+    """Como no webhook: parâmetros com trechos do texto (nomes de card) não vão para o cache"""
+    return all(
+        not any(isinstance(v, str) for v in (action.get('parameters') or {}).values())
+        for action in result.get('actions', [])
+    )
+
+
+def _answer_without_llm(message):
+    """Backend barato do webhook (modelo local, regras, cache), só quando o intent vira ação"""
+    classification = answer_without_llm(message, accept=lambda c: actions_for(c) is not None)
+    return to_agent_result(classification, 'classificador compartilhado, sem chamar o LLM') if classification else None
+
+
+def _cached_actions(message):
+    key = _actions_cache_key(message)
+    return classification_cache.get(key) if key else None
+
+
+class IntentClassifierAgent:
+    """
+    Agent responsável por classificar intenções de mensagens e mapear para ações específicas
+    """
+    
+    def __init__(self):
+        try:
+            self.max_tokens = int(os.getenv('INTENT_AGENT_MAX_TOKENS', DEFAULT_MAX_TOKENS))
+        except ValueError:
+            self.max_tokens = DEFAULT_MAX_TOKENS
+        
+        # Backends em ordem: o primeiro que responde vence (o LLM sempre responde)
+        self.engine = register_engine(ClassificationEngine('intent_agent', [
+            ('sem_llm', _answer_without_llm),
+            ('cache', _cached_actions),
+            ('llm', self._classify_with_llm),
+        ]))
+        
+        # Definição de ações disponíveis para cada MCP
+        self.available_actions = AVAILABLE_ACTIONS
+    
+    def classify_intent(self, message: str) -> Dict:
+        """
+        Classifica a intenção da mensagem e retorna ações estruturadas
+        
+        Args:
+            message: Mensagem em linguagem natural do usuário
+            
+        Returns:
+            Dict com estrutura:
+            {
+                "intent_type": "action" | "query" | "ambiguous",
+                "confidence": float (0-1),
+                "actions": [
+                    {
+                        "mcp": "trello" | "github",
+                        "action": "nome_da_acao",
+                        "parameters": {...},
+                        "priority": int (1-10)
+                    }
+                ],
+                "reasoning": "Explicação da classificação",
+                "requires_confirmation": bool
+            }
+        
+        Mensagens idênticas em andamento ao mesmo tempo compartilham uma classificação
+        """
+        return self.engine.classify(message)
+    
+    def _classify_with_llm(self, message: str) -> Dict:
+        user_message = f"""
+Analise a seguinte mensagem e identifique as ações necessárias:
+
+MENSAGEM: "{message}"
+
+Retorne APENAS um JSON válido seguindo o formato especificado.
 """
+        
+        messages = [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": user_message}
+        ]
+        
+        try:
+            # Baixa temperatura para respostas mais determinísticas
+            result = chat_json(OPENAI_API_KEY, messages, self.max_tokens, RESPONSE_FORMAT,
+                               'intent_agent', temperature=0.3, timeout=DEFAULT_TIMEOUT)
+        except json.JSONDecodeError as e:
+            # Se o LLM não retornar JSON válido, usar o classificador por regras
+            print(f"Resposta do LLM não é JSON válido ({e}); usando as regras")
+            return self._rules_fallback(message)
+        except Exception as e:
+            print(f"Erro ao chamar o LLM: {e}")
+            return self._create_error_response(message)
+        
+        # Validar estrutura
+        if not isinstance(result, dict) or not self._validate_result(result):
+            return self._create_error_response(message)
+        
+        self._remember(message, result)
+        return result
+    
+    @staticmethod
+    def _remember(message: str, result: Dict):
+        """Guarda a resposta no cache do agente e, se houver intent plano equivalente, no do webhook"""
+        key = _actions_cache_key(message)
+        if key and not result.get('requires_confirmation') and _is_cacheable(result):
+            classification_cache.put(key, result)
+        
+        classification = classification_for(result)
+        if classification is not None:
+            remember_classification(message, classification, 'agent')
+    
+    def classify_many(self, messages: List[str], max_concurrency: Optional[int] = None) -> List[Dict]:
+        """
+        Classifica várias mensagens (ex.: menções acumuladas no Slack) com no
+        máximo `max_concurrency` chamadas simultâneas ao LLM
+        (INTENT_AGENT_CONCURRENCY, padrão 4); resultados na ordem de `messages`
+        e erros isolados por mensagem, como em classify_intent
+        """
+        messages = list(messages)
+        if not messages:
+            return []
+        
+        if max_concurrency is None:
+            try:
+                max_concurrency = int(os.getenv('INTENT_AGENT_CONCURRENCY', DEFAULT_MAX_CONCURRENCY))
+            except ValueError:
+                max_concurrency = DEFAULT_MAX_CONCURRENCY
+        
+        workers = max(1, min(max_concurrency, len(messages)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self.classify_intent, messages))
+    
+    def _get_system_prompt(self) -> str:
+        """Retorna o prompt do sistema para o classificador (montado uma vez no import)"""
+        return SYSTEM_PROMPT
     
     def _validate_result(self, result: Dict) -> bool:
         """Valida a estrutura do resultado"""
@@ -305,10 +440,10 @@ Seja preciso, analítico e sempre retorne JSON válido.
             "suggested_response": "Desculpe, não entendi. Pode reformular?"
         }
     
-    def _fallback_parse(self, content: str, message: str) -> Dict:
-        """Tenta extrair informações mesmo se não for JSON válido"""
-        # Implementação simplificada de fallback
-        return self._create_error_response(message)
+    def _rules_fallback(self, message: str) -> Dict:
+        """Classificação por regras da mensagem, quando o intent tem ação equivalente"""
+        result = to_agent_result(classify_intent(message), 'regras (resposta do LLM inválida)')
+        return result or self._create_error_response(message)
     
     def get_action_summary(self, classification: Dict) -> str:
         """
@@ -5,9 +5,8 @@ Agente LangGraph para Slack usando MCP Customizado
 import os
 import json
 import http.client
-import re
 from datetime import datetime
-from typing import TypedDict, Annotated
+from typing import TypedDict, Annotated, Dict, Optional
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
@@ -15,6 +14,9 @@ from langgraph.graph import StateGraph, END
 import operator
 from urllib.parse import quote
 from intent_classifier_agent import IntentClassifierAgent
+from api.utils.github_api import github_get
+from api.utils.slots import extract_slots
+from api.utils.classification_engine import STATUS_LISTS
 
 # Carregar variáveis de ambiente
 load_dotenv()
@@ -95,29 +97,17 @@ class SlackLangGraphAgent:
     def get_github_data(self):
         """Obtém dados do GitHub via MCP"""
         try:
-            conn = http.client.HTTPSConnection("api.github.com")
-            headers = {
-                'Authorization': f'token {self.github_token}',
-                'Accept': 'application/vnd.github.v3+json',
-                'User-Agent': 'LangGraph-Agent'
-            }
+            # Cliente compartilhado: cache + controle da cota (X-RateLimit-*)
+            repo_path = f"/repos/{GITHUB_OWNER}/{GITHUB_REPO}"
             
             # Informações do repositório
-            conn.request("GET", f"/repos/{GITHUB_OWNER}/{GITHUB_REPO}", headers=headers)
-            response = conn.getresponse()
-            repo = json.loads(response.read().decode())
+            repo = github_get(repo_path, self.github_token)
             
             # Últimos commits
-            conn.request("GET", f"/repos/{GITHUB_OWNER}/{GITHUB_REPO}/commits?per_page=5", headers=headers)
-            response = conn.getresponse()
-            commits = json.loads(response.read().decode())
+            commits = github_get(f"{repo_path}/commits", self.github_token, {'per_page': 5})
             
             # Issues abertas
-            conn.request("GET", f"/repos/{GITHUB_OWNER}/{GITHUB_REPO}/issues?state=open", headers=headers)
-            response = conn.getresponse()
-            issues = json.loads(response.read().decode())
-            
-            conn.close()
+            issues = github_get(f"{repo_path}/issues", self.github_token, {'state': 'open'})
             
             github_data = {
                 'repository': repo['full_name'],
@@ -480,13 +470,14 @@ Contexto atual dos MCPs:
         except Exception as e:
             return f"❌ Erro ao executar {action_name}: {str(e)}"
     
-    def process_question(self, question: str) -> str:
-        """Processa uma pergunta e retorna resposta"""
+    def process_question(self, question: str, classification: Optional[Dict] = None) -> str:
+        """Processa uma pergunta e retorna resposta (classification: já calculada em lote, opcional)"""
         print(f"\n{datetime.now().strftime('%H:%M:%S')} - Processando pergunta: {question}")
         
         # ETAPA 1: Classificar intenção com o Intent Classifier
-        print("🔍 Classificando intenção...")
-        classification = self.intent_classifier.classify_intent(question)
+        if classification is None:
+            print("🔍 Classificando intenção...")
+            classification = self.intent_classifier.classify_intent(question)
         
         print(f"📋 {self.intent_classifier.get_action_summary(classification)}")
         
@@ -515,116 +506,32 @@ Contexto atual dos MCPs:
     
     def _process_with_legacy_logic(self, question: str) -> str:
         """Processa com a lógica antiga (fallback)"""
-        question_lower = question.lower()
+        # Slots pela mesma gramática do classificador por regras (api/utils/slots.py),
+        # inclusive o mapeamento de status ("pronto" → Revisão, "finalizado" → Concluído)
+        slots = extract_slots(question)
         
         # Detectar ações e executar automaticamente
         action_result = None
         
         # Atualizar status usando linguagem natural
-        if not action_result:
-            # Mapeamento de frases para listas (ordem importa: mais específicas primeiro)
-            status_map = [
-                ('finalizado completamente', 'Concluído'),
-                ('está sendo feito', 'Em Desenvolvimento'),
-                ('estou fazendo', 'Em Desenvolvimento'),
-                ('precisa revisar', 'Revisão de código'),
-                ('para revisar', 'Revisão de código'),
-                ('está pronto', 'Revisão de código'),
-                ('em andamento', 'Em Desenvolvimento'),
-                ('precisa fazer', 'A Fazer'),
-                ('para fazer', 'A Fazer'),
-                ('vou fazer', 'A Fazer'),
-                ('concluído', 'Concluído'),
-                ('terminei', 'Revisão de código'),
-                ('finalizado', 'Revisão de código'),
-                ('completo', 'Revisão de código'),
-                ('revisão', 'Revisão de código'),
-                ('comecei', 'Em Desenvolvimento'),
-                ('iniciado', 'Em Desenvolvimento'),
-                ('pronto', 'Concluído'),
-                ('feito', 'Concluído'),
-                ('fazer', 'A Fazer')
-            ]
-            
-            for phrase, target_list in status_map:
-                if phrase in question_lower:
-                    # Tentar extrair o nome do card
-                    # Padrão 1: "meu card Nome está..."
-                    match = re.search(r'(?:meu )?card\s+(.+?)\s+(?:está|precisa|vou|para|em|comecei|terminei|iniciado|finalizado|completo|concluído|feito|pronto)', question_lower)
-                    if not match:
-                        # Padrão 2: "estou fazendo Nome"
-                        match = re.search(r'(?:estou fazendo|comecei|terminei|vou fazer)\s+(?:o |card )?(.+)', question_lower)
-                    if not match:
-                        # Padrão 3: "Nome está..."
-                        match = re.search(r'^(.+?)\s+(?:está|precisa|em)', question_lower)
-                    
-                    if match:
-                        card_name = match.group(1).strip()
-                        # Remover palavras comuns que podem estar no nome
-                        card_name = re.sub(r'^(o |a |meu |minha |card |o card |a card )', '', card_name)
-                        # Remover a frase de status se capturada
-                        card_name = re.sub(r'\s+(está|precisa|vou|para|em|sendo).*$', '', card_name)
-                        action_result = self.move_trello_card(card_name, target_list)
-                        break
+        if slots.action == 'status' and slots.card_name:
+            action_result = self.move_trello_card(slots.card_name, STATUS_LISTS[slots.status])
         
         # Criar card
-        if not action_result and ('criar' in question_lower or 'adicionar' in question_lower):
-            # Tentar padrão 1: "criar card Nome na lista Lista"
-            match = re.search(r'criar\s+card\s+(.+?)\s+na lista\s+(.+)', question_lower)
-            if match:
-                card_name = match.group(1).strip()
-                list_name = match.group(2).strip()
-                action_result = self.create_trello_card(card_name, list_name)
-            else:
-                # Tentar padrão 2: "criar card Nome em Lista"
-                match = re.search(r'criar\s+card\s+(.+?)\s+em\s+(.+)', question_lower)
-                if match:
-                    card_name = match.group(1).strip()
-                    list_name = match.group(2).strip()
-                    action_result = self.create_trello_card(card_name, list_name)
-                else:
-                    # Tentar padrão 3: "criar card Nome" (sem lista específica)
-                    match = re.search(r'criar\s+card\s+(.+)', question_lower)
-                    if match:
-                        card_name = match.group(1).strip()
-                        action_result = self.create_trello_card(card_name, None)
+        elif slots.action == 'create' and slots.card_name:
+            action_result = self.create_trello_card(slots.card_name, slots.target_list)
         
         # Mover card
-        if not action_result and ('mover' in question_lower or 'transferir' in question_lower):
-            match = re.search(r'(?:mover|transferir)\s+(?:card|o card)?\s*(.+?)\s+para\s+(.+)', question)
-            if match:
-                card_name = match.group(1).strip()
-                list_name = match.group(2).strip()
-                action_result = self.move_trello_card(card_name, list_name)
-        
-        # Editar card (verificar antes de deletar)
-        if not action_result and ('editar' in question_lower or 'atualizar' in question_lower):
-            match = re.search(r'(?:editar|atualizar)\s+(?:o )?card\s+["\']?([^"\']+)["\']?\s+(?:para|com nome)\s+["\']?([^"\']+)["\']?', question)
-            if match:
-                card_name = match.group(1).strip()
-                new_name = match.group(2).strip()
-                action_result = self.update_trello_card(card_name, new_name=new_name)
-        
-        # Deletar card(s) - apenas se não foi outra ação
-        if not action_result and ('deletar' in question_lower or 'remover' in question_lower or 'excluir' in question_lower):
-            # Tentar diferentes padrões
-            # Padrão 1: "exclua o card N. Nome do Card (ID: xxx)"
-            match = re.search(r'(?:deletar|remover|excluir)\s+(?:a |o )?card\s+\d+\.\s*([^(]+?)(?:\s*\([^)]+\))?\.?\s*$', question)
-            if match:
-                card_name = match.group(1).strip()
-                action_result = self.delete_trello_card(card_name)
-            else:
-                # Padrão 2: "excluir todos os cards com o nome X"
-                match = re.search(r'(?:deletar|remover|excluir)\s+(?:todos (?:os )?)?cards?\s+(?:com (?:o )?nome\s+)?["\']?([^"\']+)["\']?', question)
-                if match:
-                    card_name = match.group(1).strip()
-                    action_result = self.delete_trello_card(card_name)
-                else:
-                    # Padrão 3: "excluir card X"
-                    match = re.search(r'(?:deletar|remover|excluir)\s+(?:o )?card\s+["\']?([^"\']+)["\']?', question)
-                    if match:
-                        card_name = match.group(1).strip()
-                        action_result = self.delete_trello_card(card_name)
+        elif slots.action == 'move' and slots.card_name and slots.target_list:
+            action_result = self.move_trello_card(slots.card_name, slots.target_list)
+        
+        # Editar card (renomear)
+        elif slots.action == 'update' and slots.card_name and slots.new_name:
+            action_result = self.update_trello_card(slots.card_name, new_name=slots.new_name)
+        
+        # Deletar card
+        elif slots.action == 'delete' and slots.card_name:
+            action_result = self.delete_trello_card(slots.card_name)
         
         # Se uma ação foi executada, retornar resultado
         if action_result:
@@ -686,6 +593,14 @@ def run_slack_bot():
     import time
     import re
     
+    # O agente não lê os artefatos pré-computados em memória; o agendador só
+    # serve aqui para aquecer o cache de gráficos em disco compartilhado com
+    # o servidor (CHART_CACHE_DIR / CHART_CACHE_DISK=1)
+    from api.utils.chart_cache import chart_cache
+    if chart_cache.directory:
+        from api.utils.precompute import start_precompute_scheduler
+        start_precompute_scheduler()
+    
     # Timestamp de inicialização + controle de mensagens processadas
     startup_time = time.time()
     processed_messages = set()  # Apenas para mensagens APÓS startup_time
@@ -710,6 +625,9 @@ def run_slack_bot():
                     time.sleep(10)
                     continue
                 
+                # Menções novas desta leitura: (canal, pergunta), classificadas juntas no fim
+                mentions = []
+                
                 # Processar cada canal
                 for channel in data.get('channels', []):
                     if not channel.get('is_member'):
@@ -756,22 +674,35 @@ def run_slack_bot():
                                 question = re.sub(r'\bbot\b', '', question, flags=re.IGNORECASE).strip()
                                 
                                 if question:
-                                    print(f"\n{'='*60}")
-                                    print(f"NOVA MENCAO em #{channel['name']}")
-                                    print(f"Pergunta: {question}")
-                                    print(f"{'='*60}")
-                                    
-                                    # Processar com LangGraph
-                                    try:
-                                        response = agent.process_question(question)
-                                        
-                                        # Enviar resposta
-                                        if agent.post_to_slack(channel['id'], response):
-                                            print(f"[OK] Resposta enviada para #{channel['name']}")
-                                        else:
-                                            print(f"[ERRO] Falha ao enviar resposta")
-                                    except Exception as e:
-                                        print(f"[ERRO] Ao processar: {e}")
+                                    mentions.append((channel, question))
+                
+                if mentions:
+                    # Várias menções acumuladas: uma rodada de classificação em lote
+                    classifications = [None] * len(mentions)
+                    if len(mentions) > 1:
+                        print(f"\n[{datetime.now().strftime('%H:%M:%S')}] Classificando {len(mentions)} menções em lote")
+                        try:
+                            classifications = agent.intent_classifier.classify_many([q for _, q in mentions])
+                        except Exception as e:
+                            print(f"[ERRO] Classificação em lote: {e}")
+                    
+                    for (channel, question), classification in zip(mentions, classifications):
+                        print(f"\n{'='*60}")
+                        print(f"NOVA MENCAO em #{channel['name']}")
+                        print(f"Pergunta: {question}")
+                        print(f"{'='*60}")
+                        
+                        # Processar com LangGraph
+                        try:
+                            response = agent.process_question(question, classification)
+                            
+                            # Enviar resposta
+                            if agent.post_to_slack(channel['id'], response):
+                                print(f"[OK] Resposta enviada para #{channel['name']}")
+                            else:
+                                print(f"[ERRO] Falha ao enviar resposta")
+                        except Exception as e:
+                            print(f"[ERRO] Ao processar: {e}")
                 
                 conn.close()
                 time.sleep(5)  # Verificar a cada 5 segundos
@@ -0,0 +1,51 @@
+"""
+Testes do pipeline de gráficos: onde a renderização acontece
+Execute: python -m pytest test_chart_pipeline.py
+"""
+
+import os
+import sys
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'api'))
+
+import pytest
+
+from utils import chart_pipeline
+from utils.chart_pipeline import ChartJob, run_chart_pipeline
+
+
+def _job(name):
+    # Repositório único por execução: o gráfico nunca está no cache
+    payload = {'age_buckets': [('< 1 dia', 1, 2)], 'repository': f'org/{uuid.uuid4().hex}'}
+    return ChartJob(name, 'issues_age', lambda: (payload, None), f'{name}.png')
+
+
+@pytest.fixture
+def cold_pool(monkeypatch):
+    monkeypatch.setenv('CHART_BACKEND', 'matplotlib')
+    monkeypatch.delenv('VERCEL', raising=False)
+    monkeypatch.delenv('CHART_PROCESS_MIN_MISSES', raising=False)
+    monkeypatch.setattr(chart_pipeline, '_render_pool', None)
+
+
+def test_few_misses_render_in_thread(cold_pool):
+    report = run_chart_pipeline([_job('a'), _job('b')], lambda data, filename, comment: True)
+
+    assert [job['process'] for job in report['jobs']] == [False, False]
+    assert all(job['ok'] for job in report['jobs'])
+    assert chart_pipeline._render_pool is None
+
+
+def test_vercel_never_uses_processes(cold_pool, monkeypatch):
+    monkeypatch.setenv('VERCEL', '1')
+    monkeypatch.setenv('CHART_PROCESS_MIN_MISSES', '1')
+
+    assert not chart_pipeline._use_processes(5)
+
+
+def test_larger_batches_use_the_pool(cold_pool, monkeypatch):
+    monkeypatch.setenv('CHART_PROCESS_MIN_MISSES', '3')
+
+    assert not chart_pipeline._use_processes(2)
+    assert chart_pipeline._use_processes(3)
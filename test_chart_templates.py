@@ -0,0 +1,54 @@
+"""
+Testes do pool de figuras reaproveitáveis (chart_templates)
+Execute: python -m pytest test_chart_templates.py
+"""
+
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'api'))
+
+import pytest
+
+from utils import chart_templates
+from utils.statistics import render_issues_age_chart
+
+PAYLOAD = {'age_buckets': [('< 1 dia', 1, 2), ('1-7 dias', 3, 0)], 'repository': 'org/app'}
+
+
+@pytest.fixture(autouse=True)
+def empty_pool(monkeypatch):
+    monkeypatch.setattr(chart_templates, '_idle', {})
+    monkeypatch.setattr(chart_templates, '_counts', {})
+
+
+def _render_in_thread():
+    used = []
+
+    def worker():
+        with chart_templates.figure_template('issues_age') as template:
+            used.append(template)
+        used.append(render_issues_age_chart(PAYLOAD))
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    return used
+
+
+def test_template_is_reused_across_threads():
+    first, first_chart = _render_in_thread()
+    second, second_chart = _render_in_thread()
+
+    assert first is second
+    assert first_chart.getvalue() == second_chart.getvalue()
+    assert chart_templates._snapshot()['issues_age'] == {'created': 1, 'reused': 3, 'idle': 1}
+
+
+def test_concurrent_renders_get_distinct_templates():
+    with chart_templates.figure_template('trello_pie') as first:
+        with chart_templates.figure_template('trello_pie') as second:
+            assert first is not second
+
+    assert chart_templates._snapshot()['trello_pie'] == {'created': 2, 'reused': 0, 'idle': 2}
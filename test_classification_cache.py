@@ -0,0 +1,64 @@
+"""
+Testes do cache de classificações (chave, elegibilidade e camadas)
+Execute: python -m pytest test_classification_cache.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'api'))
+
+from utils.classification_cache import ClassificationCache, normalize_text
+from utils.intent_classifier import _cache_key, _is_cacheable
+
+
+def test_normalized_key_ignores_mentions_case_accents_and_spaces():
+    assert normalize_text('<@U123> Estatística   do TRELLO') == 'estatistica do trello'
+    assert _cache_key('Listar cards') == _cache_key('<@U1> listar  CARDS')
+    assert _cache_key('<@U1>   ') is None
+
+
+def test_answers_with_text_params_are_not_cacheable():
+    assert _is_cacheable({'intent': 'stats_trello', 'params': {}, 'confidence': 0.9})
+    assert _is_cacheable({'intent': 'github_commits', 'params': {'limit': 5}, 'confidence': 0.9})
+    # "criar card Login" e "criar card login" têm a mesma chave
+    assert not _is_cacheable({'intent': 'trello_create_card', 'params': {'card_name': 'Login'}})
+    assert not _is_cacheable({'intent': None, 'params': {}})
+    assert not _is_cacheable(None)
+
+
+def test_get_returns_fresh_copies():
+    cache = ClassificationCache()
+    cache.put('k', {'intent': 'help', 'params': {}})
+
+    first = cache.get('k')
+    first['params']['x'] = 1
+    assert cache.get('k') == {'intent': 'help', 'params': {}}
+
+
+def test_ttl_and_lru_eviction(monkeypatch):
+    cache = ClassificationCache(ttl=10, max_entries=2)
+    clock = [1000.0]
+    monkeypatch.setattr('utils.classification_cache.time.time', lambda: clock[0])
+
+    cache.put('a', {'intent': 'a'})
+    cache.put('b', {'intent': 'b'})
+    cache.get('a')
+    cache.put('c', {'intent': 'c'})
+    assert cache.get('b') is None  # menos usada saiu
+    assert cache.get('a') == {'intent': 'a'}
+
+    clock[0] += 11
+    assert cache.get('a') is None
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / 'classifications.sqlite')
+    ClassificationCache(path=path).put('k', {'intent': 'help'})
+
+    reopened = ClassificationCache(path=path)
+    assert reopened.get('k') == {'intent': 'help'}
+    assert reopened.snapshot()['disk_hits'] == 1
+    # Depois da primeira leitura a entrada fica em memória
+    reopened.get('k')
+    assert reopened.snapshot()['hits'] == 1
@@ -0,0 +1,71 @@
+"""
+Testes do motor de classificação e do esquema comum intent <-> ações
+Execute: python -m pytest test_classification_engine.py
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'api'))
+
+from utils.classification_engine import (
+    ClassificationEngine, actions_for, classification_for, to_agent_result
+)
+
+
+def test_first_backend_that_answers_wins():
+    engine = ClassificationEngine('teste_ordem', [
+        ('nada', lambda text: None),
+        ('regras', lambda text: {'intent': 'help'}),
+        ('llm', lambda text: {'intent': 'unknown'}),
+    ])
+    assert engine.classify('ajuda') == {'intent': 'help'}
+    assert engine.snapshot() == {'nada': 0, 'regras': 1, 'llm': 0, 'unanswered': 0}
+
+
+def test_coalesced_callers_get_their_own_copy():
+    calls = []
+
+    def slow(text):
+        calls.append(text)
+        time.sleep(0.1)
+        return {'intent': 'trello_move_card', 'params': {'card_name': 'Login'}}
+
+    engine = ClassificationEngine('teste_copias', [('llm', slow)])
+    barrier = threading.Barrier(3)
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(engine.classify('mover card Login para Concluído'))
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results[0] == results[1] == results[2]
+    results[0]['params']['card_name'] = 'alterado'
+    assert results[1]['params']['card_name'] == 'Login'
+
+
+def test_flat_intent_round_trips_through_actions():
+    flat = {'intent': 'github_commits', 'params': {'limit': 3}, 'confidence': 0.9}
+    agent = to_agent_result(flat, 'regras')
+
+    assert agent['actions'] == [{'mcp': 'github', 'action': 'list_commits',
+                                 'parameters': {'limit': 3}, 'priority': 1}]
+    assert classification_for(agent) == flat
+
+
+def test_status_maps_to_move_and_unmapped_intents_stay_out():
+    status = {'intent': 'trello_update_status', 'params': {'card_name': 'Login', 'status': 'concluído'}}
+    assert actions_for(status)[0]['parameters'] == {'card_name': 'Login', 'target_list': 'Concluído'}
+
+    assert actions_for({'intent': 'stats_trello', 'params': {}}) is None
+    # Sem o parâmetro obrigatório não há ação executável
+    assert actions_for({'intent': 'trello_move_card', 'params': {'card_name': 'Login'}}) is None
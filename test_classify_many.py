@@ -0,0 +1,74 @@
+"""
+Testes da classificação em lote (classify_many)
+Execute: python -m pytest test_classify_many.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'api'))
+
+import pytest
+
+from utils import intent_classifier
+from utils.classification_cache import classification_cache
+
+
+def _echo_card(text):
+    """Resposta falsa do LLM: mover o card cujo nome vem depois de 'card'"""
+    name = text.split('card ', 1)[1].split(' para')[0]
+    return {'intent': 'trello_move_card', 'params': {'card_name': name, 'target_list': 'Concluído'},
+            'confidence': 0.9}
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    calls = []
+
+    def batch(texts, openai_key):
+        calls.append(list(texts))
+        return [_echo_card(text) for text in texts]
+
+    def single(text, openai_key):
+        calls.append([text])
+        return _echo_card(text)
+
+    monkeypatch.setenv('OPENAI_API_KEY', 'teste')
+    monkeypatch.setenv('INTENT_MODE', 'llm')
+    monkeypatch.delenv('INTENT_LOG_PATH', raising=False)
+    monkeypatch.setattr(intent_classifier, '_classify_batch_with_llm', batch)
+    monkeypatch.setattr(intent_classifier, '_classify_with_llm', single)
+    classification_cache.clear()
+    yield calls
+    classification_cache.clear()
+
+
+def test_results_in_input_order(fake_llm):
+    texts = [f'mover card Tarefa {i} para Concluído' for i in range(10)]
+    results = intent_classifier.classify_many(texts)
+
+    assert [r['params']['card_name'] for r in results] == [f'Tarefa {i}' for i in range(10)]
+    # 10 curtas com lote de 8: um lote e uma chamada com as 2 restantes
+    assert sorted(len(call) for call in fake_llm) == [2, 8]
+
+
+def test_case_variants_keep_their_own_params(fake_llm):
+    results = intent_classifier.classify_many([
+        'mover card Login para Concluído',
+        'mover card login para Concluído',
+    ])
+
+    assert results[0]['params']['card_name'] == 'Login'
+    assert results[1]['params']['card_name'] == 'login'
+
+
+def test_exact_duplicates_share_one_call_but_not_the_dict(fake_llm):
+    text = 'mover card Login para Concluído'
+    results = intent_classifier.classify_many([text, text])
+
+    assert fake_llm == [[text]]
+    assert results[0] == results[1]
+    assert results[0] is not results[1]
+
+    results[0]['params']['card_name'] = 'alterado'
+    assert results[1]['params']['card_name'] == 'Login'
@@ -0,0 +1,32 @@
+"""
+Testes da prioridade das regras e dos limiares do modo rules_first
+Execute: python -m pytest test_intent_rules.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'api'))
+
+import pytest
+
+from utils.intent_classifier import DEFAULT_RULE_THRESHOLDS, classify_intent
+
+
+@pytest.mark.parametrize('text, intent', [
+    ('me diga os últimos 5 commits', 'github_commits'),
+    ('histórico de commits da semana', 'github_commits'),
+    ('estatística de commits', 'stats_commits'),
+    ('análise dos commits do mês', 'stats_commits'),
+    ('ranking de commits por pessoa', 'stats_commits'),
+    ('quem mais commitou?', 'stats_commits'),
+    ('métricas do github', 'stats_commits'),
+])
+def test_commit_stats_win_over_listing_commits(text, intent):
+    assert classify_intent(text)['intent'] == intent
+
+
+@pytest.mark.parametrize('text', ['me diga os últimos 5 commits', 'estatística de commits'])
+def test_commit_intents_can_skip_the_llm(text):
+    result = classify_intent(text)
+    assert result['confidence'] >= DEFAULT_RULE_THRESHOLDS[result['intent']]
@@ -0,0 +1,86 @@
+"""
+Testes do store local de issues/PRs e do relatório com vários repositórios
+Execute: python -m pytest test_issue_store.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'api'))
+
+import pytest
+
+from utils import issue_store
+from utils.statistics import get_issues_stats
+
+
+def _issue(number, updated_at, closed_at=None, pr=False):
+    item = {'number': number, 'user': {'login': 'ana'}, 'created_at': '2024-01-01T00:00:00Z',
+            'closed_at': closed_at, 'updated_at': updated_at}
+    if pr:
+        item['pull_request'] = {'merged_at': closed_at}
+    return item
+
+
+@pytest.fixture
+def github(monkeypatch, tmp_path):
+    """Repositórios falsos: {repo: itens}; repositório ausente responde 404"""
+    repos = {}
+    calls = []
+
+    def fake_get(path, token, params=None, cache=True):
+        calls.append(cache)
+        repo = path.split('/repos/')[1].rsplit('/issues', 1)[0]
+        if repo not in repos:
+            raise Exception(f'404: {repo}')
+        since = params.get('since') or ''
+        return [item for item in repos[repo] if item['updated_at'] > since]
+
+    stores = {}
+
+    def fake_store(repo):
+        if repo not in stores:
+            stores[repo] = issue_store.IssueStore(repo, str(tmp_path / (repo.replace('/', '__') + '.json')))
+        return stores[repo]
+
+    monkeypatch.setattr(issue_store, 'github_get', fake_get)
+    monkeypatch.setattr(issue_store, 'get_issue_store', fake_store)
+    return repos, calls
+
+
+def test_sync_pages_skip_the_response_cache(github):
+    repos, calls = github
+    repos['org/app'] = [_issue(1, '2024-01-02T00:00:00Z')]
+
+    issue_store.get_issue_store('org/app').sync('token')
+
+    assert calls == [False]
+
+
+def test_columns_are_a_snapshot(github):
+    repos, _ = github
+    repos['org/app'] = [_issue(1, '2024-01-02T00:00:00Z')]
+    store = issue_store.get_issue_store('org/app')
+    store.sync('token')
+    before = store.columns()
+
+    repos['org/app'] = [_issue(1, '2024-01-03T00:00:00Z', closed_at='2024-01-03T00:00:00Z')]
+    store.sync('token')
+
+    assert issue_store.np.isnat(before['closed'][0])
+    assert not issue_store.np.isnat(store.columns()['closed'][0])
+
+
+def test_one_failing_repo_does_not_drop_the_report(github):
+    repos, _ = github
+    repos['org/app'] = [_issue(1, '2024-01-02T00:00:00Z'), _issue(2, '2024-01-02T00:00:00Z', pr=True)]
+
+    stats = get_issues_stats('token', ['org/app', 'org/renomeado'])
+
+    assert stats['repository'] == 'org/app'
+    assert stats['open_issues'] == 1
+    assert stats['open_prs'] == 1
+
+
+def test_report_fails_only_when_every_repo_fails(github):
+    assert get_issues_stats('token', ['org/a', 'org/b']) is None
@@ -0,0 +1,86 @@
+"""
+Testes do orçamento de latência da OpenAI (INTENT_LLM_BUDGET_MS)
+Execute: python -m pytest test_llm_budget.py
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'api'))
+
+import pytest
+
+from utils import intent_classifier
+from utils.classification_cache import classification_cache
+
+LLM_ANSWER = {'intent': 'trello_move_card', 'params': {'card_name': 'Login', 'target_list': 'Concluído'},
+              'confidence': 0.95}
+
+
+@pytest.fixture
+def slow_llm(monkeypatch):
+    def answer(text, openai_key):
+        time.sleep(0.2)
+        return dict(LLM_ANSWER)
+
+    monkeypatch.setenv('OPENAI_API_KEY', 'teste')
+    monkeypatch.setenv('INTENT_MODE', 'llm')
+    monkeypatch.setenv('INTENT_LLM_BUDGET_MS', '20')
+    monkeypatch.delenv('INTENT_LOG_PATH', raising=False)
+    monkeypatch.setattr(intent_classifier, '_classify_with_llm', answer)
+    classification_cache.clear()
+    yield
+    classification_cache.clear()
+
+
+def test_unconfident_rules_wait_for_llm(slow_llm):
+    # As regras erram esta frase ("mover" contém "ver"); não podem vencer pelo tempo
+    rules = intent_classifier.classify_intent('mover card Login para Concluído')
+    threshold = intent_classifier.get_rule_thresholds().get(rules['intent'])
+    assert threshold is None or rules['confidence'] < threshold
+
+    result = intent_classifier.classify_with_openai('mover card Login para Concluído')
+    assert result['intent'] == 'trello_move_card'
+
+
+def test_confident_rules_answer_after_budget(slow_llm):
+    start = time.perf_counter()
+    result = intent_classifier.classify_with_openai('ajuda')
+
+    assert result['intent'] == 'help'
+    assert time.perf_counter() - start < 0.15
+
+
+@pytest.fixture
+def stuck_llm(monkeypatch):
+    release = threading.Event()
+
+    def answer(text, openai_key):
+        # OpenAI travada até o fim do teste; sem resposta, nada vai para o cache
+        release.wait(5)
+        return None
+
+    monkeypatch.setenv('OPENAI_API_KEY', 'teste')
+    monkeypatch.setenv('INTENT_MODE', 'llm')
+    monkeypatch.setenv('INTENT_LLM_BUDGET_MS', '20')
+    monkeypatch.setenv('INTENT_LLM_MAX_WAIT_MS', '150')
+    monkeypatch.delenv('INTENT_LOG_PATH', raising=False)
+    monkeypatch.setattr(intent_classifier, '_classify_with_llm', answer)
+    classification_cache.clear()
+    yield
+    release.set()
+    classification_cache.clear()
+
+
+def test_rules_without_threshold_answer_at_deadline(stuck_llm):
+    text = 'listar cards do quadro'
+    rules = intent_classifier.classify_intent(text)
+    assert intent_classifier.get_rule_thresholds().get(rules['intent']) is None
+
+    start = time.perf_counter()
+    result = intent_classifier.classify_with_openai(text)
+
+    assert result['intent'] == rules['intent']
+    assert 0.1 < time.perf_counter() - start < 0.5
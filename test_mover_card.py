@@ -9,6 +9,19 @@ import os
 # Adicionar o path da API
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'api'))
 
+# Casos de teste (todos devem virar trello_move_card com card e lista);
+# também usados no relatório de train_intent_model.py
+MOVE_CARD_CASES = [
+    "mover card Login para Concluído",
+    "mover card Fazer apresentação para A fazer",
+    "mover card testar deploy para A fazer",
+    'mover card "Login" para Concluído',
+    "mover Login para Concluído",
+    "mover o card Login para a lista Concluído",
+    "mudar Login pra Em Progresso",
+    "transferir card API para Revisão",
+]
+
 def test_intent_classifier():
     """Testa o classificador de intenções"""
     from utils.intent_classifier import classify_with_openai
@@ -18,19 +31,7 @@ def test_intent_classifier():
     print("=" * 80)
     print()
     
-    # Casos de teste
-    test_cases = [
-        "mover card Login para Concluído",
-        "mover card Fazer apresentação para A fazer",
-        "mover card testar deploy para A fazer",
-        'mover card "Login" para Concluído',
-        "mover Login para Concluído",
-        "mover o card Login para a lista Concluído",
-        "mudar Login pra Em Progresso",
-        "transferir card API para Revisão",
-    ]
-    
-    for i, text in enumerate(test_cases, 1):
+    for i, text in enumerate(MOVE_CARD_CASES, 1):
         print(f"\n{'─' * 80}")
         print(f"📝 Teste {i}: '{text}'")
         print('─' * 80)
@@ -0,0 +1,83 @@
+"""
+Testes do agregado diário de commits (CommitRollup)
+Execute: python -m pytest test_rollups.py
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'api'))
+
+import pytest
+
+from utils import rollups
+
+
+def _at(days_ago, hour=12):
+    moment = datetime.now(timezone.utc).replace(hour=hour, minute=0, second=0, microsecond=0)
+    return (moment - timedelta(days=days_ago)).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _commit(sha, committed_at, author='ana'):
+    return {'sha': sha, 'commit': {'author': {'name': author, 'date': committed_at},
+                                   'committer': {'date': committed_at}}}
+
+
+@pytest.fixture
+def github(monkeypatch, tmp_path):
+    """Repositório falso: a API devolve os commits com data >= since, mais novos primeiro"""
+    commits = []
+    requests = []
+
+    def fake_get(path, token, params=None, cache=True):
+        requests.append(params['since'])
+        found = [c for c in commits if c['commit']['committer']['date'] >= params['since']]
+        found.sort(key=lambda c: c['commit']['committer']['date'], reverse=True)
+        start = (params['page'] - 1) * params['per_page']
+        return found[start:start + params['per_page']]
+
+    monkeypatch.delenv('PMO_TIMEZONE', raising=False)
+    monkeypatch.setattr(rollups, 'github_get', fake_get)
+    rollup = rollups.CommitRollup('org/repo', path=str(tmp_path / 'rollup.json'))
+    return rollup, commits, requests
+
+
+def total(rollup):
+    return sum(sum(counts.values()) for counts in rollup.daily().values())
+
+
+def test_same_second_commits_are_counted_once(github):
+    rollup, commits, _ = github
+    commits += [_commit('a', _at(2)), _commit('b', _at(1)), _commit('c', _at(1))]
+
+    assert rollup.sync('token', force=True) == 3
+    # `since` é inclusivo: b e c voltam na próxima leitura e não contam de novo
+    assert rollup.sync('token', force=True) == 0
+    assert total(rollup) == 3
+
+
+def test_late_commit_with_older_date_is_counted(github):
+    rollup, commits, requests = github
+    commits += [_commit('a', _at(2)), _commit('b', _at(1))]
+    rollup.sync('token', force=True)
+
+    # Merge sem squash: chega depois, com data anterior ao cursor
+    commits.append(_commit('late', _at(3)))
+    assert rollup.sync('token', force=True) == 1
+    assert total(rollup) == 3
+    assert requests[-1] <= _at(1 + rollups.DEFAULT_OVERLAP_DAYS)
+
+
+def test_seen_shas_are_bounded_and_persisted(github, tmp_path):
+    rollup, commits, _ = github
+    commits += [_commit('old', _at(30)), _commit('new', _at(1))]
+    rollup.sync('token', force=True)
+
+    seen = {sha for shas in rollup.seen.values() for sha in shas}
+    assert seen == {'new'}
+
+    reloaded = rollups.CommitRollup('org/repo', path=rollup.path)
+    assert reloaded.cursor == rollup.cursor
+    assert reloaded.seen == rollup.seen
+    assert reloaded.sync('token', force=True) == 0
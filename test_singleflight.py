@@ -0,0 +1,82 @@
+"""
+Testes da coalescência de chamadas idênticas (SingleFlight)
+Execute: python -m pytest test_singleflight.py
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'api'))
+
+from utils.singleflight import SingleFlight
+
+
+def _run_concurrently(n, fn):
+    """Dispara `fn` em n threads ao mesmo tempo; devolve (resultados, exceções)"""
+    barrier = threading.Barrier(n)
+    results, errors = [], []
+
+    def worker():
+        barrier.wait()
+        try:
+            results.append(fn())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+def test_concurrent_calls_share_one_execution():
+    group = SingleFlight('teste')
+    executions = []
+
+    def work():
+        executions.append(1)
+        time.sleep(0.1)
+        return 42
+
+    results, errors = _run_concurrently(5, lambda: group.do('chave', work))
+
+    assert results == [42] * 5 and not errors
+    assert len(executions) == 1
+    snapshot = group.snapshot()
+    assert snapshot['executions'] == 1
+    assert snapshot['coalesced'] == 4
+    assert snapshot['in_flight'] == 0
+
+
+def test_different_keys_do_not_coalesce():
+    group = SingleFlight('teste')
+    assert group.do('a', lambda: 1) == 1
+    assert group.do('b', lambda: 2) == 2
+    assert group.snapshot()['coalesced'] == 0
+
+
+def test_error_reaches_every_waiter_and_is_not_kept():
+    group = SingleFlight('teste')
+
+    def fail():
+        time.sleep(0.1)
+        raise ValueError('falhou')
+
+    results, errors = _run_concurrently(3, lambda: group.do('chave', fail))
+
+    assert not results
+    assert len(errors) == 3 and all(isinstance(e, ValueError) for e in errors)
+    # Nada fica guardado: a próxima chamada executa de novo
+    assert group.do('chave', lambda: 'ok') == 'ok'
+
+
+def test_sequential_calls_execute_again():
+    group = SingleFlight('teste')
+    calls = []
+    group.do('chave', calls.append, 1)
+    group.do('chave', calls.append, 2)
+    assert calls == [1, 2]
@@ -0,0 +1,45 @@
+"""
+Testes da gramática de slots compartilhada (api/utils/slots.py)
+Execute: python -m pytest test_slots.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'api'))
+
+import pytest
+
+from utils.slots import Message, extract_slots
+from test_mover_card import MOVE_CARD_CASES
+
+
+@pytest.mark.parametrize('text, action, card_name, target_list', [
+    ('mover card Login para A fazer', 'move', 'Login', 'A fazer'),
+    ('mover card "Login" para Concluído', 'move', 'Login', 'Concluído'),
+    ('criar card Nova Feature', 'create', 'Nova Feature', None),
+])
+def test_card_and_list(text, action, card_name, target_list):
+    slots = extract_slots(text)
+    assert (slots.action, slots.card_name, slots.target_list) == (action, card_name, target_list)
+
+
+@pytest.mark.parametrize('text, card_name, status', [
+    ('estou fazendo o Card de teste', 'Card de teste', 'em desenvolvimento'),
+    ('card Feature X concluído', 'Feature X', 'concluído'),
+    # Mapeamento único dos dois caminhos (o agente antigo invertia estas três)
+    ('card Login pronto', 'Login', 'revisão'),
+    ('o card Login está pronto', 'Login', 'revisão'),
+    ('card Login finalizado', 'Login', 'concluído'),
+    ('card Login completo', 'Login', 'concluído'),
+    ('card Login finalizado completamente', 'Login', 'concluído'),
+])
+def test_status_phrases(text, card_name, status):
+    slots = extract_slots(text)
+    assert (slots.action, slots.card_name, slots.status) == ('status', card_name, status)
+
+
+@pytest.mark.parametrize('text', MOVE_CARD_CASES)
+def test_move_grammar_extracts_card_and_list(text):
+    slots = Message(text).slots_for('move')
+    assert slots.card_name and slots.target_list
@@ -0,0 +1,163 @@
+"""
+Treino do modelo local de intenções (api/utils/intent_model.py)
+Junta pares (texto, intent) do corpus rotulado e dos logs de classificação
+(INTENT_LOG_PATH, gravados a partir das respostas do LLM), remove repetidos
+(o primeiro arquivo vence, então rótulos manuais têm prioridade), mede o
+modelo e grava o artefato .npz usado por INTENT_MODE=local
+
+Relatório:
+- acurácia em validação cruzada (k partes), modelo local x regras
+- frases de test_mover_card.py, fora do treino: intent e parâmetros
+- latência por mensagem (modelo, classify_local, classify_intent) e carga
+
+Uso: python train_intent_model.py [pares.jsonl ...] [--output caminho.npz]
+     [--dim 4096] [--epochs 300] [--folds 5]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'api'))
+
+from utils import intent_classifier
+from utils.classification_cache import normalize_text
+from utils.intent_model import DEFAULT_DIM, IntentModel, train
+from test_mover_card import MOVE_CARD_CASES
+
+DEFAULT_OUTPUT = os.path.join('api', 'utils', 'intent_model.npz')
+
+
+def load_pairs(paths):
+    """[(texto, intent)] sem textos repetidos (após normalização)"""
+    pairs = []
+    seen = set()
+    for path in paths:
+        added = 0
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    item = json.loads(line)
+                    text, intent = item['text'], item['intent']
+                except (ValueError, KeyError):
+                    continue
+                key = normalize_text(text)
+                if not key or not intent or key in seen:
+                    continue
+                seen.add(key)
+                pairs.append((text, intent))
+                added += 1
+        print(f"[TRAIN] {path}: {added} pares")
+    return pairs
+
+
+def quiet(fn, *args):
+    # As regras de mover card imprimem logs de depuração
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args)
+
+
+def cross_validate(pairs, folds, **kwargs):
+    shuffled = pairs[:]
+    random.Random(42).shuffle(shuffled)
+
+    local_ok = rules_ok = 0
+    for fold in range(folds):
+        test = shuffled[fold::folds]
+        train_set = [p for i, p in enumerate(shuffled) if i % folds != fold]
+        model = train([t for t, _ in train_set], [i for _, i in train_set], **kwargs)
+        local_ok += sum(model.predict(text)[0] == intent for text, intent in test)
+        rules_ok += sum(quiet(intent_classifier.classify_intent, text)['intent'] == intent for text, intent in test)
+
+    print(f"Validação cruzada ({folds} partes, {len(pairs)} frases): "
+          f"modelo local {local_ok / len(pairs):.1%} | regras {rules_ok / len(pairs):.1%}")
+
+
+def held_out_report(pairs, **kwargs):
+    """Modelo treinado sem as frases de test_mover_card.py, avaliado nelas"""
+    held = {normalize_text(text) for text in MOVE_CARD_CASES}
+    train_set = [p for p in pairs if normalize_text(p[0]) not in held]
+    model = train([t for t, _ in train_set], [i for _, i in train_set], **kwargs)
+
+    print(f"\nFrases de test_mover_card.py (fora do treino), esperado trello_move_card:")
+    local_ok = rules_ok = 0
+    for text in MOVE_CARD_CASES:
+        intent, prob = model.predict(text)
+        rules = quiet(intent_classifier.classify_intent, text)
+        local_ok += intent == 'trello_move_card'
+        rules_ok += rules['intent'] == 'trello_move_card'
+        print(f"  {text[:45]:<45} local {intent} ({prob:.2f}) | regras {rules['intent']}")
+    print(f"  Acertos: modelo local {local_ok}/{len(MOVE_CARD_CASES)} | regras {rules_ok}/{len(MOVE_CARD_CASES)}")
+
+
+def measure_us(fn, texts, repeat=20):
+    samples = []
+    for _ in range(repeat):
+        for text in texts:
+            start = time.perf_counter()
+            fn(text)
+            samples.append((time.perf_counter() - start) * 1e6)
+    return np.percentile(samples, [50, 99])
+
+
+def latency_report(path, texts):
+    start = time.perf_counter()
+    model = IntentModel.load(path)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    os.environ['INTENT_MODEL_PATH'] = path
+    with contextlib.redirect_stdout(io.StringIO()):
+        rows = [
+            ('modelo (predict)', measure_us(model.predict, texts)),
+            ('classify_local', measure_us(intent_classifier.classify_local, texts)),
+            ('classify_intent', measure_us(intent_classifier.classify_intent, texts)),
+        ]
+
+    print(f"\nArtefato {path}: {os.path.getsize(path) / 1024:.0f} KB, carga {load_ms:.1f} ms")
+    for name, (p50, p99) in rows:
+        print(f"  {name:<18} p50 {p50:7.1f} µs | p99 {p99:7.1f} µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Treina o modelo local de intenções')
+    parser.add_argument('inputs', nargs='*')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--dim', type=int, default=DEFAULT_DIM)
+    parser.add_argument('--epochs', type=int, default=300)
+    parser.add_argument('--folds', type=int, default=5)
+    args = parser.parse_args()
+
+    inputs = args.inputs or ['intent_corpus.jsonl']
+    log_path = os.environ.get('INTENT_LOG_PATH')
+    if not args.inputs and log_path and os.path.exists(log_path):
+        inputs.append(log_path)
+
+    pairs = load_pairs(inputs)
+    if len({intent for _, intent in pairs}) < 2:
+        print("[TRAIN] São necessários pares de pelo menos dois intents")
+        return 1
+
+    options = {'dim': args.dim, 'epochs': args.epochs}
+    cross_validate(pairs, args.folds, **options)
+    held_out_report(pairs, **options)
+
+    start = time.perf_counter()
+    model = train([t for t, _ in pairs], [i for _, i in pairs], **options)
+    model.meta['sources'] = [os.path.basename(p) for p in inputs]
+    model.save(args.output)
+    print(f"\nTreino final: {len(pairs)} frases, {len(model.labels)} intents em {time.perf_counter() - start:.2f} s")
+
+    latency_report(args.output, [t for t, _ in pairs])
+    print(f"\nModelo gravado em {args.output} (use INTENT_MODE=local)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())